@@ -13,7 +13,7 @@ class RedisAdapter(CacheAdapter):
         try:
             return data.decode('utf-8')
         except AttributeError as ae:
-            log_msg("DEBUG", "[cache][RedisAdapter][get] cannot decode data, returning directly data = {}".format(data))
+            log_msg("DEBUG", lambda: "[cache][RedisAdapter][get] cannot decode data, returning directly data = {}".format(data))
             return data
 
     def put(self, key, value, ttl, unit = "hours"):
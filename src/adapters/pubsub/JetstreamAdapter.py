@@ -2,6 +2,7 @@ import json
 
 from adapters.pubsub.PubsubAdapter import PubsubAdapter
 from database.jetstream_client import JetstreamClient
+from database.nats_connection import nats_connection
 from utils.logger import log_msg
 from utils.nats import reply
 
@@ -9,15 +10,23 @@ _jc = JetstreamClient()
 
 class JetstreamAdapter(PubsubAdapter):
     def publish(self, group, channel, payload):
-        log_msg("DEBUG", "[Pubsub][JetstreamAdapter][send] payload = {}".format(payload))
+        log_msg("DEBUG", lambda: "[Pubsub][JetstreamAdapter][send] payload = {}".format(payload))
         _jc.publish(group, channel, payload)
 
-    def consume(self, group, channel, handler):
-        log_msg("DEBUG", "[Pubsub][JetstreamAdapter][consume] channel = {}, group = {}".format(channel, group))
-        _jc.consume(group, channel, handler)
+    def consume(self, group, channel, handler, concurrency = 1, prefetch = None):
+        log_msg("DEBUG", lambda: "[Pubsub][JetstreamAdapter][consume] channel = {}, group = {}".format(channel, group))
+        _jc.consume(group, channel, handler, concurrency, prefetch)
 
     def decode(self, msg):
         return json.loads(msg.data.decode())
 
     async def reply(self, msg, payload):
         await reply(msg, payload)
+
+    def broadcast(self, channel, payload):
+        log_msg("DEBUG", lambda: "[Pubsub][JetstreamAdapter][broadcast] channel = {}, payload = {}".format(channel, payload))
+        nats_connection.publish(channel, payload)
+
+    def subscribe(self, channel, handler):
+        log_msg("DEBUG", lambda: "[Pubsub][JetstreamAdapter][subscribe] channel = {}".format(channel))
+        nats_connection.subscribe(channel, handler)
@@ -7,11 +7,17 @@ class LogAdapter(PubsubAdapter):
     def publish(self, group, channel, payload):
         log_msg("INFO", "[Pubsub][LogAdapter][publish] payload = {}, channel = {}, group = {}".format(payload, channel, group))
 
-    def consume(self, group, channel, handler):
+    def consume(self, group, channel, handler, concurrency = 1, prefetch = None):
         log_msg("INFO", "[Pubsub][LogAdapter][consume] consuming channel = {}, group = {}".format(channel, group))
 
     def decode(self, msg):
         return msg
 
     async def reply(self, msg, payload):
-        log_msg("DEBUG", "[Pubsub][LogAdapter][consume] replying to msg = {} with payload = {}".format(msg, json.dumps(payload)))
+        log_msg("DEBUG", lambda: "[Pubsub][LogAdapter][consume] replying to msg = {} with payload = {}".format(msg, json.dumps(payload)))
+
+    def broadcast(self, channel, payload):
+        log_msg("INFO", "[Pubsub][LogAdapter][broadcast] payload = {}, channel = {}".format(payload, channel))
+
+    def subscribe(self, channel, handler):
+        log_msg("INFO", "[Pubsub][LogAdapter][subscribe] subscribing channel = {}".format(channel))
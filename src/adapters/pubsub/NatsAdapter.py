@@ -2,6 +2,7 @@ import json
 
 from adapters.pubsub.PubsubAdapter import PubsubAdapter
 from database.nats_client import NatsClient
+from database.nats_connection import nats_connection
 from utils.logger import log_msg
 from utils.nats import reply
 
@@ -9,15 +10,23 @@ _nc = NatsClient()
 
 class NatsAdapter(PubsubAdapter):
     def publish(self, group, channel, payload):
-        log_msg("DEBUG", "[Pubsub][NatsAdapter][send] payload = {}, channel = {}, group = {}".format(payload, channel, group))
+        log_msg("DEBUG", lambda: "[Pubsub][NatsAdapter][send] payload = {}, channel = {}, group = {}".format(payload, channel, group))
         _nc.publish(channel, payload)
 
-    def consume(self, group, channel, handler):
-        log_msg("DEBUG", "[Pubsub][NatsAdapter][consume] channel = {}, group = {}".format(channel, group))
-        _nc.consume(channel, handler)
+    def consume(self, group, channel, handler, concurrency = 1, prefetch = None):
+        log_msg("DEBUG", lambda: "[Pubsub][NatsAdapter][consume] channel = {}, group = {}".format(channel, group))
+        _nc.consume(channel, handler, concurrency)
 
     def decode(self, msg):
         return json.loads(msg.data.decode())
 
     async def reply(self, msg, payload):
         await reply(msg, payload)
+
+    def broadcast(self, channel, payload):
+        log_msg("DEBUG", lambda: "[Pubsub][NatsAdapter][broadcast] channel = {}, payload = {}".format(channel, payload))
+        nats_connection.publish(channel, payload)
+
+    def subscribe(self, channel, handler):
+        log_msg("DEBUG", lambda: "[Pubsub][NatsAdapter][subscribe] channel = {}".format(channel))
+        nats_connection.subscribe(channel, handler)
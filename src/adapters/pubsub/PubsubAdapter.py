@@ -5,8 +5,13 @@ class PubsubAdapter(ABC):
     def publish(self, group, channel, payload):
         pass
 
+    #? adapters able to send several messages in one round trip are overriding it
+    def publish_batch(self, group, channel, payloads):
+        for payload in payloads:
+            self.publish(group, channel, payload)
+
     @abstractmethod
-    def consume(self, group, channel, handler):
+    def consume(self, group, channel, handler, concurrency = 1, prefetch = None):
         pass
 
     @abstractmethod
@@ -16,3 +21,13 @@ class PubsubAdapter(ABC):
     @abstractmethod
     async def reply(self, msg, payload):
         pass
+
+    #? unlike publish/consume (one consumer per group), broadcast payloads are received by every subscribed process
+    @abstractmethod
+    def broadcast(self, channel, payload):
+        pass
+
+    #? non blocking, the handler is called with the decoded payload
+    @abstractmethod
+    def subscribe(self, channel, handler):
+        pass
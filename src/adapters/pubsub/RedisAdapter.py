@@ -2,27 +2,55 @@ import asyncio
 import json
 
 from adapters.pubsub.PubsubAdapter import PubsubAdapter
+from utils.consumer import ConsumerPool
 from utils.logger import log_msg
+from utils.redis import redis_broadcast, redis_subscribe
 from database.redis_db import redis_client as redis
 
 class RedisAdapter(PubsubAdapter):
     def publish(self, group, channel, payload):
-        log_msg("DEBUG", "[Pubsub][RedisAdapter][send] channel = {}, group = {}, payload = {}".format(channel, group, payload))
+        log_msg("DEBUG", lambda: "[Pubsub][RedisAdapter][send] channel = {}, group = {}, payload = {}".format(channel, group, payload))
         redis.publish(channel, json.dumps(payload))
 
-    def consume(self, group, channel, handler):
-        log_msg("DEBUG", "[Pubsub][RedisAdapter][consume] channel = {}, group = {}".format(channel, group))
+    def publish_batch(self, group, channel, payloads):
+        log_msg("DEBUG", lambda: "[Pubsub][RedisAdapter][send_batch] channel = {}, group = {}, count = {}".format(channel, group, len(payloads)))
+        pipeline = redis.pipeline(transaction = False)
+        for payload in payloads:
+            pipeline.publish(channel, json.dumps(payload))
+        pipeline.execute()
+
+    def consume(self, group, channel, handler, concurrency = 1, prefetch = None):
+        log_msg("DEBUG", lambda: "[Pubsub][RedisAdapter][consume] channel = {}, group = {}, concurrency = {}".format(channel, group, concurrency))
+        asyncio.run(self.aconsume(channel, handler, concurrency))
+
+    async def aconsume(self, channel, handler, concurrency = 1):
+        pool = ConsumerPool(concurrency)
         sub = redis.pubsub()
         sub.subscribe(channel)
-        for payload in sub.listen():
-            asyncio.run(handler(payload))
+
+        try:
+            while True:
+                payload = await asyncio.to_thread(sub.get_message, timeout=1.0)
+                if payload is not None:
+                    await pool.submit(handler, payload)
+        finally:
+            await pool.join()
+            sub.close()
 
     def decode(self, msg):
-        log_msg("DEBUG", "[Pubsub][RedisAdapter][decode] msg = {}".format(msg))
+        log_msg("DEBUG", lambda: "[Pubsub][RedisAdapter][decode] msg = {}".format(msg))
         if msg is None or not isinstance(msg, dict) or msg['type'] != 'message' or not 'data' in msg:
             return None
 
         return json.loads(msg['data'])
 
     async def reply(self, msg, payload):
-        log_msg("DEBUG", "[Pubsub][RedisAdapter][reply] replying to msg = {} with payload = {}".format(msg, json.dumps(payload)))
+        log_msg("DEBUG", lambda: "[Pubsub][RedisAdapter][reply] replying to msg = {} with payload = {}".format(msg, json.dumps(payload)))
+
+    def broadcast(self, channel, payload):
+        log_msg("DEBUG", lambda: "[Pubsub][RedisAdapter][broadcast] channel = {}, payload = {}".format(channel, payload))
+        redis_broadcast(channel, payload)
+
+    def subscribe(self, channel, handler):
+        log_msg("DEBUG", lambda: "[Pubsub][RedisAdapter][subscribe] channel = {}".format(channel))
+        redis_subscribe(channel, handler)
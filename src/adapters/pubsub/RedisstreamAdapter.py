@@ -1,46 +1,140 @@
 import asyncio
 import json
+import time
 
 from uuid import uuid4
 
 from adapters.pubsub.PubsubAdapter import PubsubAdapter
+from utils.common import get_env_int
+from utils.consumer import ConsumerPool, get_prefetch
 from utils.logger import log_msg
+from utils.redis import redis_broadcast, redis_subscribe
 
 from redis.exceptions import ResponseError
 from database.redis_db import redis_client as redis
 
 _consumer_name = "consumer_{}".format(uuid4())
+_claim_interval = get_env_int('REDIS_STREAM_CLAIM_INTERVAL', 30)
+_claim_min_idle_time = get_env_int('REDIS_STREAM_CLAIM_MIN_IDLE_TIME', 300000)
+_max_deliveries = get_env_int('REDIS_STREAM_MAX_DELIVERIES', 5)
+_dead_letter_maxlen = get_env_int('REDIS_STREAM_DEAD_LETTER_MAXLEN', 10000)
+
+def get_dead_letter_stream(channel):
+    return "{}_dead_letter".format(channel)
+
+def acknowledge(group, channel, msg_id):
+    async def ack(msg):
+        await asyncio.to_thread(redis.xack, channel, group, msg_id)
+    return ack
+
+def dead_letter(group, channel, pending):
+    msg_id = pending['message_id']
+    entries = redis.xrange(channel, msg_id, msg_id)
+    if entries:
+        _, data = entries[0]
+        redis.xadd(get_dead_letter_stream(channel), {
+            **data,
+            'id': msg_id,
+            'group': group,
+            'deliveries': pending['times_delivered']
+        }, maxlen=_dead_letter_maxlen, approximate=True)
+
+    log_msg("WARN", "[Pubsub][RedisstreamAdapter][dead_letter] msg_id = {} delivered {} times, moved to {}".format(msg_id, pending['times_delivered'], get_dead_letter_stream(channel)))
+    redis.xack(channel, group, msg_id)
+
+def trim(channel):
+    #? only the entries which are delivered and acknowledged by every group are removed
+    min_ids = []
+    for group in redis.xinfo_groups(channel):
+        summary = redis.xpending(channel, group['name'])
+        min_ids.append(summary['min'] if summary['pending'] > 0 else group['last-delivered-id'])
+
+    if not min_ids:
+        return 0
+
+    min_id = min(min_ids, key=lambda msg_id: tuple(int(part) for part in msg_id.split('-')))
+    return redis.xtrim(channel, minid=min_id, approximate=True)
+
+def reclaim(group, channel, count):
+    for pending in redis.xpending_range(channel, group, '-', '+', count, idle=_claim_min_idle_time):
+        if pending['times_delivered'] >= _max_deliveries:
+            dead_letter(group, channel, pending)
+
+    claimed = redis.xautoclaim(channel, group, _consumer_name, _claim_min_idle_time, count=count)
+    messages = []
+    for msg_id, data in claimed[1]:
+        if data is None:
+            continue
+        messages.append((msg_id, data))
+
+    trimmed = trim(channel)
+    log_msg("DEBUG", lambda: "[Pubsub][RedisstreamAdapter][reclaim] channel = {}, group = {}, claimed = {}, trimmed = {}".format(channel, group, len(messages), trimmed))
+    return messages
 
 class RedisstreamAdapter(PubsubAdapter):
     def publish(self, group, channel, payload):
-        log_msg("DEBUG", "[Pubsub][RedisstreamAdapter][send] channel = {}, group = {}, payload = {}".format(channel, group, payload))
+        log_msg("DEBUG", lambda: "[Pubsub][RedisstreamAdapter][send] channel = {}, group = {}, payload = {}".format(channel, group, payload))
         redis.xadd(channel, { 'data': json.dumps(payload) })
 
-    def consume(self, group, channel, handler):
-        log_msg("DEBUG", "[Pubsub][RedisstreamAdapter][consume] channel = {}, group = {}".format(channel, group))
+    def publish_batch(self, group, channel, payloads):
+        log_msg("DEBUG", lambda: "[Pubsub][RedisstreamAdapter][send_batch] channel = {}, group = {}, count = {}".format(channel, group, len(payloads)))
+        pipeline = redis.pipeline(transaction = False)
+        for payload in payloads:
+            pipeline.xadd(channel, { 'data': json.dumps(payload) })
+        pipeline.execute()
+
+    def consume(self, group, channel, handler, concurrency = 1, prefetch = None):
+        log_msg("DEBUG", lambda: "[Pubsub][RedisstreamAdapter][consume] channel = {}, group = {}, concurrency = {}".format(channel, group, concurrency))
 
         try:
             redis.xgroup_create(channel, group, mkstream=True)
         except ResponseError as re:
-            log_msg("DEBUG", "[Pubsub][RedisstreamAdapter][consume] group {} already exists: {}".format(group, re))
-
-        while True:
-            messages = redis.xreadgroup(group, _consumer_name, { channel: '>' }, count=1, block=1000)
-            for message in messages:
-                if not isinstance(message, list):
-                    continue
-                stream, message_data = message
-                log_msg("DEBUG", "[Pubsub][RedisstreamAdapter][consume] stream = {}, message_data = {}".format(stream, message_data))
-                for msg_id, data in message_data:
-                    log_msg("DEBUG", "[Pubsub][RedisstreamAdapter][consume] msg_id = {}, data = {}".format(msg_id, data))
-                    asyncio.run(handler(data))
+            log_msg("DEBUG", lambda re = re: "[Pubsub][RedisstreamAdapter][consume] group {} already exists: {}".format(group, re))
+
+        asyncio.run(self.aconsume(group, channel, handler, concurrency, prefetch))
+
+    async def aconsume(self, group, channel, handler, concurrency = 1, prefetch = None):
+        pool = ConsumerPool(concurrency)
+        count = get_prefetch(concurrency, prefetch)
+        last_claim = 0
+
+        try:
+            while True:
+                if time.monotonic() - last_claim >= _claim_interval:
+                    last_claim = time.monotonic()
+                    try:
+                        for msg_id, data in await asyncio.to_thread(reclaim, group, channel, count):
+                            log_msg("DEBUG", lambda: "[Pubsub][RedisstreamAdapter][consume] reclaimed msg_id = {}, data = {}".format(msg_id, data))
+                            await pool.submit(handler, data, acknowledge(group, channel, msg_id))
+                    except ResponseError as re:
+                        log_msg("WARN", "[Pubsub][RedisstreamAdapter][consume] unable to reclaim pending entries: {}".format(re))
+
+                messages = await asyncio.to_thread(redis.xreadgroup, group, _consumer_name, { channel: '>' }, count=count, block=1000)
+                for message in messages:
+                    if not isinstance(message, list):
+                        continue
+                    stream, message_data = message
+                    log_msg("DEBUG", lambda: "[Pubsub][RedisstreamAdapter][consume] stream = {}, message_data = {}".format(stream, message_data))
+                    for msg_id, data in message_data:
+                        log_msg("DEBUG", lambda: "[Pubsub][RedisstreamAdapter][consume] msg_id = {}, data = {}".format(msg_id, data))
+                        await pool.submit(handler, data, acknowledge(group, channel, msg_id))
+        finally:
+            await pool.join()
 
     def decode(self, msg):
-        log_msg("DEBUG", "[Pubsub][RedisstreamAdapter][decode] msg = {}".format(msg))
+        log_msg("DEBUG", lambda: "[Pubsub][RedisstreamAdapter][decode] msg = {}".format(msg))
         if msg is None or not isinstance(msg, dict) or not 'data' in msg:
             return None
 
         return json.loads(msg['data'])
 
     async def reply(self, msg, payload):
-        log_msg("DEBUG", "[Pubsub][RedisAdapter][reply] replying to msg = {} with payload = {}".format(msg, json.dumps(payload)))
+        log_msg("DEBUG", lambda: "[Pubsub][RedisAdapter][reply] replying to msg = {} with payload = {}".format(msg, json.dumps(payload)))
+
+    def broadcast(self, channel, payload):
+        log_msg("DEBUG", lambda: "[Pubsub][RedisstreamAdapter][broadcast] channel = {}, payload = {}".format(channel, payload))
+        redis_broadcast(channel, payload)
+
+    def subscribe(self, channel, handler):
+        log_msg("DEBUG", lambda: "[Pubsub][RedisstreamAdapter][subscribe] channel = {}".format(channel))
+        redis_subscribe(channel, handler)
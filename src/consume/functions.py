@@ -0,0 +1,96 @@
+import time
+import requests
+import threading
+
+from collections import OrderedDict
+from jinja2 import Environment, BaseLoader, select_autoescape
+
+from utils.common import get_env_int, is_not_empty, is_not_empty_key, AUTOESCAPE_EXTENSIONS
+from utils.faas.vars import FAAS_API_TOKEN, FAAS_API_URL
+from utils.http import HTTP_REQUEST_TIMEOUT
+from utils.logger import log_msg
+
+_api_endpoint = "{}/v1/faas".format(FAAS_API_URL)
+_headers = { "X-Auth-Token": FAAS_API_TOKEN } if is_not_empty(FAAS_API_TOKEN) else None
+_cache_size = get_env_int('FAAS_FUNCTIONS_CACHE_SIZE', 1000)
+_cache_ttl = get_env_int('FAAS_FUNCTIONS_CACHE_TTL', 300)
+_env = Environment(loader=BaseLoader(), autoescape=select_autoescape(AUTOESCAPE_EXTENSIONS))
+
+class FunctionsCache():
+    def __init__(self, size = _cache_size, ttl = _cache_ttl):
+        self._size = size
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, function_id, version = None):
+        with self._lock:
+            entry = self._entries.get(function_id)
+            if entry is None:
+                return None
+
+            if time.monotonic() > entry['expires_at'] or (is_not_empty(version) and entry['version'] != version):
+                del self._entries[function_id]
+                return None
+
+            self._entries.move_to_end(function_id)
+            return entry
+
+    def put(self, function_id, version, function):
+        entry = {
+            'version': version,
+            'function': function,
+            'templates': {},
+            'expires_at': time.monotonic() + self._ttl
+        }
+
+        with self._lock:
+            self._entries[function_id] = entry
+            self._entries.move_to_end(function_id)
+            while len(self._entries) > self._size:
+                self._entries.popitem(last = False)
+        return entry
+
+    def invalidate(self, function_id = None):
+        with self._lock:
+            if function_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(function_id, None)
+
+    def __len__(self):
+        return len(self._entries)
+
+_cache = FunctionsCache()
+
+def get_function(function_id, version = None):
+    entry = _cache.get(function_id, version)
+    if entry is not None:
+        log_msg("DEBUG", "[consume][get_function] cache hit for function_id = {}, version = {}".format(function_id, entry['version']))
+        return entry
+
+    function_url = "{}/function/{}".format(_api_endpoint, function_id)
+    log_msg("DEBUG", "[consume][get_function] getting function_url = {}".format(function_url))
+    r_serverless_function = requests.get(function_url, headers = _headers, timeout = HTTP_REQUEST_TIMEOUT)
+    if r_serverless_function.status_code != 200:
+        return None
+
+    serverless_function = r_serverless_function.json()
+    if is_not_empty_key(serverless_function, 'updated_at'):
+        version = "{}".format(serverless_function['updated_at'])
+    return _cache.put(function_id, version, serverless_function)
+
+def get_template(entry, key, render):
+    #? the rendered and compiled template only depends on the function's version, not on the invocation
+    template = entry['templates'].get(key)
+    if template is None:
+        template = _env.from_string(render())
+        entry['templates'][key] = template
+    return template
+
+def on_function_event(payload):
+    if payload is None or payload.get('action') != 'invalidate':
+        return
+
+    log_msg("DEBUG", "[consume][on_function_event] invalidate function_id = {}".format(payload.get('function_id')))
+    _cache.invalidate(payload.get('function_id'))
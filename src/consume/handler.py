@@ -1,9 +1,12 @@
 import re
+import asyncio
 import requests
 
-from jinja2 import Environment, FileSystemLoader, BaseLoader, select_autoescape
+from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 from adapters.AdapterConfig import get_adapter
+from consume.functions import get_function, get_template
+from consume.runtimes import execute_warm, is_warm_runtime
 from utils.common import get_src_path, is_empty, is_not_empty, is_empty_key, is_not_empty_key, AUTOESCAPE_EXTENSIONS, is_true
 from utils.json import compact, is_not_json
 from utils.command import get_script_output
@@ -37,12 +40,14 @@ def update_invocation(invocation_id, payload):
   r_update_payload = requests.put(invocation_url, json=payload, headers=_headers, timeout=HTTP_REQUEST_TIMEOUT)
   if r_update_payload.status_code != 200:
     log_msg("ERROR", "[consume][update_invocation] bad response from the API: code = {}, body = {}".format(r_update_payload.status_code, r_update_payload.content))
+    return False
+  return True
 
 def error_invocation(invocation_id, payload, msg):
   log_msg("ERROR", "[consumer][error_invocation] {}, payload = {}".format(msg, payload))
   payload['content']['state'] = "error"
   payload['content']['result'] = msg
-  update_invocation(invocation_id, payload)
+  return update_invocation(invocation_id, payload)
 
 def is_user_authenticated(payload):
   log_msg("DEBUG", "[is_authenticated] serverless_function = {}".format(payload['content']['user_auth']['is_authenticated']))
@@ -62,105 +67,109 @@ async def handle(msg):
       log_msg("ERROR", "[consume][handle] the payload is not valid, missing invocation id")
       return
 
-    invocation_id = payload['id']
-
-    if is_empty_key(payload, 'content') or is_empty_key(payload['content'], 'function_id'):
-      error_invocation(invocation_id, payload, "the invocation {} is not valid, missing function_id".format(invocation_id))
-      return
-
-    function_id = payload['content']['function_id']
-    function_url = "{}/function/{}".format(_api_endpoint, function_id)
-    log_msg("DEBUG", "[consume][handle] getting function_url = {}".format(function_url))
-    r_serverless_function = requests.get(function_url, headers =_headers, timeout=HTTP_REQUEST_TIMEOUT)
-    if r_serverless_function.status_code != 200:
-      error_invocation(invocation_id, payload, "the function {} is not found".format(function_id))
-      return
-    
-    serverless_function = r_serverless_function.json()
-    if is_empty_key(serverless_function, 'content') or is_empty_key(serverless_function['content'], 'language'):
-      error_invocation(invocation_id, payload, "the function {}'s definition is invalid: missing language".format(function_id))
-      return
-
-    language = serverless_function['content']['language']
-    if is_not_supported_language(language):
-      error_invocation(invocation_id, payload, "not supported language: {}".format(language))
-      return
-
-    if is_empty_key(serverless_function['content'], 'code'):
-      error_invocation(invocation_id, payload, "the function {}'s definition is invalid: missing code".format(function_id))
-      return
-
-    if is_not_empty_key(payload['content'], 'args'):
-      args = payload['content']['args']
-      if any(is_not_json(arg['value']) and is_forbidden(arg['value']) for arg in args):
-        error_invocation(invocation_id, payload, "forbidden argument(s) for the function {}".format(function_id))
-        return
-
-      if is_not_empty_key(serverless_function['content'], 'regexp'):
-          regexp = serverless_function['content']['regexp']
-          if any(not re.match(regexp, arg['value']) for arg in args):
-              error_invocation(invocation_id, payload, "the function {}'s definition forbid some arguments, regexp = {}".format(function_id, regexp))
-              return
-
     try:
-      payload['content']['state'] = "complete"
-      ext = get_ext_from_language(language)
+      #? the http calls and the script execution are blocking, running them in the consumer pool's threads
+      return await asyncio.to_thread(execute, payload)
+    finally:
+      await pubsub_adapter().reply(msg, payload)
+
+def execute(payload):
+  invocation_id = payload['id']
+
+  if is_empty_key(payload, 'content') or is_empty_key(payload['content'], 'function_id'):
+    return error_invocation(invocation_id, payload, "the invocation {} is not valid, missing function_id".format(invocation_id))
+
+  function_id = payload['content']['function_id']
+  cached_function = get_function(function_id, payload.get('function_updated_at'))
+  if cached_function is None:
+    return error_invocation(invocation_id, payload, "the function {} is not found".format(function_id))
+
+  serverless_function = cached_function['function']
+  if is_empty_key(serverless_function, 'content') or is_empty_key(serverless_function['content'], 'language'):
+    return error_invocation(invocation_id, payload, "the function {}'s definition is invalid: missing language".format(function_id))
+
+  language = serverless_function['content']['language']
+  if is_not_supported_language(language):
+    return error_invocation(invocation_id, payload, "not supported language: {}".format(language))
+
+  if is_empty_key(serverless_function['content'], 'code'):
+    return error_invocation(invocation_id, payload, "the function {}'s definition is invalid: missing code".format(function_id))
+
+  if is_not_empty_key(payload['content'], 'args'):
+    args = payload['content']['args']
+    if any(is_not_json(arg['value']) and is_forbidden(arg['value']) for arg in args):
+      return error_invocation(invocation_id, payload, "forbidden argument(s) for the function {}".format(function_id))
+
+    if is_not_empty_key(serverless_function['content'], 'regexp'):
+        regexp = serverless_function['content']['regexp']
+        if any(not re.match(regexp, arg['value']) for arg in args):
+            return error_invocation(invocation_id, payload, "the function {}'s definition forbid some arguments, regexp = {}".format(function_id, regexp))
+
+  try:
+    payload['content']['state'] = "complete"
+    ext = get_ext_from_language(language)
+    warm = is_warm_runtime(ext)
+    args_values = [compact(item['value']) for item in payload['content']['args']] if is_not_empty_key(payload['content'], 'args') else []
+
+    function_with_args_tpl = "handle({})"
+    function_without_args_tpl = "handle()"
+    args_separator = ","
+
+    if language == "bash":
+      function_with_args_tpl="handle {}"
+      function_without_args_tpl="handle"
+      args_separator=" "
+
+    if warm and ext == "go":
+      #? the arguments are passed to the cached binary at runtime
+      handle_call = function_with_args_tpl.format(args_separator.join(["cwcloud_os.Args[{}]".format(i + 1) for i in range(0, len(args_values))])) if args_values else function_without_args_tpl
+    else:
+      handle_call = function_with_args_tpl.format(args_separator.join(["\"{}\"".format(compact(item['value'], True)) for item in payload['content']['args']])) if args_values else function_without_args_tpl
+
+    #? the handle_call is injected at the second stage so the compiled template can be reused across invocations
+    template = get_template(cached_function, ext, lambda: _env.get_template("main.{}.j2".format(ext)).render(
+      function_id=function_id,
+      handle_definition=serverless_function['content']['code'],
+      handle_call="{{ handle_call|safe }}"
+    ))
+
+    if "env" not in serverless_function['content']:
+      serverless_function['content']['env'] = {}
+
+    env = serverless_function['content']['env']
+    auth_header_key = env['AUTH_HEADER_KEY'] if is_not_empty_key(env, 'AUTH_HEADER_KEY') else "X-Auth-Token"
+    auth_header_value = env['AUTH_HEADER_VALUE'] if is_not_empty_key(env, 'AUTH_HEADER_VALUE') else None
+
+    if is_empty(auth_header_value) and is_user_authenticated(payload):
+      auth_header_key = payload['content']['user_auth']['header_key']
+      auth_header_value = payload['content']['user_auth']['header_value']
+
+    if is_empty(auth_header_value):
+      auth_header_key = "x-unauthenticated"
+      auth_header_value = "unauthenticated"
+
+    log_msg("DEBUG", f"[consume][handle] user_auth_key = {auth_header_key}, user_auth_value = {auth_header_value}")
+    main_content = template.render(
+      handle_call = handle_call,
+      user_auth_key = auth_header_key,
+      user_auth_value = auth_header_value,
+      env = env
+    )
+
+    if warm:
+      log_msg("DEBUG", "[consume][handle] execute invocation_id = {} in a warm {} runtime".format(invocation_id, ext))
+      status, output = execute_warm(ext, main_content, args_values)
+    else:
       function_file_path = "{}/{}.{}".format(_functions_file_path, invocation_id, ext)
       log_msg("DEBUG", "[consume][handle] write function file : {}".format(function_file_path))
       with open(function_file_path, 'w') as function_file:
-        template = _env.get_template("main.{}.j2".format(ext))
-
-        function_with_args_tpl = "handle({})"
-        function_without_args_tpl = "handle()"
-        args_separator = ","
-
-        if language == "bash":
-          function_with_args_tpl="handle {}"
-          function_without_args_tpl="handle"
-          args_separator=" "
-
-        handle_call = function_with_args_tpl.format(args_separator.join(["\"{}\"".format(compact(item['value'], True)) for item in payload['content']['args']])) if is_not_empty_key(payload['content'], 'args') else function_without_args_tpl
-
-        main_content = template.render(
-          function_id=function_id,
-          handle_definition=serverless_function['content']['code'],
-          handle_call=handle_call
-        )
-
-        if "env" not in serverless_function['content']:
-          serverless_function['content']['env'] = {}
-
-        env = Environment(loader=BaseLoader(), autoescape=select_autoescape(AUTOESCAPE_EXTENSIONS))
-        template = env.from_string(main_content)
-
-        env = serverless_function['content']['env']
-        auth_header_key = env['AUTH_HEADER_KEY'] if is_not_empty_key(env, 'AUTH_HEADER_KEY') else "X-Auth-Token"
-        auth_header_value = env['AUTH_HEADER_VALUE'] if is_not_empty_key(env, 'AUTH_HEADER_VALUE') else None
-
-        if is_empty(auth_header_value) and is_user_authenticated(payload):
-          auth_header_key = payload['content']['user_auth']['header_key']
-          auth_header_value = payload['content']['user_auth']['header_value']
-
-        if is_empty(auth_header_value):
-          auth_header_key = "x-unauthenticated"
-          auth_header_value = "unauthenticated"
-
-        log_msg("DEBUG", f"[consume][handle] user_auth_key = {auth_header_key}, user_auth_value = {auth_header_value}")
-        main_content = template.render(
-          user_auth_key = auth_header_key,
-          user_auth_value = auth_header_value,
-          env = env
-        )
-
         function_file.write(main_content)
 
       status, output = get_script_output("{}/{}_eval.sh {}".format(_consume_src_path, ext, invocation_id))
-      payload['content']['result'] = "{}".format(output)
-
       if is_true(status):
         quiet_remove(function_file_path)
-      update_invocation(invocation_id, payload)
-    except Exception as e:
-      error_invocation(invocation_id, payload, "e.type = {}, e.msg = {}".format(type(e), e))
-    finally:
-      await pubsub_adapter().reply(msg, payload)
+
+    payload['content']['result'] = "{}".format(output)
+    return update_invocation(invocation_id, payload)
+  except Exception as e:
+    return error_invocation(invocation_id, payload, "e.type = {}, e.msg = {}".format(type(e), e))
@@ -0,0 +1,34 @@
+const readline = require('readline');
+const { once } = require('events');
+const { Worker } = require('worker_threads');
+
+async function run(source) {
+  //? each invocation gets its own isolate, the node process itself stays warm
+  const worker = new Worker(source, { eval: true, stdout: true, stderr: true });
+  let output = '';
+  worker.stdout.on('data', (chunk) => output += chunk);
+  worker.stderr.on('data', (chunk) => output += chunk);
+  worker.on('error', (e) => output += `${e.stack || e}\n`);
+
+  const [code] = await once(worker, 'exit');
+  await Promise.all([worker.stdout, worker.stderr].map((stream) => stream.readableEnded ? null : once(stream, 'end')));
+  return { status: code === 0, output };
+}
+
+const rl = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+
+(async () => {
+  for await (const line of rl) {
+    if (!line.trim()) {
+      continue;
+    }
+
+    let result;
+    try {
+      result = await run(JSON.parse(line).source);
+    } catch (e) {
+      result = { status: false, output: `${e.stack || e}` };
+    }
+    process.stdout.write(`${JSON.stringify(result)}\n`);
+  }
+})();
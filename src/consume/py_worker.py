@@ -0,0 +1,65 @@
+import os
+import sys
+import json
+import traceback
+
+#? preloading the modules imported by the main.py.j2 template, the forked children inherit them
+import requests # noqa: F401
+import yaml # noqa: F401
+
+from datetime import datetime # noqa: F401
+
+def run(source):
+    r, w = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        os.close(r)
+        os.dup2(w, 1)
+        os.dup2(w, 2)
+        os.close(w)
+        sys.stdout = os.fdopen(1, 'w')
+        sys.stderr = os.fdopen(2, 'w')
+        status = 0
+        try:
+            exec(compile(source, "<function>", "exec"), { '__name__': '__main__' }) # nosec B102
+        except SystemExit as e:
+            status = e.code if isinstance(e.code, int) else 1
+        except BaseException as e:
+            traceback.print_exception(type(e), e, e.__traceback__.tb_next)
+            status = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        os._exit(status)
+
+    os.close(w)
+    chunks = []
+    with os.fdopen(r, 'rb') as output:
+        for chunk in iter(lambda: output.read(65536), b''):
+            chunks.append(chunk)
+
+    _, wait_status = os.waitpid(pid, 0)
+    return {
+        'status': os.waitstatus_to_exitcode(wait_status) == 0,
+        'output': b''.join(chunks).decode('UTF-8', errors = 'replace')
+    }
+
+def main():
+    #? the original stdout is kept for the protocol, everything else printed by the worker goes to stderr
+    protocol = os.fdopen(os.dup(1), 'w')
+    os.dup2(2, 1)
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+
+        try:
+            result = run(json.loads(line)['source'])
+        except Exception as e:
+            result = { 'status': False, 'output': "e.type = {}, e.msg = {}".format(type(e), e) }
+
+        protocol.write("{}\n".format(json.dumps(result)))
+        protocol.flush()
+
+if __name__ == '__main__':
+    main()
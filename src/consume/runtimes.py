@@ -0,0 +1,172 @@
+import os
+import json
+import queue
+import select
+import signal
+import hashlib
+import threading
+import subprocess # nosec B404
+
+from utils.common import get_env_bool, get_env_int, get_src_path
+from utils.consumer import CONSUMER_CONCURRENCY
+from utils.logger import log_msg
+
+FAAS_WARM_RUNTIMES = get_env_bool('FAAS_WARM_RUNTIMES', True)
+FAAS_EXECUTION_TIMEOUT = get_env_int('FAAS_EXECUTION_TIMEOUT', 300)
+FAAS_GO_BINARIES_CACHE_SIZE = get_env_int('FAAS_GO_BINARIES_CACHE_SIZE', 100)
+
+_consume_src_path = "{}/consume".format(get_src_path())
+_go_binaries_path = os.getenv('FAAS_GO_BINARIES_PATH', "/functions/.bin")
+
+class RuntimeTimeoutError(Exception):
+    pass
+
+def read_line(stream, timeout):
+    buffer = b''
+    fd = stream.fileno()
+    while not buffer.endswith(b'\n'):
+        ready, _, _ = select.select([fd], [], [], timeout)
+        if not ready:
+            raise RuntimeTimeoutError("no response after {}s".format(timeout))
+
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            raise EOFError("the runtime worker has exited")
+        buffer += chunk
+    return buffer.decode('UTF-8')
+
+class RuntimeWorker():
+    def __init__(self, cmd):
+        self._cmd = cmd
+        #? own session so the worker and the forked invocations can be killed together
+        self._process = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, start_new_session=True) # nosec B603
+        log_msg("DEBUG", "[RuntimeWorker] started cmd = {}, pid = {}".format(cmd, self._process.pid))
+
+    def is_alive(self):
+        return self._process.poll() is None
+
+    def execute(self, source, timeout):
+        self._process.stdin.write("{}\n".format(json.dumps({ 'source': source })).encode('UTF-8'))
+        self._process.stdin.flush()
+        result = json.loads(read_line(self._process.stdout, timeout))
+        return result['status'], result['output']
+
+    def kill(self):
+        try:
+            os.killpg(self._process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        self._process.wait()
+
+class RuntimePool():
+    def __init__(self, cmd, size = CONSUMER_CONCURRENCY):
+        self._cmd = cmd
+        self._workers = queue.LifoQueue()
+        self._size = size
+        self._started = 0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            if self._workers.empty() and self._started < self._size:
+                self._started += 1
+                return RuntimeWorker(self._cmd)
+        return self._workers.get()
+
+    def release(self, worker):
+        self._workers.put(worker)
+
+    def replace(self, worker):
+        worker.kill()
+        try:
+            self._workers.put(RuntimeWorker(self._cmd))
+        except OSError:
+            with self._lock:
+                self._started -= 1
+            raise
+
+    def execute(self, source, timeout = FAAS_EXECUTION_TIMEOUT):
+        worker = self.acquire()
+        if not worker.is_alive():
+            worker.kill()
+            worker = RuntimeWorker(self._cmd)
+
+        try:
+            result = worker.execute(source, timeout)
+        except (RuntimeTimeoutError, EOFError, OSError, ValueError) as e:
+            log_msg("WARN", "[RuntimePool][execute] replacing the worker cmd = {}: e.type = {}, e.msg = {}".format(self._cmd, type(e), e))
+            self.replace(worker)
+            return False, "{}".format(e)
+
+        self.release(worker)
+        return result
+
+class GoBinaries():
+    def __init__(self, path = _go_binaries_path, size = FAAS_GO_BINARIES_CACHE_SIZE):
+        self._path = path
+        self._size = size
+        #? striped locks, so the same source is compiled only once while different sources are compiled in parallel
+        self._locks = [threading.Lock() for _ in range(0, 64)]
+        self._lock = threading.Lock()
+
+    def get_lock(self, key):
+        return self._locks[int(key[:8], 16) % len(self._locks)]
+
+    def evict(self):
+        binaries = [os.path.join(self._path, name) for name in os.listdir(self._path) if not name.endswith(".go")]
+        binaries.sort(key = os.path.getmtime)
+        for binary in binaries[:max(0, len(binaries) - self._size)]:
+            os.remove(binary)
+
+    def build(self, source, timeout):
+        key = hashlib.sha256(source.encode('UTF-8')).hexdigest()
+        binary = os.path.join(self._path, key)
+        with self.get_lock(key):
+            if os.path.exists(binary):
+                return True, binary
+
+            os.makedirs(self._path, exist_ok = True)
+            source_path = "{}.go".format(binary)
+            with open(source_path, 'w') as source_file:
+                source_file.write(source)
+
+            try:
+                log_msg("DEBUG", "[GoBinaries][build] compiling key = {}".format(key))
+                r = subprocess.run(["go", "build", "-o", binary, source_path], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True, timeout=timeout) # nosec B603 B607
+            finally:
+                os.remove(source_path)
+
+            if r.returncode != 0:
+                return False, r.stdout
+
+        with self._lock:
+            self.evict()
+        return True, binary
+
+    def execute(self, source, args, timeout = FAAS_EXECUTION_TIMEOUT):
+        try:
+            built, result = self.build(source, timeout)
+            if not built:
+                return False, result
+
+            os.utime(result)
+            r = subprocess.run([result, *args], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True, timeout=timeout) # nosec B603
+            return r.returncode == 0, r.stdout
+        except subprocess.TimeoutExpired as e:
+            return False, "no response after {}s".format(e.timeout)
+        except OSError as e:
+            return False, "e.type = {}, e.msg = {}".format(type(e), e)
+
+_runtimes = {
+    'py': RuntimePool(["python", "{}/py_worker.py".format(_consume_src_path)]),
+    'js': RuntimePool(["node", "{}/js_worker.js".format(_consume_src_path)]),
+    'go': GoBinaries()
+}
+
+def is_warm_runtime(ext):
+    return FAAS_WARM_RUNTIMES and ext in _runtimes
+
+def execute_warm(ext, source, args):
+    if ext == 'go':
+        return _runtimes[ext].execute(source, args)
+    return _runtimes[ext].execute(source)
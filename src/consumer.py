@@ -1,5 +1,6 @@
+from consume.functions import on_function_event
 from consume.handler import handle, pubsub_adapter
-from utils.consumer import CONSUMER_CHANNEL, CONSUMER_GROUP
+from utils.consumer import CONSUMER_CHANNEL, CONSUMER_CONCURRENCY, CONSUMER_GROUP, CONSUMER_PREFETCH, FUNCTIONS_CHANNEL
 from utils.observability.otel import init_otel_metrics, init_otel_tracer, init_otel_logger
 from utils.workers import wait_startup_time
 
@@ -8,5 +9,7 @@ init_otel_tracer()
 init_otel_metrics()
 init_otel_logger()
 
+pubsub_adapter().subscribe(FUNCTIONS_CHANNEL, on_function_event)
+
 while True:
-  pubsub_adapter().consume(CONSUMER_GROUP, CONSUMER_CHANNEL, handle)
+  pubsub_adapter().consume(CONSUMER_GROUP, CONSUMER_CHANNEL, handle, CONSUMER_CONCURRENCY, CONSUMER_PREFETCH)
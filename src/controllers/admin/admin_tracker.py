@@ -0,0 +1,27 @@
+from datetime import datetime, timedelta
+from fastapi.responses import JSONResponse
+
+from entities.TrackerEvent import TrackerRollup
+from utils.observability.cid import get_current_cid
+
+def get_tracker_stats(website, dimension, granularity, start, end, db):
+    end = end if end is not None else datetime.now()
+    start = start if start is not None else end - timedelta(days = 1)
+    if start >= end:
+        return JSONResponse(content = {
+            'status': 'ko',
+            'error': 'The start date must be before the end date',
+            'i18n_code': 'tracker_invalid_range',
+            'cid': get_current_cid()
+        }, status_code = 400)
+
+    rollups = TrackerRollup.getTrackerRollups(website, dimension.value, granularity.value, start, end, db)
+    return {
+        'status': 'ok',
+        'website': website,
+        'dimension': dimension.value,
+        'granularity': granularity.value,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'stats': [{ 'bucket': rollup.bucket.isoformat(), 'value': rollup.value, 'hits': int(rollup.hits) } for rollup in rollups]
+    }
@@ -1,13 +1,42 @@
 from entities.iot.Data import Data, NumericData, StringData
+from utils.common import is_not_uuid
+from utils.iot.timeseries import IOT_DATA_MAX_RESULTS, get_page
+from utils.observability.cid import get_current_cid
 
-def get_datas(current_user, db):
-    data = Data.getAllData(db)
-    return data
+def get_data_page(entity, device_id, key, start, end, cursor, max_results, db):
+    if device_id is not None and is_not_uuid(device_id):
+        return {
+            'status': 'ko',
+            'code': 400,
+            'message': 'Invalid device id',
+            'i18n_code': 'invalid_device_id',
+            'cid': get_current_cid()
+        }
 
-def get_numeric_data(current_user, db):
-    data = NumericData.getAllNumericData(db)
-    return data
+    try:
+        results, next_cursor = get_page(entity, device_id, key, start, end, cursor, max_results, db)
+    except ValueError:
+        return {
+            'status': 'ko',
+            'code': 400,
+            'message': 'Invalid cursor',
+            'i18n_code': 'invalid_cursor',
+            'cid': get_current_cid()
+        }
 
-def get_string_data(current_user, db):
-    data = StringData.getAllStringData(db)
-    return data
+    return {
+        'status': 'ok',
+        'code': 200,
+        'max_results': max_results,
+        'next_cursor': next_cursor,
+        'results': results
+    }
+
+def get_datas(current_user, db, device_id = None, start = None, end = None, cursor = None, max_results = IOT_DATA_MAX_RESULTS):
+    return get_data_page(Data, device_id, None, start, end, cursor, max_results, db)
+
+def get_numeric_data(current_user, db, device_id = None, key = None, start = None, end = None, cursor = None, max_results = IOT_DATA_MAX_RESULTS):
+    return get_data_page(NumericData, device_id, key, start, end, cursor, max_results, db)
+
+def get_string_data(current_user, db, device_id = None, key = None, start = None, end = None, cursor = None, max_results = IOT_DATA_MAX_RESULTS):
+    return get_data_page(StringData, device_id, key, start, end, cursor, max_results, db)
@@ -4,9 +4,11 @@ import copy
 from datetime import datetime
 from fastapi.responses import JSONResponse
 
+from adapters.AdapterConfig import get_adapter
 from entities.faas.Function import FunctionEntity
 
 from utils.common import is_empty, is_false, is_not_empty, is_not_numeric, is_true
+from utils.consumer import FUNCTIONS_CHANNEL
 from utils.faas.functions import is_not_supported_language, is_not_supported_callback_type, restructure_callbacks
 from utils.faas.owner import get_email_owner, get_owner_id, override_owner_id
 from utils.faas.security import has_not_exec_right, has_not_write_right
@@ -14,6 +16,11 @@ from utils.encoder import AlchemyEncoder
 from utils.file import get_b64_content
 from utils.observability.cid import get_current_cid
 
+_pubsub_adapter = get_adapter("pubsub")
+
+def invalidate_function(id):
+    _pubsub_adapter().broadcast(FUNCTIONS_CHANNEL, {'action': 'invalidate', 'function_id': "{}".format(id)})
+
 def add_function(payload, current_user, db):
     if is_empty(payload.content.name):
         return {
@@ -111,6 +118,7 @@ def override_function(id, payload, current_user, db):
         "updated_at": updated_at
     })
     db.commit()
+    invalidate_function(id)
 
     return {
         'status': 'ok',
@@ -170,6 +178,7 @@ def delete_function(id, current_user, db):
     
         function.delete(synchronize_session=False)
         db.commit()
+        invalidate_function(id)
     return {
         'status': 'ok',
         'code': 200
@@ -4,6 +4,8 @@ import asyncio
 import requests
 
 from datetime import datetime
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
 
 from adapters.AdapterConfig import get_adapter
 from entities.faas.Function import FunctionEntity
@@ -16,6 +18,7 @@ from utils.encoder import AlchemyEncoder
 from utils.faas.invocations import _in_progress, is_unknown_state
 from utils.faas.functions import is_not_owner
 from utils.faas.invoker import get_email_invoker, get_invoker_id, override_invoker_id
+from utils.faas.waiters import invocation_waiters, notify_invocation
 from utils.faas.iot import send_payload_in_realtime
 from utils.http import HTTP_REQUEST_TIMEOUT
 from utils.logger import log_msg
@@ -24,8 +27,10 @@ from utils.observability.cid import get_current_cid
 _pubsub_adapter = get_adapter("pubsub")
 _max_retry_invoke_sync = get_env_int('MAX_RETRY_INVOKE_SYNC', 100)
 _invoke_sync_wait_time = get_env_int('INVOKE_SYNC_WAIT_TIME', 1)
+_invoke_sync_timeout = get_env_int('INVOKE_SYNC_TIMEOUT', _max_retry_invoke_sync * _invoke_sync_wait_time)
+_invoke_sync_check_interval = get_env_int('INVOKE_SYNC_CHECK_INTERVAL', 10)
 
-def invoke(payload, current_user, user_auth, db):
+def check_invocation_payload(payload):
     if is_empty(payload.content.state):
         payload.content.state = _in_progress
 
@@ -47,9 +52,9 @@ def invoke(payload, current_user, user_auth, db):
             'cid': get_current_cid()
         }
 
-    db_function = db.query(FunctionEntity).filter(FunctionEntity.id == payload.content.function_id)
-    function = db_function.first()
+    return None
 
+def check_invoked_function(payload, function, current_user):
     if not function:
         return {
             'status': 'ko',
@@ -86,6 +91,9 @@ def invoke(payload, current_user, user_auth, db):
             'cid': get_current_cid()
         }
 
+    return None
+
+def new_invocation_entities(payload, function, current_user):
     new_invocation = InvocationEntity(**payload.dict())
     new_invocation_execution_trace = InvocationExecutionTraceEntity(**payload.dict())
     invoker_id = get_invoker_id(payload, current_user)
@@ -98,18 +106,12 @@ def invoke(payload, current_user, user_auth, db):
        new_invocation.invoker_id = function.owner_id
        new_invocation_execution_trace.invoker_id = function.owner_id
 
-    db.add(new_invocation)
-    db.commit()
-    db.refresh(new_invocation)
-
-    new_invocation_execution_trace.invocation_id = new_invocation.id
-    db.add(new_invocation_execution_trace)
-    db.commit()
-    db.refresh(new_invocation_execution_trace)
+    return new_invocation, new_invocation_execution_trace, without_invoker
 
+def publish_invocation(payload, user_auth, new_invocation, function, without_invoker):
     invocation_id = new_invocation.id
     payload.content.user_auth = user_auth
-    _pubsub_adapter().publish(CONSUMER_GROUP, CONSUMER_CHANNEL, {'id': "{}".format(invocation_id), **payload.dict()})
+    _pubsub_adapter().publish(CONSUMER_GROUP, CONSUMER_CHANNEL, {'id': "{}".format(invocation_id), 'function_updated_at': "{}".format(function.updated_at), **payload.dict()})
 
     if without_invoker:
         log_msg("INFO", f"[invoke] Invocation id = {new_invocation.id} without invoker, set the invoker as the owner of the function (user_id = {function.owner_id})")
@@ -122,30 +124,108 @@ def invoke(payload, current_user, user_auth, db):
         'updated_at': new_invocation.updated_at
     }
 
+def invoke(payload, current_user, user_auth, db):
+    error = check_invocation_payload(payload)
+    if error is not None:
+        return error
+
+    db_function = db.query(FunctionEntity).filter(FunctionEntity.id == payload.content.function_id)
+    function = db_function.first()
+
+    error = check_invoked_function(payload, function, current_user)
+    if error is not None:
+        return error
+
+    new_invocation, new_invocation_execution_trace, without_invoker = new_invocation_entities(payload, function, current_user)
+
+    db.add(new_invocation)
+    db.commit()
+    db.refresh(new_invocation)
+
+    new_invocation_execution_trace.invocation_id = new_invocation.id
+    db.add(new_invocation_execution_trace)
+    db.commit()
+    db.refresh(new_invocation_execution_trace)
+
+    return publish_invocation(payload, user_auth, new_invocation, function, without_invoker)
+
+async def ainvoke(payload, current_user, user_auth, db):
+    error = check_invocation_payload(payload)
+    if error is not None:
+        return error
+
+    function = await db.scalar(select(FunctionEntity).filter(FunctionEntity.id == payload.content.function_id).limit(1))
+
+    error = check_invoked_function(payload, function, current_user)
+    if error is not None:
+        return error
+
+    new_invocation, new_invocation_execution_trace, without_invoker = new_invocation_entities(payload, function, current_user)
+
+    db.add(new_invocation)
+    await db.flush()
+    new_invocation_execution_trace.invocation_id = new_invocation.id
+    db.add(new_invocation_execution_trace)
+    await db.commit()
+    await db.refresh(new_invocation)
+
+    return await run_in_threadpool(publish_invocation, payload, user_auth, new_invocation, function, without_invoker)
+
 def is_state_exists(search_result_invocation):
     return is_not_empty_key(search_result_invocation, 'entity') and is_not_empty(search_result_invocation['entity'].content) and is_not_empty_key(search_result_invocation['entity'].content, 'state')
 
+def find_invocation_state(id, current_user, db):
+    search_result_invocation = get_invocation(id, current_user, db)
+    state = search_result_invocation['entity'].content['state'] if is_state_exists(search_result_invocation) else "undefined"
+    log_msg("DEBUG", "[find_invocation_state] found invocation: id = {}, status = {}, state = {}".format(id, search_result_invocation['status'], state))
+    return search_result_invocation, is_false(search_result_invocation['status']) or state != _in_progress
+
 def invoke_sync(payload, current_user, user_auth, db):
     result = invoke(payload, current_user, user_auth, db)
     if is_false(result['status']):
         return result
 
     id = result['id']
-    for retry in range(0, _max_retry_invoke_sync):
-        search_result_invocation = get_invocation(id, current_user, db)
-
-        state = search_result_invocation['entity'].content['state'] if is_state_exists(search_result_invocation) else "undefined"
-        log_msg("DEBUG", "[invoke_sync] found invocation: id = {}, retry = {}, status = {}, state = {}".format(id, retry, search_result_invocation['status'], state))
-
-        if is_false(search_result_invocation['status']) or state != _in_progress:
-            return search_result_invocation
-
-        time.sleep(_invoke_sync_wait_time)
-
-    return search_result_invocation
+    deadline = time.monotonic() + _invoke_sync_timeout
+    #? the completion is notified by complete(), the database is only checked again when notified or as a fallback every check interval
+    with invocation_waiters.event(id) as event:
+        while True:
+            search_result_invocation, is_done = find_invocation_state(id, current_user, db)
+            remaining = deadline - time.monotonic()
+            if is_done or remaining <= 0:
+                return search_result_invocation
+
+            #? releasing the connection while waiting
+            db.rollback()
+            event.wait(min(remaining, _invoke_sync_check_interval))
+            event.clear()
+
+async def afind_invocation_state(id, current_user, db):
+    search_result_invocation = await aget_invocation(id, current_user, db)
+    state = search_result_invocation['entity'].content['state'] if is_state_exists(search_result_invocation) else "undefined"
+    log_msg("DEBUG", "[afind_invocation_state] found invocation: id = {}, status = {}, state = {}".format(id, search_result_invocation['status'], state))
+    return search_result_invocation, is_false(search_result_invocation['status']) or state != _in_progress
+
+async def ainvoke_sync(payload, current_user, user_auth, db):
+    result = await ainvoke(payload, current_user, user_auth, db)
+    if is_false(result['status']):
+        return result
 
-async def async_send_payload_in_realtime(callback, safe_payload):
-    await send_payload_in_realtime(callback, safe_payload)
+    id = result['id']
+    deadline = time.monotonic() + _invoke_sync_timeout
+    with invocation_waiters.aevent(id) as event:
+        while True:
+            search_result_invocation, is_done = await afind_invocation_state(id, current_user, db)
+            remaining = deadline - time.monotonic()
+            if is_done or remaining <= 0:
+                return search_result_invocation
+
+            await db.rollback()
+            try:
+                await asyncio.wait_for(event.wait(), timeout = min(remaining, _invoke_sync_check_interval))
+            except asyncio.TimeoutError:
+                pass
+            event.clear()
 
 def send_result_to_callbacks(payload, invocation, function):
     if payload.content.state != _in_progress:
@@ -173,7 +253,7 @@ def send_result_to_callbacks(payload, invocation, function):
                             requests.post(callback['endpoint'], json=safe_payload, headers=callback_headers, timeout=HTTP_REQUEST_TIMEOUT)
                         elif callback['type'] == "websocket" or callback['type'] == "mqtt":
                             log_msg("INFO", f"[send_result_to_callbacks] invoke callback: type={callback['type']}, endpoint={callback['endpoint']}")
-                            asyncio.run(async_send_payload_in_realtime(callback, safe_payload))
+                            send_payload_in_realtime(callback, safe_payload)
 
 def complete(id, payload, current_user, db):
     if is_empty(payload.content.state):
@@ -273,6 +353,9 @@ def complete(id, payload, current_user, db):
     })
     db.commit()
 
+    if payload.content.state != _in_progress:
+        notify_invocation(id, payload.content.state)
+
     send_result_to_callbacks(payload, old_invocation, function)
 
     return {
@@ -305,6 +388,27 @@ def get_invocation(id, current_user, db):
         'entity': db_invocation
     }
 
+async def aget_invocation(id, current_user, db):
+    query = select(InvocationEntity).filter(InvocationEntity.id == id)
+    if is_false(current_user.is_admin):
+        query = query.filter(InvocationEntity.invoker_id == current_user.id)
+
+    db_invocation = await db.scalar(query.limit(1).execution_options(populate_existing = True))
+    if not db_invocation:
+        return {
+            'status': 'ko',
+            'code': 404,
+            'message': "Resource '{}' not found".format(id),
+            'i18n_code': 'faas_not_found_invocation',
+            'cid': get_current_cid()
+        }
+
+    return {
+        'status': 'ok',
+        'code': 200,
+        'entity': db_invocation
+    }
+
 def delete_invocation(id, current_user, db):
     if is_true(current_user.is_admin):
         invocation = db.query(InvocationEntity).filter(InvocationEntity.id == id)
@@ -1,20 +1,54 @@
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
-from controllers.faas.invocations import invoke_sync
+from controllers.faas.invocations import check_invoked_function, invoke_sync
 from entities.faas.Function import FunctionEntity
 from entities.faas.Trigger import TriggerEntity
-from entities.iot.Data import Data, NumericData, StringData
+from entities.iot.Data import Data, NumericData, NumericDataRollup, StringData
 from entities.iot.ObjectType import ObjectType
 from fastapi.responses import JSONResponse
 from entities.iot.Device import Device
-from schedule.crontabs import handle_trigger
-from schemas.faas.Invocation import Invocation
-from schemas.faas.InvocationArg import InvocationArgument
-from schemas.faas.InvocationContent import InvocationContent
-from utils.common import is_numeric, is_not_empty_key
+from schemas.iot.Data import DataBulkItemSchema
+from pydantic import ValidationError
+from utils.common import get_env_int, is_empty, is_false, is_numeric, is_not_empty_key, is_not_uuid, is_true
+from utils.date import to_naive
 from utils.encoder import AlchemyEncoder
+from utils.iot.ingestion import DATA_KEY, DATE_FORMAT, IOT_ASYNC_INGESTION, STRING_DATA_MAX_LENGTH, create_decoding_invocations, new_decoding_invocation, new_iot_data_message, publish_iot_data, publish_iot_data_batch, publish_iot_triggers, save_decoded_data, wait_for_invocations
+from utils.iot.timeseries import AGGREGATE_INTERVALS, IOT_AGGREGATE_MAX_BUCKETS, count_buckets, ensure_data_partitions, get_aggregates, is_accepted_time, parse_percentiles, rollup_numeric_data
 from utils.observability.cid import get_current_cid
 
+IOT_BULK_MAX_ITEMS = get_env_int('IOT_BULK_MAX_ITEMS', 1000)
+
+def new_error(code, message, i18n_code):
+    return {
+        'status': 'ko',
+        'code': code,
+        'message': message,
+        'i18n_code': i18n_code,
+        'cid': get_current_cid()
+    }
+
+def to_error_response(error):
+    return JSONResponse(content = {
+        'status': 'ko',
+        'message': error['message'],
+        'i18n_code': error['i18n_code'],
+        'cid': get_current_cid()
+    }, status_code = error['code'])
+
+def check_decoding_function(function):
+    dumped_function = json.loads(json.dumps(function, cls = AlchemyEncoder))
+    args = dumped_function['content']['args']
+    if not args:
+        return new_error(404, "Decoding function 'data' argument not found", 'decoding_function_data_argument_not_found')
+
+    if len(args) != 1:
+        return new_error(404, 'Decoding function has more than one argument', 'decoding_function_has_more_than_one_argument')
+
+    if args[0] != DATA_KEY:
+        return new_error(404, "Decoding function key should be named 'data'", 'decoding_function_key_should_be_named_data')
+
+    return None
+
 def add_data(current_user, user_auth, payload, db):
     existing_device = Device.getUserDeviceById(current_user.email, payload.device_id, db)
     if current_user.is_admin:
@@ -56,52 +90,26 @@ def add_data(current_user, user_auth, payload, db):
                 'cid': get_current_cid()
             }, status_code = 404)
         
-        dumped_existing_function = json.loads(json.dumps(existing_function, cls = AlchemyEncoder))
-        args = dumped_existing_function['content']['args']
-        if args:
-            if len(args) == 1:
-                if args[0] != 'data':
-                    return JSONResponse(content = {
-                        'status': 'ko',
-                        'message': "Decoding function key should be named 'data'",
-                        'i18n_code': 'decoding_function_key_should_be_named_data',
-                        'cid': get_current_cid()
-                    }, status_code = 404)
-            else:
-                return JSONResponse(content = {
-                    'status': 'ko',
-                    'message': 'Decoding function has more than one argument',
-                    'i18n_code': 'decoding_function_has_more_than_one_argument',
-                    'cid': get_current_cid()
-                }, status_code = 404)
-        else:
+        error = check_decoding_function(existing_function)
+        if error is not None:
+            return to_error_response(error)
+        
+        invocation_payload = new_decoding_invocation(current_user.id, object_type_content['decoding_function'], payload.content)
+
+        handle_iot_triggers(set(object_type_content.get('triggers') or []), db)
+
+        if is_true(IOT_ASYNC_INGESTION):
+            error = check_invoked_function(invocation_payload, existing_function, current_user)
+            if error is not None:
+                return to_error_response(error)
+
+            #? the decoding and the storage are done by the ingestion consumer
+            publish_iot_data(new_iot_data_message(payload.device_id, object_type_content['decoding_function'], current_user.id, user_auth, payload.content))
             return JSONResponse(content = {
-                'status': 'ko',
-                'message': "Decoding function 'data' argument not found",
-                'i18n_code': 'decoding_function_data_argument_not_found',
+                'status': 'ok',
+                'message': 'Data accepted',
                 'cid': get_current_cid()
-            }, status_code = 404)
-        
-        invocation_payload = Invocation(
-            invoker_id = current_user.id,
-            content = InvocationContent(
-                function_id = object_type_content['decoding_function'],
-                args = [
-                    InvocationArgument(
-                        key = "data",
-                        value = payload.content
-                    )
-                ]
-            )
-        )
-
-        dumped_existing_object_type = json.loads(json.dumps(existing_object_type, cls = AlchemyEncoder))
-        triggers = dumped_existing_object_type['content']['triggers']
-        if triggers:
-            for triggerId in triggers:
-                trigger = TriggerEntity.findById(triggerId, db)
-                dumped_trigger = json.loads(json.dumps(trigger, cls = AlchemyEncoder))
-                handle_trigger(dumped_trigger)
+            }, status_code = 202)
 
         sync_invocation_result = invoke_sync(invocation_payload, current_user, user_auth, db)
         if sync_invocation_result['status'] == 'ko':
@@ -113,36 +121,254 @@ def add_data(current_user, user_auth, payload, db):
             }, status_code = sync_invocation_result['code'])
         dumped_result = json.loads(json.dumps(sync_invocation_result, cls = AlchemyEncoder))
         result = dumped_result['entity']['content']['result']
+        if isinstance(result, str) and len(result) > STRING_DATA_MAX_LENGTH:
+            return to_error_response(new_error(422, "Invalid decoded data: string result longer than {} characters".format(STRING_DATA_MAX_LENGTH), 'invalid_decoded_data'))
+
+        created_at = datetime.now().replace(microsecond = 0)
+        ensure_data_partitions([created_at], db)
         data = Data()
         data.device_id = payload.device_id
         data.normalized_content = dumped_result
-        data.created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        data.created_at = created_at
         db.add(data)
-        db.commit()
+        #? flushing to get the data id, the data and its value are committed together
+        db.flush()
 
+        value_data = NumericData() if is_numeric(result) else StringData()
+        value_data.data_id = data.id
+        value_data.device_id = payload.device_id
+        value_data.key = DATA_KEY
+        value_data.value = result
+        value_data.created_at = created_at
+        db.add(value_data)
         if is_numeric(result):
-            numeric_data = NumericData()
-            numeric_data.data_id = data.id
-            numeric_data.device_id = payload.device_id
-            numeric_data.key = "data"
-            numeric_data.value = result
-            numeric_data.created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-            db.add(numeric_data)
-            db.commit()
-        else:
-            string_data = StringData()
-            string_data.data_id = data.id
-            string_data.device_id = payload.device_id
-            string_data.key = "data"
-            string_data.value = result
-            string_data.created_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-
-            db.add(string_data)
-            db.commit()
+            NumericDataRollup.upsertNumericDataRollups(rollup_numeric_data([{'device_id': payload.device_id, 'key': DATA_KEY, 'value': float(result), 'created_at': created_at}]), db)
+        db.commit()
 
         return JSONResponse(content = {
             'status': 'ok',
             'message': 'Data added successfully',
             'cid': get_current_cid()
         }, status_code = 201)
+
+def parse_bulk_data(body):
+    #? either a json array or one json object per line (ndjson), an invalid line is only rejecting its item
+    body = body.strip()
+    if body.startswith('['):
+        return json.loads(body)
+
+    items = []
+    for line in body.splitlines():
+        if is_empty(line.strip()):
+            continue
+
+        try:
+            items.append(json.loads(line))
+        except ValueError:
+            items.append(None)
+    return items
+
+def to_created_at(timestamp):
+    if timestamp is None:
+        return datetime.now().strftime(DATE_FORMAT)
+
+    return to_naive(timestamp).strftime(DATE_FORMAT)
+
+def check_bulk_timestamp(timestamp):
+    if timestamp is None:
+        return None
+
+    try:
+        created_at = to_naive(timestamp)
+    except (OverflowError, ValueError):
+        created_at = None
+
+    if created_at is None or not is_accepted_time(created_at):
+        return new_error(400, 'Invalid timestamp, outside the accepted range', 'invalid_timestamp')
+
+    return None
+
+def new_item_result(index, device_id, code, error = None):
+    result = {
+        'index': index,
+        'device_id': device_id,
+        'status': 'ko' if error is not None else 'ok',
+        'code': code
+    }
+
+    if error is not None:
+        result['message'] = error['message']
+        result['i18n_code'] = error['i18n_code']
+    return result
+
+def new_item_error(index, device_id, error):
+    return new_item_result(index, device_id, error['code'], error)
+
+def check_bulk_item(current_user, item, devices, object_types, functions, functions_errors):
+    error = check_bulk_timestamp(item.timestamp)
+    if error is not None:
+        return error, None
+
+    device = devices.get(item.device_id)
+    if not device or (is_false(current_user.is_admin) and device.username != current_user.email):
+        return new_error(404, 'Device not found', 'device_not_found'), None
+
+    if not device.active:
+        return new_error(403, 'Device not active', 'device_not_active'), None
+
+    object_type = object_types.get("{}".format(device.typeobject_id))
+    if not object_type:
+        return new_error(404, 'TypeObject not found', 'typeobject_not_found'), None
+
+    function = functions.get("{}".format(object_type.content.get('decoding_function')))
+    if not function:
+        return new_error(404, 'Decoding function not found', 'decoding_function_not_found'), None
+
+    error = functions_errors.get("{}".format(function.id))
+    if error is None:
+        error = check_invoked_function(new_decoding_invocation(current_user.id, function.id, item.content), function, current_user)
+    return error, object_type
+
+def handle_iot_triggers(trigger_ids, db):
+    trigger_ids = {trigger_id for trigger_id in trigger_ids if not is_not_uuid(trigger_id)}
+    if not trigger_ids:
+        return
+
+    triggers = TriggerEntity.findByIds(trigger_ids, db)
+    if triggers:
+        publish_iot_triggers(triggers)
+
+def get_decoding_error(id, decoded, pending, rejected):
+    if id is None:
+        return new_error(404, 'Decoding function not found', 'decoding_function_not_found')
+
+    if id in pending:
+        return new_error(504, 'Decoding function timeout', 'decoding_function_timeout')
+
+    if decoded[id]['content'].get('result') is None:
+        return new_error(422, 'Decoding function failed', 'decoding_function_failed')
+
+    if id in rejected:
+        return new_error(422, "Invalid decoded data: {}".format(rejected[id]), 'invalid_decoded_data')
+
+    return None
+
+def decode_bulk_data(messages, results, db):
+    invocations = create_decoding_invocations(messages, db)
+    decoded, pending = wait_for_invocations(list(invocations.keys()), db)
+    _, rejected = save_decoded_data(invocations, decoded, db)
+
+    invocation_ids = {message['index']: id for id, message in invocations.items()}
+    for message in messages:
+        index = message['index']
+        error = get_decoding_error(invocation_ids.get(index), decoded, pending, rejected)
+        results[index] = new_item_error(index, message['device_id'], error) if error is not None else new_item_result(index, message['device_id'], 201)
+
+def add_bulk_data(current_user, user_auth, body, db):
+    try:
+        raw_items = parse_bulk_data(body)
+    except ValueError:
+        raw_items = None
+
+    if not isinstance(raw_items, list) or is_empty(raw_items):
+        return JSONResponse(content = {
+            'status': 'ko',
+            'message': 'Invalid bulk data, expecting a json array or ndjson',
+            'i18n_code': 'invalid_bulk_data',
+            'cid': get_current_cid()
+        }, status_code = 400)
+
+    if len(raw_items) > IOT_BULK_MAX_ITEMS:
+        return JSONResponse(content = {
+            'status': 'ko',
+            'message': "Too many items, the maximum is {}".format(IOT_BULK_MAX_ITEMS),
+            'i18n_code': 'bulk_data_too_many_items',
+            'cid': get_current_cid()
+        }, status_code = 413)
+
+    results = [None] * len(raw_items)
+    items = {}
+    for index, raw_item in enumerate(raw_items):
+        try:
+            item = DataBulkItemSchema(**raw_item)
+        except (TypeError, ValidationError):
+            results[index] = new_item_error(index, None, new_error(400, 'Invalid data', 'invalid_data'))
+            continue
+
+        if is_not_uuid(item.device_id):
+            results[index] = new_item_error(index, item.device_id, new_error(404, 'Device not found', 'device_not_found'))
+            continue
+        items[index] = item
+
+    #? the devices, object types and decoding functions are resolved once per batch
+    devices = {"{}".format(device.id): device for device in Device.getDevicesByIds({item.device_id for item in items.values()}, db)} if items else {}
+    object_types = {"{}".format(object_type.id): object_type for object_type in ObjectType.findByIds({device.typeobject_id for device in devices.values()}, db)} if devices else {}
+    function_ids = {object_type.content['decoding_function'] for object_type in object_types.values() if is_not_empty_key(object_type.content, 'decoding_function')}
+    functions = {"{}".format(function.id): function for function in FunctionEntity.findByIds(function_ids, db)} if function_ids else {}
+    functions_errors = {id: check_decoding_function(function) for id, function in functions.items()}
+
+    messages = []
+    trigger_ids = set()
+    for index, item in items.items():
+        error, object_type = check_bulk_item(current_user, item, devices, object_types, functions, functions_errors)
+        if error is not None:
+            results[index] = new_item_error(index, item.device_id, error)
+            continue
+
+        trigger_ids.update(object_type.content.get('triggers') or [])
+        message = new_iot_data_message(item.device_id, object_type.content['decoding_function'], current_user.id, user_auth, item.content, to_created_at(item.timestamp))
+        messages.append((index, message))
+
+    handle_iot_triggers(trigger_ids, db)
+
+    if messages and is_true(IOT_ASYNC_INGESTION):
+        publish_iot_data_batch([message for _, message in messages])
+        for index, message in messages:
+            results[index] = new_item_result(index, message['device_id'], 202)
+    elif messages:
+        decode_bulk_data([{**message, 'index': index} for index, message in messages], results, db)
+
+    codes = {result['code'] for result in results}
+    return JSONResponse(content = {
+        'status': 'ok',
+        'results': results,
+        'cid': get_current_cid()
+    }, status_code = codes.pop() if len(codes) == 1 and codes <= {201, 202} else 207)
+
+def get_data_aggregates(current_user, device_id, key, interval, start, end, percentiles, db):
+    if is_not_uuid(device_id):
+        return to_error_response(new_error(404, 'Device not found', 'device_not_found'))
+
+    existing_device = Device.getDeviceById(device_id, db) if current_user.is_admin else Device.getUserDeviceById(current_user.email, device_id, db)
+    if not existing_device:
+        return to_error_response(new_error(404, 'Device not found', 'device_not_found'))
+
+    if interval not in AGGREGATE_INTERVALS:
+        return to_error_response(new_error(400, "Invalid interval, expecting one of {}".format(", ".join(AGGREGATE_INTERVALS)), 'invalid_aggregate_interval'))
+
+    try:
+        percentiles = parse_percentiles(percentiles)
+    except ValueError:
+        return to_error_response(new_error(400, 'Invalid percentiles, expecting comma separated values between 0 and 100', 'invalid_aggregate_percentiles'))
+
+    seconds = AGGREGATE_INTERVALS[interval]
+    start, end = to_naive(start), to_naive(end)
+    end = end if end is not None else datetime.now()
+    start = start if start is not None else end - timedelta(seconds = seconds * (IOT_AGGREGATE_MAX_BUCKETS - 1))
+    if start >= end:
+        return to_error_response(new_error(400, 'The start date must be before the end date', 'invalid_aggregate_range'))
+
+    if count_buckets(start, end, seconds) > IOT_AGGREGATE_MAX_BUCKETS:
+        return to_error_response(new_error(400, "Too many buckets, the maximum is {}".format(IOT_AGGREGATE_MAX_BUCKETS), 'aggregate_too_many_buckets'))
+
+    return JSONResponse(content = {
+        'status': 'ok',
+        'device_id': device_id,
+        'key': key,
+        'interval': interval,
+        'start': start.isoformat(),
+        'end': end.isoformat(),
+        'buckets': get_aggregates(device_id, key, interval, start, end, percentiles, db),
+        'cid': get_current_cid()
+    }, status_code = 200)
+
@@ -7,23 +7,12 @@ from sqlalchemy.exc import IntegrityError
 from entities.StorageKV import StorageKV
 from schemas.User import UserSchema
 from schemas.StorageKV import StorageKVCreateRequest, StorageKVUpdateRequest
-from database.redis_db import redis_client
+from database.redis_db import async_redis_client, redis_client
 from utils.common import is_empty, is_not_empty
 from utils.observability.cid import get_current_cid
-from utils.redis import create_redis_key, get_redis_keys_for_user
+from utils.redis import aget_redis_keys_for_user, create_redis_key
 
-def _store_with_ttl(user_id, key, payload, ttl, db):
-    StorageKV.deleteUserStorageKV(user_id, key, db)
-
-    redis_key = create_redis_key(user_id, key)
-    ttl_seconds = ttl * 3600
-    
-    redis_client.setex(
-        redis_key,
-        ttl_seconds,
-        json.dumps(payload)
-    )
-    
+def _stored_with_ttl_response(key, payload):
     return JSONResponse(content = {
         'status': 'ok',
         'message': 'Storage key successfully created/updated with TTL',
@@ -33,28 +22,34 @@ def _store_with_ttl(user_id, key, payload, ttl, db):
         'cid': get_current_cid()
     }, status_code = 201)
 
-def _store_in_database(user_id, key, payload, db, is_update, key_existed=False):
-    redis_key = create_redis_key(user_id, key)
-    redis_client.delete(redis_key)
+def _stored_response(key, payload, is_update):
+    return JSONResponse(content = {
+        'status': 'ok',
+        'message': 'Storage key successfully updated' if is_update else 'Storage key successfully created',
+        'key': key,
+        'payload': payload,
+        'i18n_code': 'storage_kv_updated' if is_update else 'storage_kv_created',
+        'cid': get_current_cid()
+    }, status_code = 200 if is_update else 201)
 
-    existing_kv = StorageKV.findUserStorageKVByKey(user_id, key, db)
+def _conflict_response(key):
+    return JSONResponse(content = {
+        'status': 'ko',
+        'error': f"Storage key '{key}' already exists",
+        'i18n_code': 'storage_kv_conflict',
+        'cid': get_current_cid()
+    }, status_code = 409)
 
-    if existing_kv:
-        updated_kv = StorageKV.updateStorageKV(user_id, key, payload, db)
-        if updated_kv:
-            status_code = 200 if (is_update or key_existed) else 201
-            message = 'Storage key successfully updated' if (is_update or key_existed) else 'Storage key successfully created'
-            i18n_code = 'storage_kv_updated' if (is_update or key_existed) else 'storage_kv_created'
-            return JSONResponse(content = {
-                'status': 'ok',
-                'message': message,
-                'key': key,
-                'payload': payload,
-                'i18n_code': i18n_code,
-                'cid': get_current_cid()
-            }, status_code = status_code)
-
-    new_storage_kv = StorageKV(
+def _not_found_response(key):
+    return JSONResponse(content = {
+        'status': 'ko',
+        'error': f"Storage key '{key}' not found",
+        'i18n_code': 'storage_kv_not_found',
+        'cid': get_current_cid()
+    }, status_code = 404)
+
+def _new_storage_kv(user_id, key, payload):
+    return StorageKV(
         id=uuid.uuid4(),
         storage_key=key,
         user_id=user_id,
@@ -62,69 +57,85 @@ def _store_in_database(user_id, key, payload, db, is_update, key_existed=False):
         created_at=datetime.now(),
         updated_at=datetime.now()
     )
-    
+
+def _store_with_ttl(user_id, key, payload, ttl, db):
+    StorageKV.deleteUserStorageKV(user_id, key, db)
+    redis_client.setex(create_redis_key(user_id, key), ttl * 3600, json.dumps(payload))
+    return _stored_with_ttl_response(key, payload)
+
+def _store_in_database(user_id, key, payload, db, is_update, key_existed=False):
+    redis_client.delete(create_redis_key(user_id, key))
+
+    existing_kv = StorageKV.findUserStorageKVByKey(user_id, key, db)
+    if existing_kv:
+        updated_kv = StorageKV.updateStorageKV(user_id, key, payload, db)
+        if updated_kv:
+            return _stored_response(key, payload, is_update or key_existed)
+
     try:
-        new_storage_kv.save(db)
-        return JSONResponse(content = {
-            'status': 'ok',
-            'message': 'Storage key successfully created',
-            'key': key,
-            'payload': payload,
-            'i18n_code': 'storage_kv_created',
-            'cid': get_current_cid()
-        }, status_code = 201)
+        _new_storage_kv(user_id, key, payload).save(db)
+        return _stored_response(key, payload, False)
     except IntegrityError:
         db.rollback()
-        return JSONResponse(content = {
-            'status': 'ko',
-            'error': f"Storage key '{key}' already exists",
-            'i18n_code': 'storage_kv_conflict',
-            'cid': get_current_cid()
-        }, status_code = 409)
+        return _conflict_response(key)
+
+async def _astore_with_ttl(user_id, key, payload, ttl, db):
+    await StorageKV.adeleteUserStorageKV(user_id, key, db)
+    await async_redis_client.setex(create_redis_key(user_id, key), ttl * 3600, json.dumps(payload))
+    return _stored_with_ttl_response(key, payload)
+
+async def _astore_in_database(user_id, key, payload, db, is_update, key_existed=False):
+    await async_redis_client.delete(create_redis_key(user_id, key))
+
+    existing_kv = await StorageKV.afindUserStorageKVByKey(user_id, key, db)
+    if existing_kv:
+        updated_kv = await StorageKV.aupdateStorageKV(user_id, key, payload, db)
+        if updated_kv:
+            return _stored_response(key, payload, is_update or key_existed)
+
+    try:
+        await _new_storage_kv(user_id, key, payload).asave(db)
+        return _stored_response(key, payload, False)
+    except IntegrityError:
+        await db.rollback()
+        return _conflict_response(key)
 
-def create_kv(current_user: UserSchema, payload: StorageKVCreateRequest, db):
+async def create_kv(current_user: UserSchema, payload: StorageKVCreateRequest, db):
     user_id = current_user.id
     storage_key = payload.key
 
-    existing_kv = StorageKV.findUserStorageKVByKey(user_id, storage_key, db)
-    redis_key = create_redis_key(user_id, storage_key)
-    existing_in_redis = redis_client.exists(redis_key)
+    existing_kv = await StorageKV.afindUserStorageKVByKey(user_id, storage_key, db)
+    existing_in_redis = await async_redis_client.exists(create_redis_key(user_id, storage_key))
     key_existed = existing_kv is not None or existing_in_redis
 
     if is_not_empty(payload.ttl) and payload.ttl > 0:
-        return _store_with_ttl(user_id, storage_key, payload.payload, payload.ttl, db)
+        return await _astore_with_ttl(user_id, storage_key, payload.payload, payload.ttl, db)
     else:
-        return _store_in_database(user_id, storage_key, payload.payload, db, False, key_existed)
+        return await _astore_in_database(user_id, storage_key, payload.payload, db, False, key_existed)
 
-def update_kv(current_user: UserSchema, key: str, payload: StorageKVUpdateRequest, db):
+async def update_kv(current_user: UserSchema, key: str, payload: StorageKVUpdateRequest, db):
     user_id = current_user.id
 
-    existing_in_db = StorageKV.findUserStorageKVByKey(user_id, key, db)
-    redis_key = create_redis_key(user_id, key)
-    existing_in_redis = redis_client.exists(redis_key)
-    
+    existing_in_db = await StorageKV.afindUserStorageKVByKey(user_id, key, db)
+    existing_in_redis = await async_redis_client.exists(create_redis_key(user_id, key))
+
     if is_empty(existing_in_db) and not existing_in_redis:
-        return JSONResponse(content = {
-            'status': 'ko',
-            'error': f"Storage key '{key}' not found",
-            'i18n_code': 'storage_kv_not_found',
-            'cid': get_current_cid()
-        }, status_code = 404)
+        return _not_found_response(key)
 
     if is_not_empty(payload.ttl) and payload.ttl > 0:
-        return _store_with_ttl(user_id, key, payload.payload, payload.ttl, db)
+        return await _astore_with_ttl(user_id, key, payload.payload, payload.ttl, db)
     else:
-        return _store_in_database(user_id, key, payload.payload, db, True)
+        return await _astore_in_database(user_id, key, payload.payload, db, True)
 
-def get_kv(current_user: UserSchema, key: str, db):
+async def get_kv(current_user: UserSchema, key: str, db):
     user_id = current_user.id
     redis_key = create_redis_key(user_id, key)
-    redis_value = redis_client.get(redis_key)
-    
+    async with async_redis_client.pipeline(transaction = False) as pipe:
+        redis_value, ttl_seconds = await pipe.get(redis_key).ttl(redis_key).execute()
+
     if redis_value:
-        ttl_seconds = redis_client.ttl(redis_key)
         ttl_hours = round(ttl_seconds / 3600, 2) if ttl_seconds > 0 else None
-        
+
         return JSONResponse(content = {
             'status': 'ok',
             'key': key,
@@ -133,16 +144,11 @@ def get_kv(current_user: UserSchema, key: str, db):
             'ttl': ttl_hours
         }, status_code = 200)
 
-    storage_kv = StorageKV.findUserStorageKVByKey(user_id, key, db)
-    
+    storage_kv = await StorageKV.afindUserStorageKVByKey(user_id, key, db)
+
     if is_empty(storage_kv):
-        return JSONResponse(content = {
-            'status': 'ko',
-            'error': f"Storage key '{key}' not found",
-            'i18n_code': 'storage_kv_not_found',
-            'cid': get_current_cid()
-        }, status_code = 404)
-    
+        return _not_found_response(key)
+
     return JSONResponse(content = {
         'status': 'ok',
         'key': key,
@@ -153,12 +159,12 @@ def get_kv(current_user: UserSchema, key: str, db):
         'ttl': None
     }, status_code = 200)
 
-def get_all_kvs(current_user: UserSchema, search: str = None, start_index: int = 0, max_results: int = 20, db = None):
+async def get_all_kvs(current_user: UserSchema, search: str = None, start_index: int = 0, max_results: int = 20, db = None):
     user_id = current_user.id
     if search and search.strip():
-        storage_kvs = StorageKV.searchUserStorageKVsByKey(user_id, search, db)
+        storage_kvs = await StorageKV.asearchUserStorageKVsByKey(user_id, search, db)
     else:
-        storage_kvs = StorageKV.getUserStorageKVs(user_id, db)
+        storage_kvs = await StorageKV.agetUserStorageKVs(user_id, db)
 
     db_results = []
     for kv in storage_kvs:
@@ -171,8 +177,8 @@ def get_all_kvs(current_user: UserSchema, search: str = None, start_index: int =
             'ttl': None
         })
 
-    redis_results = get_redis_keys_for_user(user_id, search)
-    
+    redis_results = await aget_redis_keys_for_user(user_id, search)
+
     combined_results = {}
     for item in db_results:
         combined_results[item['key']] = item
@@ -182,7 +188,7 @@ def get_all_kvs(current_user: UserSchema, search: str = None, start_index: int =
     sorted_results = sorted(list(combined_results.values()), key=lambda x: x['key'])
     total_count = len(sorted_results)
     paginated_results = sorted_results[start_index:start_index + max_results]
-    
+
     return JSONResponse(content = {
         'status': 'ok',
         'items': paginated_results,
@@ -192,20 +198,14 @@ def get_all_kvs(current_user: UserSchema, search: str = None, start_index: int =
         'max_results': max_results
     }, status_code = 200)
 
-def delete_kv(current_user: UserSchema, key: str, db):
+async def delete_kv(current_user: UserSchema, key: str, db):
     user_id = current_user.id
-    redis_key = create_redis_key(user_id, key)
-    redis_deleted = redis_client.delete(redis_key) > 0
-    db_deleted = StorageKV.deleteUserStorageKV(user_id, key, db)
+    redis_deleted = await async_redis_client.delete(create_redis_key(user_id, key)) > 0
+    db_deleted = await StorageKV.adeleteUserStorageKV(user_id, key, db)
 
     if is_empty(redis_deleted) and is_empty(db_deleted):
-        return JSONResponse(content = {
-            'status': 'ko',
-            'error': f"Storage key '{key}' not found",
-            'i18n_code': 'storage_kv_not_found',
-            'cid': get_current_cid()
-        }, status_code = 404)
-    
+        return _not_found_response(key)
+
     return JSONResponse(content = {
         'status': 'ok',
         'message': f"Key '{key}' successfully deleted",
@@ -1,8 +1,10 @@
 import nats
-import json
 import asyncio
 
-from utils.consumer import CONSUMER_SLEEP_TIME
+from nats.js.api import ConsumerConfig
+
+from database.nats_connection import nats_connection
+from utils.consumer import CONSUMER_SLEEP_TIME, ConsumerPool, get_prefetch
 from utils.eventloop import get_event_loop
 from utils.logger import log_msg
 from utils.nats import close_nats, get_creds_file_if_exists, get_nats_url
@@ -15,14 +17,25 @@ class JetstreamClient():
         return _nc, _js
 
     async def apublish(self, group, channel, payload):
-        _nc, _js = await self.stream(group, channel)
-        await _js.publish(channel, json.dumps(payload).encode('UTF-8'))
-        await close_nats(_nc)
+        await asyncio.wrap_future(self.publish(group, channel, payload))
 
-    async def aconsume(self, group, channel, handler):
+    async def aconsume(self, group, channel, handler, concurrency = 1, prefetch = None):
         _nc, _js = await self.stream(group, channel)
+        pool = ConsumerPool(concurrency)
+        max_pending = get_prefetch(concurrency, prefetch)
+
+        async def ack(msg):
+            await msg.ack()
+
+        async def nack(msg):
+            await msg.nak()
+
+        async def dispatch(msg):
+            await pool.submit(handler, msg, ack, nack)
+
         try:
-            await _js.subscribe(channel, group, durable = group, cb = handler)
+            #? max_ack_pending only applies when the durable consumer is created, the pending limit bounds the client side buffer
+            await _js.subscribe(channel, group, durable = group, cb = dispatch, manual_ack = True, config = ConsumerConfig(max_ack_pending = max_pending), pending_msgs_limit = max_pending)
             await asyncio.sleep(CONSUMER_SLEEP_TIME)
         finally:
             await close_nats(_nc)
@@ -30,9 +43,9 @@ class JetstreamClient():
             exit(1)
 
     def publish(self, group, channel, payload):
-        asyncio.run(self.apublish(group, channel, payload))
+        return nats_connection.jspublish(group, channel, payload)
 
-    def consume(self, group, channel, handler):
+    def consume(self, group, channel, handler, concurrency = 1, prefetch = None):
         loop = get_event_loop()
-        loop.run_until_complete(self.aconsume(group, channel, handler))
+        loop.run_until_complete(self.aconsume(group, channel, handler, concurrency, prefetch))
         loop.run_forever()
@@ -1,8 +1,8 @@
 import nats
-import json
 import asyncio
 
-from utils.consumer import CONSUMER_GROUP, CONSUMER_SLEEP_TIME
+from database.nats_connection import nats_connection
+from utils.consumer import CONSUMER_GROUP, CONSUMER_SLEEP_TIME, ConsumerPool
 from utils.eventloop import get_event_loop
 
 from utils.logger import log_msg
@@ -14,14 +14,18 @@ class NatsClient():
         return _nc
 
     async def apublish(self, channel, payload):
-        _nc = await self.connect()
-        await _nc.publish(channel, json.dumps(payload).encode('UTF-8'))
-        await close_nats(_nc)
+        await asyncio.wrap_future(self.publish(channel, payload))
 
-    async def aconsume(self, channel, handler):
+    async def aconsume(self, channel, handler, concurrency = 1):
         _nc = await self.connect()
+        pool = ConsumerPool(concurrency)
+
+        async def dispatch(msg):
+            await pool.submit(handler, msg)
+
         try:
-            await _nc.subscribe(channel, CONSUMER_GROUP, cb = handler)
+            #? core nats has no redelivery: keeping the default pending limits to avoid dropping messages while the pool is busy
+            await _nc.subscribe(channel, CONSUMER_GROUP, cb = dispatch)
             await asyncio.sleep(CONSUMER_SLEEP_TIME)
         finally:
             await close_nats(_nc)
@@ -29,9 +33,9 @@ class NatsClient():
             exit(1)
 
     def publish(self, channel, payload):
-        asyncio.run(self.apublish(channel, payload))
+        return nats_connection.publish(channel, payload)
 
-    def consume(self, channel, handler):
+    def consume(self, channel, handler, concurrency = 1):
         loop = get_event_loop()
-        loop.run_until_complete(self.aconsume(channel, handler))
+        loop.run_until_complete(self.aconsume(channel, handler, concurrency))
         loop.run_forever()
@@ -0,0 +1,128 @@
+import atexit
+import json
+import asyncio
+import nats
+
+from nats.js.errors import NoStreamResponseError
+
+from utils.common import get_env_int
+from utils.eventloop import run_in_background_loop
+from utils.logger import log_msg
+from utils.nats import close_nats, get_creds_file_if_exists, get_nats_url
+
+_max_reconnect_attempts = get_env_int('NATS_MAX_RECONNECT_ATTEMPTS', -1)
+_reconnect_time_wait = get_env_int('NATS_RECONNECT_TIME_WAIT', 2)
+_publish_timeout = get_env_int('NATS_PUBLISH_TIMEOUT', 10)
+_shutdown_timeout = get_env_int('NATS_SHUTDOWN_TIMEOUT', 5)
+
+def encode_payload(payload):
+    return json.dumps(payload).encode('UTF-8')
+
+async def on_disconnected():
+    log_msg("WARN", "[NatsConnection][on_disconnected] connection lost, reconnecting...")
+
+async def on_reconnected():
+    log_msg("INFO", "[NatsConnection][on_reconnected] connection restored")
+
+async def on_error(e):
+    log_msg("WARN", "[NatsConnection][on_error] e.type = {}, e.msg = {}".format(type(e), e))
+
+class NatsConnection():
+    def __init__(self):
+        self._nc = None
+        self._js = None
+        self._lock = None
+        self._streams = set()
+
+    async def connection(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            if self._nc is None or self._nc.is_closed:
+                log_msg("DEBUG", "[NatsConnection][connection] opening a new persistent connection")
+                self._nc = await nats.connect(
+                    get_nats_url(),
+                    user_credentials = get_creds_file_if_exists(),
+                    max_reconnect_attempts = _max_reconnect_attempts,
+                    reconnect_time_wait = _reconnect_time_wait,
+                    disconnected_cb = on_disconnected,
+                    reconnected_cb = on_reconnected,
+                    error_cb = on_error
+                )
+                self._js = None
+                self._streams.clear()
+        return self._nc
+
+    async def jetstream(self, group, channel):
+        nc = await self.connection()
+        if self._js is None:
+            self._js = nc.jetstream()
+
+        stream = (group, channel)
+        if stream not in self._streams:
+            await self._js.add_stream(name = channel, subjects = [group])
+            self._streams.add(stream)
+        return self._js
+
+    async def apublish(self, channel, payload):
+        nc = await self.connection()
+        await nc.publish(channel, encode_payload(payload))
+
+    async def ajspublish(self, group, channel, payload):
+        js = await self.jetstream(group, channel)
+        try:
+            await js.publish(channel, encode_payload(payload), timeout = _publish_timeout)
+        except NoStreamResponseError:
+            #? the stream has been removed on the server side since we declared it
+            self._streams.discard((group, channel))
+            js = await self.jetstream(group, channel)
+            await js.publish(channel, encode_payload(payload), timeout = _publish_timeout)
+
+    async def asubscribe(self, channel, handler):
+        async def on_message(msg):
+            try:
+                handler(json.loads(msg.data.decode()))
+            except Exception as e:
+                log_msg("ERROR", "[NatsConnection][subscribe] unexpected error handling message on channel = {}: e.type = {}, e.msg = {}".format(channel, type(e), e))
+
+        nc = await self.connection()
+        return await nc.subscribe(channel, cb = on_message)
+
+    async def aclose(self):
+        if self._nc is not None and not self._nc.is_closed:
+            await close_nats(self._nc)
+
+    def submit(self, coro, action):
+        future = run_in_background_loop(coro)
+
+        def on_done(f):
+            if f.cancelled():
+                log_msg("WARN", "[NatsConnection][{}] cancelled".format(action))
+            elif f.exception() is not None:
+                e = f.exception()
+                log_msg("ERROR", "[NatsConnection][{}] failed: e.type = {}, e.msg = {}".format(action, type(e), e))
+
+        future.add_done_callback(on_done)
+        return future
+
+    def publish(self, channel, payload):
+        return self.submit(self.apublish(channel, payload), "publish")
+
+    def jspublish(self, group, channel, payload):
+        return self.submit(self.ajspublish(group, channel, payload), "jspublish")
+
+    def subscribe(self, channel, handler):
+        return self.submit(self.asubscribe(channel, handler), "subscribe")
+
+    def close(self):
+        if self._nc is None:
+            return
+
+        try:
+            run_in_background_loop(self.aclose()).result(timeout = _shutdown_timeout)
+        except Exception as e:
+            log_msg("WARN", "[NatsConnection][close] unable to drain the connection: e.type = {}, e.msg = {}".format(type(e), e))
+
+nats_connection = NatsConnection()
+atexit.register(nats_connection.close)
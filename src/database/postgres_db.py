@@ -1,11 +1,13 @@
 import os
 
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from sqlalchemy.pool import QueuePool
 
 from exceptions.CwHTTPException import CwHTTPException
-from utils.common import get_env_int
+from utils.common import get_env_bool, get_env_int
 from utils.logger import log_msg
 
 postgres_db_name = os.getenv("POSTGRES_DB")
@@ -17,8 +19,11 @@ postgres_pool_size = get_env_int("POSTGRES_SIZE_POOL", 30)
 postgres_max_overflow = get_env_int("POSTGRES_MAX_OVERFLOW", 10)
 postgres_pool_timeout = get_env_int("POSTGRES_POOL_TIMEOUT", 30)
 postgres_pool_recycle = get_env_int("POSTGRES_POOL_RECYCLE", 1800)
+postgres_async_enabled = get_env_bool("POSTGRES_ASYNC_ENABLED", False)
+postgres_async_driver = os.getenv("POSTGRES_ASYNC_DRIVER", "asyncpg")
 
 POSTGRES_URL = f"postgresql://{postgres_user}:{postgres_password}@{postgres_host}:{postgres_port}/{postgres_db_name}"
+POSTGRES_ASYNC_URL = f"postgresql+{postgres_async_driver}://{postgres_user}:{postgres_password}@{postgres_host}:{postgres_port}/{postgres_db_name}"
 
 dbEngine = create_engine(
     POSTGRES_URL,
@@ -33,6 +38,9 @@ dbEngine = create_engine(
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=dbEngine)
 
+#? same behavior as the AsyncSession: the entities are not expired on commit because lazy loads can't be awaited
+ThreadedSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=dbEngine)
+
 Base = declarative_base()
 
 def get_db():
@@ -47,3 +55,96 @@ def get_db():
         raise e
     finally:
         db.close()
+
+_async_engine = None
+_async_session_local = None
+
+def get_async_engine():
+    global _async_engine, _async_session_local
+    if _async_engine is None:
+        _async_engine = create_async_engine(
+            POSTGRES_ASYNC_URL,
+            echo=False,
+            pool_size=postgres_pool_size,
+            max_overflow=postgres_max_overflow,
+            pool_timeout=postgres_pool_timeout,
+            pool_recycle=postgres_pool_recycle,
+            pool_pre_ping=True
+        )
+        _async_session_local = async_sessionmaker(bind=_async_engine, autoflush=False, expire_on_commit=False)
+    return _async_engine
+
+async def dispose_async_engine():
+    global _async_engine, _async_session_local
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = None
+        _async_session_local = None
+
+class ThreadedAsyncSession():
+    #? subset of the AsyncSession api on top of the sync engine, each io is offloaded to the threadpool
+    def __init__(self, session):
+        self.sync_session = session
+
+    def add(self, instance):
+        self.sync_session.add(instance)
+
+    def add_all(self, instances):
+        self.sync_session.add_all(instances)
+
+    def expunge(self, instance):
+        self.sync_session.expunge(instance)
+
+    async def execute(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, statement, *args, **kwargs)
+
+    async def scalar(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, statement, *args, **kwargs)
+
+    async def scalars(self, statement, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalars, statement, *args, **kwargs)
+
+    async def get(self, entity, ident, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, entity, ident, **kwargs)
+
+    async def merge(self, instance, **kwargs):
+        return await run_in_threadpool(self.sync_session.merge, instance, **kwargs)
+
+    async def delete(self, instance):
+        await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def flush(self):
+        await run_in_threadpool(self.sync_session.flush)
+
+    async def commit(self):
+        await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        await run_in_threadpool(self.sync_session.rollback)
+
+    async def refresh(self, instance, *args, **kwargs):
+        await run_in_threadpool(self.sync_session.refresh, instance, *args, **kwargs)
+
+    async def close(self):
+        await run_in_threadpool(self.sync_session.close)
+
+def async_session():
+    if postgres_async_enabled:
+        get_async_engine()
+        return _async_session_local()
+
+    return ThreadedAsyncSession(ThreadedSessionLocal())
+
+async def get_async_db():
+    #? AsyncSession with POSTGRES_ASYNC_ENABLED=true, otherwise the sync engine offloaded to the threadpool
+    db = async_session()
+    try:
+        yield db
+    except CwHTTPException as cwe:
+        log_msg("WARN", f"[get_async_db] unexpected CwHTTPException: e.msg = {cwe.message}, e.status_code = {cwe.status_code}")
+        raise cwe
+    except Exception as e:
+        log_msg("ERROR", f"[get_async_db] unexpected error: e.type = {type(e).__name__}, e.file = {__file__}, e.lno = {e.__traceback__.tb_lineno}, e.msg={str(e)}")
+        raise e
+    finally:
+        await db.close()
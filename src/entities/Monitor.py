@@ -1,6 +1,6 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, Boolean
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, Boolean, cast, column, update, values
+from sqlalchemy.dialects.postgresql import JSONB, UUID
 from fastapi_utils.guid_type import GUID_SERVER_DEFAULT_POSTGRESQL
 from database.postgres_db import Base
 from database.types import CachedGUID
@@ -19,6 +19,7 @@ class Monitor(Base):
     expected_http_code = Column(String, default='20*')
     expected_contain = Column(String)
     timeout = Column(Integer, default=30)
+    check_interval = Column(Integer)
     username = Column(String)
     password = Column(String)
     headers = Column(JSONB, default=dict)
@@ -96,6 +97,7 @@ class Monitor(Base):
             'expected_http_code': payload.expected_http_code,
             'expected_contain': payload.expected_contain,
             'timeout': payload.timeout,
+            'check_interval': payload.check_interval,
             'username': payload.username,
             'password': payload.password,
             'headers': Monitor._serialize_headers(payload.headers),
@@ -134,7 +136,13 @@ class Monitor(Base):
         db.commit()
  
     @staticmethod
-    def updateMonitorStatus(monitor_id, status, response_time, db):
-        db.query(Monitor).filter(Monitor.id == monitor_id).update({'status': status, 'response_time': response_time})
-        db.commit()
+    def updateMonitorsStatus(statuses, db):
+        #? a single UPDATE ... FROM (VALUES ...) for all the results instead of one update and commit per monitor
+        if not statuses:
+            return
 
+        rows = values(column('id', String), column('status', String), column('response_time', String), name = 'statuses').data([
+            (str(s['id']), s['status'], s['response_time']) for s in statuses
+        ])
+        db.execute(update(Monitor).where(Monitor.id == cast(rows.c.id, UUID)).values(status = rows.c.status, response_time = rows.c.response_time).execution_options(synchronize_session = False))
+        db.commit()
@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, func, select, update
 from sqlalchemy.dialects.postgresql import JSONB
 from fastapi_utils.guid_type import GUID_SERVER_DEFAULT_POSTGRESQL
 from database.postgres_db import Base
@@ -20,6 +20,12 @@ class StorageKV(Base):
         db.refresh(self)
         return self
 
+    async def asave(self, db):
+        db.add(self)
+        await db.commit()
+        await db.refresh(self)
+        return self
+
     @staticmethod
     def getUserStorageKVs(user_id, db):
         storage_kvs = db.query(StorageKV).filter(StorageKV.user_id == user_id).all()
@@ -92,3 +98,47 @@ class StorageKV(Base):
             db.commit()
             return True
         return False
+
+    @staticmethod
+    async def agetUserStorageKVs(user_id, db):
+        result = await db.scalars(select(StorageKV).filter(StorageKV.user_id == user_id))
+        return result.all()
+
+    @staticmethod
+    async def asearchUserStorageKVsByKey(user_id, search_term, db):
+        search_pattern = f"%{search_term}%"
+        result = await db.scalars(select(StorageKV).filter(
+            StorageKV.user_id == user_id,
+            func.lower(StorageKV.storage_key).like(func.lower(search_pattern))
+        ))
+        return result.all()
+
+    @staticmethod
+    async def afindUserStorageKVByKey(user_id, storage_key, db):
+        result = await db.scalars(select(StorageKV).filter(
+            StorageKV.user_id == user_id,
+            StorageKV.storage_key == storage_key
+        ).limit(1))
+        return result.first()
+
+    @staticmethod
+    async def aupdateStorageKV(user_id, storage_key, payload, db):
+        storage_kv = await StorageKV.afindUserStorageKVByKey(user_id, storage_key, db)
+        if storage_kv:
+            await db.execute(update(StorageKV).filter(
+                StorageKV.user_id == user_id,
+                StorageKV.storage_key == storage_key
+            ).values(payload = payload, updated_at = datetime.now()))
+            await db.commit()
+            await db.refresh(storage_kv)
+            return storage_kv
+        return None
+
+    @staticmethod
+    async def adeleteUserStorageKV(user_id, storage_key, db):
+        storage_kv = await StorageKV.afindUserStorageKVByKey(user_id, storage_key, db)
+        if storage_kv:
+            await db.delete(storage_kv)
+            await db.commit()
+            return True
+        return False
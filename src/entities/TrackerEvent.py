@@ -0,0 +1,60 @@
+from sqlalchemy import BigInteger, Column, DateTime, Index, String, Text, func, insert, select, text
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from database.postgres_db import Base
+
+class TrackerEvent(Base):
+    __tablename__ = 'tracker_event'
+    __table_args__ = (
+        Index('idx_tracker_event_website_time', 'website', 'time'),
+        { 'postgresql_partition_by': 'RANGE (time)' }
+    )
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    website = Column(String(255), nullable=False)
+    time = Column(DateTime, primary_key=True, nullable=False)
+    host = Column(String(255))
+    referrer = Column(Text)
+    user_agent = Column(Text)
+    device = Column(String(50))
+    browser = Column(String(100))
+    os = Column(String(50))
+    country = Column(String(10))
+    city = Column(String(255))
+
+    @staticmethod
+    def createMonthlyPartition(month, next_month, db):
+        db.execute(text("CREATE TABLE IF NOT EXISTS tracker_event_{} PARTITION OF tracker_event FOR VALUES FROM ('{}') TO ('{}')".format(
+            month.strftime("%Y%m"),
+            month.strftime("%Y-%m-%d"),
+            next_month.strftime("%Y-%m-%d")
+        )))
+        db.commit()
+
+    @staticmethod
+    def insertTrackerEvents(events, db):
+        db.execute(insert(TrackerEvent), events)
+
+class TrackerRollup(Base):
+    __tablename__ = 'tracker_rollup'
+    website = Column(String(255), primary_key=True)
+    bucket = Column(DateTime, primary_key=True)
+    dimension = Column(String(20), primary_key=True)
+    value = Column(String(255), primary_key=True)
+    hits = Column(BigInteger, nullable=False, default=0)
+
+    @staticmethod
+    def upsertTrackerRollups(rollups, db):
+        stmt = pg_insert(TrackerRollup)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[TrackerRollup.website, TrackerRollup.bucket, TrackerRollup.dimension, TrackerRollup.value],
+            set_={ 'hits': TrackerRollup.hits + stmt.excluded.hits }
+        ), rollups)
+
+    @staticmethod
+    def getTrackerRollups(website, dimension, granularity, start, end, db):
+        bucket = func.date_trunc(granularity, TrackerRollup.bucket).label('bucket')
+        return db.execute(
+            select(bucket, TrackerRollup.value, func.sum(TrackerRollup.hits).label('hits'))
+            .where(TrackerRollup.website == website, TrackerRollup.dimension == dimension, TrackerRollup.bucket >= start, TrackerRollup.bucket < end)
+            .group_by(bucket, TrackerRollup.value)
+            .order_by(bucket, TrackerRollup.value)
+        ).all()
@@ -12,6 +12,7 @@ from entities.Apikeys import ApiKeys
 from entities.SupportTicketLog import SupportTicketLog
 from entities.SupportTicket import SupportTicket
 
+from utils.auth_cache import invalidate_principal
 from utils.common import generate_hash_password
 
 class User(Base):
@@ -68,21 +69,25 @@ class User(Base):
     def deleteUserById(userId, db):
         db.query(User).filter(User.id == userId).delete()
         db.commit()
+        invalidate_principal(userId)
 
     @staticmethod
     def updateConfirmation(userId, confirmedStatus, db):
         db.query(User).filter(User.id == userId).update({"confirmed": confirmedStatus})
         db.commit()
+        invalidate_principal(userId)
 
     @staticmethod
     def updateUserRole(userId, RoleStatus, db):
         db.query(User).filter(User.id == userId).update({"is_admin": RoleStatus})
         db.commit()
+        invalidate_principal(userId)
 
     @staticmethod
     def updateUser(id, payload, db):
         db.query(User).filter(User.id == id).update({"email": payload.email, "company_name": payload.company_name, "registration_number": payload.registration_number, "address": payload.address, "contact_info": payload.contact_info})
         db.commit()
+        invalidate_principal(id)
 
     @staticmethod
     def adminUpdateUser(id, payload, db):
@@ -110,21 +115,25 @@ class User(Base):
             }
         })
         db.commit()
+        invalidate_principal(id)
 
     @staticmethod
     def updateUserEmail(id, email, db):
         db.query(User).filter(User.id == id).update({"email": email})
         db.commit()
+        invalidate_principal(id)
 
     @staticmethod
     def updateUserPassword(id, password, db):
         db.query(User).filter(User.id == id).update({"password": generate_hash_password(password)})
         db.commit()
+        invalidate_principal(id)
 
     @staticmethod
     def updateUserPasswordAndConfirm(id, password, db):
         db.query(User).filter(User.id == id).update({"password": generate_hash_password(password), "confirmed": True})
         db.commit()
+        invalidate_principal(id)
 
     @staticmethod
     def getAllUsers(db):
@@ -27,6 +27,10 @@ class FunctionEntity(Base):
     @staticmethod
     def findById(function_id, db):
         return db.query(FunctionEntity).filter(FunctionEntity.id == function_id).first()
+
+    @staticmethod
+    def findByIds(function_ids, db):
+        return db.query(FunctionEntity).filter(FunctionEntity.id.in_(function_ids)).all()
     
     @staticmethod
     def findUserFunctionById(user_id, function_id, db):
@@ -27,6 +27,10 @@ class TriggerEntity(Base):
     def findById(trigger_id, db):
         return db.query(TriggerEntity).filter(TriggerEntity.id == trigger_id).first()
     
+    @staticmethod
+    def findByIds(trigger_ids, db):
+        return db.query(TriggerEntity).filter(TriggerEntity.id.in_(trigger_ids)).all()
+
     @staticmethod
     def findUserTriggerById(user_id, trigger_id, db):
         return db.query(TriggerEntity).filter(TriggerEntity.owner_id == user_id, TriggerEntity.id == trigger_id).first()
@@ -1,42 +1,149 @@
-from sqlalchemy import Column, ForeignKey, String, Float
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Index, String, Float, func, insert, select, text, tuple_
+from sqlalchemy.dialects.postgresql import JSONB, array, insert as pg_insert
 from fastapi_utils.guid_type import GUID_SERVER_DEFAULT_POSTGRESQL
 from database.postgres_db import Base
 from database.types import CachedGUID
 
-class Data(Base):
+def get_bucket(column, seconds):
+    #? equivalent of date_bin which isn't available before postgres 14
+    return (func.to_timestamp(func.floor(func.extract('epoch', column) / seconds) * seconds).op('AT TIME ZONE')('UTC')).label('bucket')
+
+class TimeSeriesMixin():
+    @classmethod
+    def findPage(cls, device_id, key, start, end, cursor, max_results, db):
+        #? keyset pagination on (created_at, id): the latest data first without scanning the skipped rows
+        query = db.query(cls)
+        if device_id is not None:
+            query = query.filter(cls.device_id == device_id)
+        if key is not None:
+            query = query.filter(cls.key == key)
+        if start is not None:
+            query = query.filter(cls.created_at >= start)
+        if end is not None:
+            query = query.filter(cls.created_at < end)
+        if cursor is not None:
+            query = query.filter(tuple_(cls.created_at, cls.id) < tuple_(*cursor))
+
+        return query.order_by(cls.created_at.desc(), cls.id.desc()).limit(max_results).all()
+
+class PartitionedTimeSeriesMixin(TimeSeriesMixin):
+    @classmethod
+    def createMonthlyPartition(cls, month, next_month, db):
+        db.execute(text("CREATE TABLE IF NOT EXISTS {}_{} PARTITION OF {} FOR VALUES FROM ('{}') TO ('{}')".format(
+            cls.__tablename__,
+            month.strftime("%Y%m"),
+            cls.__tablename__,
+            month.strftime("%Y-%m-%d"),
+            next_month.strftime("%Y-%m-%d")
+        )))
+        db.commit()
+
+    @classmethod
+    def getPartitions(cls, db):
+        return db.execute(text("SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = :table"), {'table': cls.__tablename__}).scalars().all()
+
+    @classmethod
+    def dropPartition(cls, partition, db):
+        db.execute(text("DROP TABLE IF EXISTS {}".format(partition)))
+        db.commit()
+
+class Data(TimeSeriesMixin, Base):
     __tablename__ = 'data'
+    __table_args__ = (
+        Index('idx_data_device_created_at', 'device_id', 'created_at'),
+        Index('idx_data_created_at', 'created_at')
+    )
     id = Column(CachedGUID, primary_key=True, server_default=GUID_SERVER_DEFAULT_POSTGRESQL)
-    device_id = Column(String, ForeignKey("device.id"))
+    device_id = Column(CachedGUID, ForeignKey("device.id"))
     normalized_content = Column(JSONB, nullable=False)
-    created_at = Column(String, nullable=False)
+    created_at = Column(DateTime, nullable=False)
+
+    @staticmethod
+    def insertData(datas, db):
+        db.execute(insert(Data), datas)
 
     @staticmethod
-    def getAllData(db):
-        return db.query(Data).all()
+    def deleteDataBefore(created_at, limit, db):
+        result = db.execute(text("DELETE FROM data WHERE id IN (SELECT id FROM data WHERE created_at < :created_at LIMIT :limit)"), {'created_at': created_at, 'limit': limit})
+        db.commit()
+        return result.rowcount
 
-class NumericData(Base):
+class NumericData(PartitionedTimeSeriesMixin, Base):
     __tablename__ = 'numeric_data'
+    __table_args__ = (
+        Index('idx_numeric_data_device_key_created_at', 'device_id', 'key', 'created_at'),
+        Index('idx_numeric_data_data_id', 'data_id'),
+        { 'postgresql_partition_by': 'RANGE (created_at)' }
+    )
     id = Column(CachedGUID, primary_key=True, server_default=GUID_SERVER_DEFAULT_POSTGRESQL)
-    data_id = Column(String, ForeignKey("data.id"))
-    device_id = Column(String, ForeignKey("device.id"))
+    data_id = Column(CachedGUID, ForeignKey("data.id"))
+    device_id = Column(CachedGUID, ForeignKey("device.id"))
     key = Column(String, nullable=False)
     value = Column(Float, nullable=False)
-    created_at = Column(String, nullable=False)
+    created_at = Column(DateTime, primary_key=True, nullable=False)
 
     @staticmethod
-    def getAllNumericData(db):
-        return db.query(NumericData).all()
+    def insertNumericData(datas, db):
+        db.execute(insert(NumericData), datas)
 
-class StringData(Base):
+    @staticmethod
+    def getPercentiles(device_id, key, seconds, start, end, percentiles, db):
+        bucket = get_bucket(NumericData.created_at, seconds)
+        return db.execute(
+            select(bucket, func.percentile_cont(array(percentiles)).within_group(NumericData.value).label('percentiles'))
+            .where(NumericData.device_id == device_id, NumericData.key == key, NumericData.created_at >= start, NumericData.created_at < end)
+            .group_by(bucket)
+            .order_by(bucket)
+        ).all()
+
+class StringData(PartitionedTimeSeriesMixin, Base):
     __tablename__ = 'string_data'
+    __table_args__ = (
+        Index('idx_string_data_device_key_created_at', 'device_id', 'key', 'created_at'),
+        Index('idx_string_data_data_id', 'data_id'),
+        { 'postgresql_partition_by': 'RANGE (created_at)' }
+    )
     id = Column(CachedGUID, primary_key=True, server_default=GUID_SERVER_DEFAULT_POSTGRESQL)
-    data_id = Column(String, ForeignKey("data.id"))
-    device_id = Column(String, ForeignKey("device.id"))
+    data_id = Column(CachedGUID, ForeignKey("data.id"))
+    device_id = Column(CachedGUID, ForeignKey("device.id"))
     key = Column(String, nullable=False)
     value = Column(String, nullable=False)
-    created_at = Column(String, nullable=False)
+    created_at = Column(DateTime, primary_key=True, nullable=False)
+
+    @staticmethod
+    def insertStringData(datas, db):
+        db.execute(insert(StringData), datas)
+
+class NumericDataRollup(Base):
+    __tablename__ = 'numeric_data_rollup'
+    device_id = Column(CachedGUID, ForeignKey("device.id"), primary_key=True)
+    key = Column(String, primary_key=True)
+    bucket = Column(DateTime, primary_key=True)
+    count = Column(BigInteger, nullable=False, default=0)
+    sum = Column(Float, nullable=False, default=0)
+    min = Column(Float, nullable=False)
+    max = Column(Float, nullable=False)
+
+    @staticmethod
+    def upsertNumericDataRollups(rollups, db):
+        stmt = pg_insert(NumericDataRollup)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[NumericDataRollup.device_id, NumericDataRollup.key, NumericDataRollup.bucket],
+            set_={
+                'count': NumericDataRollup.count + stmt.excluded.count,
+                'sum': NumericDataRollup.sum + stmt.excluded.sum,
+                'min': func.least(NumericDataRollup.min, stmt.excluded.min),
+                'max': func.greatest(NumericDataRollup.max, stmt.excluded.max)
+            }
+        ), rollups)
 
     @staticmethod
-    def getAllStringData(db):
-        return db.query(StringData).all()
+    def getAggregates(device_id, key, seconds, start, end, db):
+        bucket = get_bucket(NumericDataRollup.bucket, seconds)
+        return db.execute(
+            select(bucket, func.sum(NumericDataRollup.count).label('count'), func.sum(NumericDataRollup.sum).label('sum'), func.min(NumericDataRollup.min).label('min'), func.max(NumericDataRollup.max).label('max'))
+            .where(NumericDataRollup.device_id == device_id, NumericDataRollup.key == key, NumericDataRollup.bucket >= start, NumericDataRollup.bucket < end)
+            .group_by(bucket)
+            .order_by(bucket)
+        ).all()
+
@@ -22,6 +22,10 @@ class Device(Base):
     def getDeviceById(device_id, db):
         return db.query(Device).filter(Device.id == device_id).first()
     
+    @staticmethod
+    def getDevicesByIds(device_ids, db):
+        return db.query(Device).filter(Device.id.in_(device_ids)).all()
+
     @staticmethod
     def getUserDeviceById(username, device_id, db):
         return db.query(Device).filter(Device.username == username, Device.id == device_id).first()
@@ -27,6 +27,10 @@ class ObjectType(Base):
         object_type = db.query(ObjectType).filter(ObjectType.id == object_type_id).first()
         return object_type
     
+    @staticmethod
+    def findByIds(object_type_ids, db):
+        return db.query(ObjectType).filter(ObjectType.id.in_(object_type_ids)).all()
+
     @staticmethod
     def findUserObjectTypeById(user_id, object_type_id, db):
         object_type = db.query(ObjectType).filter(ObjectType.user_id == user_id, ObjectType.id == object_type_id).first()
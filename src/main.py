@@ -1,4 +1,5 @@
 from uuid import uuid4
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, HTTPException
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
@@ -8,21 +9,43 @@ from asgi_correlation_id import CorrelationIdMiddleware
 
 from restful_resources import import_resources
 from exceptions.CwHTTPException import CwHTTPException
-from database.postgres_db import dbEngine
+from database.postgres_db import dbEngine, dispose_async_engine
 from database.postgres_db import Base
+from database.redis_db import async_redis_client
 
 from utils.common import get_env_bool
+from utils.faas.iot import mqtt_publishers
+from utils.faas.waiters import invocation_waiters
+from utils.http import close_async_http_client
 from utils.logger import log_msg
-from utils.observability.monitor import monitors
+from utils.observability.monitor_scheduler import monitors
+from utils.observability.tracker_events import tracker_events
+from utils.iot.ingestion import iot_ingestion
+from utils.iot.timeseries import iot_retention
 from utils.observability.cid import get_current_cid
 from utils.observability.metrics import metrics
 from utils.observability.otel import init_otel_metrics, init_otel_tracer, init_otel_logger
+from utils.provider import load_providers_catalogs
 from utils.env_vars import APP_ENV, APP_VERSION
 
 log_msg("INFO", "[main] the application is starting with version = {}".format(APP_VERSION), True)
 Base.metadata.create_all(bind = dbEngine)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    #? subscribing before the first sync invocation so its completion event isn't missed
+    try:
+        invocation_waiters.subscribe()
+    except Exception as e:
+        log_msg("WARN", "[main][lifespan] unable to subscribe the invocation waiters: e.type = {}, e.msg = {}".format(type(e), e))
+    yield
+    await close_async_http_client()
+    await async_redis_client.aclose()
+    await dispose_async_engine()
+    mqtt_publishers.close()
+
 app = FastAPI(
+    lifespan = lifespan,
     docs_url = "/",
     title = "Comwork Cloud API",
     version = APP_VERSION,
@@ -51,6 +74,10 @@ init_otel_metrics()
 init_otel_logger()
 metrics()
 monitors()
+tracker_events()
+iot_ingestion()
+iot_retention()
+load_providers_catalogs()
 
 instrumentator.instrument(app, metric_namespace='cwcloudapi', metric_subsystem='cwcloudapi')
 instrumentator.expose(app, endpoint='/v1/metrics')
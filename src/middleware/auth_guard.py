@@ -14,6 +14,7 @@ from exceptions.CwHTTPException import CwHTTPException
 from database.postgres_db import get_db
 from adapters.AdapterConfig import get_adapter
 
+from utils.auth_cache import principals_cache
 from utils.common import is_empty, is_not_empty, is_false
 from utils.date import is_expired
 from utils.flag import is_flag_enabled
@@ -33,8 +34,24 @@ def get_mock_current_user():
 async def get_mem_user_token(user_token):
     decoded_user = jwt_decode(user_token)
     email: str = decoded_user.get("email")
-    log_msg("DEBUG", "[auth_guard][get_mem_user_token] decoded_user = {}".format(decoded_user))
-    return CACHE_ADAPTER().get(email), TokenData(email = email)
+    log_msg("DEBUG", lambda: "[auth_guard][get_mem_user_token] decoded_user = {}".format(decoded_user))
+    return CACHE_ADAPTER().get(email), TokenData(email = email, exp = decoded_user.get("exp"))
+
+def get_cached_user(kind, token, db):
+    user = principals_cache.get("{}:{}".format(kind, token))
+    if user is None:
+        return None
+
+    #? attaching a copy of the cached principal to the request's session without any query
+    return db.merge(user, load = False)
+
+def cache_user(kind, token, user, db, exp = None):
+    if is_empty(user) or not principals_cache.is_enabled():
+        return user
+
+    db.expunge(user)
+    principals_cache.put("{}:{}".format(kind, token), user, exp)
+    return db.merge(user, load = False)
 
 async def get_user_authentication(user_token: str = Depends(user_token_header), auth_token: str = Depends(auth_token_header)):
     if is_not_empty(user_token):
@@ -60,18 +77,28 @@ async def get_current_not_mandatory_user(user_token: str = Depends(user_token_he
                 if decoded_mem_token != user_token:
                     log_msg("DEBUG", "[auth_guard][get_current_not_mandatory_user] decoded_mem_token != user_token")
                     return None
-                user = User.getUserByEmail(token_data.email, db)
+
+                #? the cached principal is only trusted once the token is still the one stored in redis
+                user = get_cached_user("user", user_token, db)
+                if user is not None:
+                    return user
+
+                user = cache_user("user", user_token, User.getUserByEmail(token_data.email, db), db, token_data.exp)
             except JWTError as e:
-                log_msg("DEBUG", "[auth_guard][get_current_not_mandatory_user] e.type = {}, e.msg = {}".format(type(e), e))
+                log_msg("DEBUG", lambda e = e: "[auth_guard][get_current_not_mandatory_user] e.type = {}, e.msg = {}".format(type(e), e))
                 return None
         elif is_not_empty(auth_token):
+            user = get_cached_user("api", auth_token, db)
+            if user is not None:
+                return user
+
             secret_key = auth_token
             user_api_key = ApiKeys.getApiKeyBySecretKey(secret_key, db)
             if is_empty(user_api_key):
                 log_msg("DEBUG", "[auth_guard][get_current_not_mandatory_user] user_api_key is not set")
                 return None
 
-            user = User.getUserById(user_api_key.user_id, db)
+            user = cache_user("api", auth_token, User.getUserById(user_api_key.user_id, db), db)
         else:
             log_msg("DEBUG", "[auth_guard][get_current_not_mandatory_user] auth_token is not set")
             return None
@@ -96,15 +123,23 @@ async def get_current_user(user_token: str = Depends(user_token_header), auth_to
                 if decoded_mem_token != user_token:
                     raise CwHTTPException(message = {"status": "ko", "error": "authentification failed 2", "i18n_code": "auth_failed", "cid": get_current_cid()}, status_code = status.HTTP_401_UNAUTHORIZED)
 
-                user = User.getUserByEmail(token_data.email, db)
+                user = get_cached_user("user", user_token, db)
+                if user is not None:
+                    return user
+
+                user = cache_user("user", user_token, User.getUserByEmail(token_data.email, db), db, token_data.exp)
             except JWTError:
                 raise CwHTTPException(message = {"status": "ko", "error": "authentification failed", "i18n_code": "auth_failed", "cid": get_current_cid()}, status_code = status.HTTP_401_UNAUTHORIZED)
         elif is_not_empty(auth_token):
+            user = get_cached_user("api", auth_token, db)
+            if user is not None:
+                return user
+
             secret_key = auth_token
             user_api_key = ApiKeys.getApiKeyBySecretKey(secret_key, db)
             if is_empty(user_api_key):
                 raise CwHTTPException(message = {"status": "ko", "error": "authentification failed", "i18n_code": "auth_failed", "cid": get_current_cid()}, status_code = status.HTTP_401_UNAUTHORIZED)
-            user = User.getUserById(user_api_key.user_id, db)
+            user = cache_user("api", auth_token, User.getUserById(user_api_key.user_id, db), db)
         else:
             raise CwHTTPException(message = {"status": "ko", "error": "authentification failed", "i18n_code": "auth_failed", "cid": get_current_cid()}, status_code = status.HTTP_401_UNAUTHORIZED)
 
@@ -31,7 +31,7 @@ def get_pre_current_user(user_token: str = Depends(user_token_header), db: Sessi
             email: str = decoded_user.get("email")
             token_data = TokenData(email = email)
 
-            log_msg("DEBUG", "[pre_token_required] data = {}".format(decoded_user))
+            log_msg("DEBUG", lambda: "[pre_token_required] data = {}".format(decoded_user))
             decoded_mem_token = CACHE_ADAPTER().get(token_data.email)
 
             if not decoded_mem_token == user_token:
@@ -0,0 +1,27 @@
+CREATE TABLE IF NOT EXISTS tracker_event (
+    id BIGSERIAL,
+    website VARCHAR(255) NOT NULL,
+    time TIMESTAMP NOT NULL,
+    host VARCHAR(255),
+    referrer TEXT,
+    user_agent TEXT,
+    device VARCHAR(50),
+    browser VARCHAR(100),
+    os VARCHAR(50),
+    country VARCHAR(10),
+    city VARCHAR(255),
+    PRIMARY KEY (id, time)
+) PARTITION BY RANGE (time);
+
+CREATE TABLE IF NOT EXISTS tracker_event_default PARTITION OF tracker_event DEFAULT;
+
+CREATE INDEX IF NOT EXISTS idx_tracker_event_website_time ON tracker_event (website, time);
+
+CREATE TABLE IF NOT EXISTS tracker_rollup (
+    website VARCHAR(255) NOT NULL,
+    bucket TIMESTAMP NOT NULL,
+    dimension VARCHAR(20) NOT NULL,
+    value VARCHAR(255) NOT NULL,
+    hits BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (website, bucket, dimension, value)
+);
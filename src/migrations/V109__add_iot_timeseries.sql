@@ -0,0 +1,65 @@
+ALTER TABLE numeric_data RENAME TO numeric_data_legacy;
+ALTER TABLE numeric_data_legacy RENAME CONSTRAINT numeric_data_pkey TO numeric_data_legacy_pkey;
+ALTER TABLE string_data RENAME TO string_data_legacy;
+ALTER TABLE string_data_legacy RENAME CONSTRAINT string_data_pkey TO string_data_legacy_pkey;
+
+CREATE TABLE numeric_data (
+    id uuid NOT NULL DEFAULT uuid_generate_v4(),
+    data_id uuid NOT NULL,
+    device_id uuid NOT NULL,
+    created_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    key varchar(254) NOT NULL,
+    value float NOT NULL,
+    PRIMARY KEY (id, created_at),
+    FOREIGN KEY (data_id) REFERENCES public.data(id) ON DELETE CASCADE,
+    FOREIGN KEY (device_id) REFERENCES public.device(id) ON DELETE CASCADE
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE string_data (
+    id uuid NOT NULL DEFAULT uuid_generate_v4(),
+    data_id uuid NOT NULL,
+    device_id uuid NOT NULL,
+    created_at timestamp NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    key varchar(254) NOT NULL,
+    value varchar(254) NOT NULL,
+    PRIMARY KEY (id, created_at),
+    FOREIGN KEY (data_id) REFERENCES public.data(id) ON DELETE CASCADE,
+    FOREIGN KEY (device_id) REFERENCES public.device(id) ON DELETE CASCADE
+) PARTITION BY RANGE (created_at);
+
+CREATE TABLE numeric_data_default PARTITION OF numeric_data DEFAULT;
+CREATE TABLE string_data_default PARTITION OF string_data DEFAULT;
+
+-- monthly partitions covering the existing data, the next ones are created by the ingestion
+DO $$
+DECLARE
+    partition_month timestamp;
+    last_month timestamp := date_trunc('month', CURRENT_TIMESTAMP) + interval '1 month';
+BEGIN
+    SELECT date_trunc('month', min(created_at)), GREATEST(date_trunc('month', max(created_at)), last_month) INTO partition_month, last_month FROM (
+        SELECT created_at FROM numeric_data_legacy
+        UNION ALL
+        SELECT created_at FROM string_data_legacy
+    ) AS legacy;
+    partition_month := LEAST(COALESCE(partition_month, last_month), date_trunc('month', CURRENT_TIMESTAMP));
+    last_month := COALESCE(last_month, date_trunc('month', CURRENT_TIMESTAMP) + interval '1 month');
+
+    WHILE partition_month <= last_month LOOP
+        EXECUTE format('CREATE TABLE IF NOT EXISTS numeric_data_%s PARTITION OF numeric_data FOR VALUES FROM (%L) TO (%L)', to_char(partition_month, 'YYYYMM'), partition_month, partition_month + interval '1 month');
+        EXECUTE format('CREATE TABLE IF NOT EXISTS string_data_%s PARTITION OF string_data FOR VALUES FROM (%L) TO (%L)', to_char(partition_month, 'YYYYMM'), partition_month, partition_month + interval '1 month');
+        partition_month := partition_month + interval '1 month';
+    END LOOP;
+END $$;
+
+INSERT INTO numeric_data (id, data_id, device_id, created_at, key, value) SELECT id, data_id, device_id, created_at, key, value FROM numeric_data_legacy;
+INSERT INTO string_data (id, data_id, device_id, created_at, key, value) SELECT id, data_id, device_id, created_at, key, value FROM string_data_legacy;
+
+DROP TABLE numeric_data_legacy;
+DROP TABLE string_data_legacy;
+
+CREATE INDEX IF NOT EXISTS idx_numeric_data_device_key_created_at ON numeric_data (device_id, key, created_at);
+CREATE INDEX IF NOT EXISTS idx_numeric_data_data_id ON numeric_data (data_id);
+CREATE INDEX IF NOT EXISTS idx_string_data_device_key_created_at ON string_data (device_id, key, created_at);
+CREATE INDEX IF NOT EXISTS idx_string_data_data_id ON string_data (data_id);
+CREATE INDEX IF NOT EXISTS idx_data_device_created_at ON data (device_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_data_created_at ON data (created_at);
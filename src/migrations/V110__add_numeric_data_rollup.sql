@@ -0,0 +1,17 @@
+CREATE TABLE IF NOT EXISTS numeric_data_rollup (
+    device_id uuid NOT NULL,
+    key varchar(254) NOT NULL,
+    bucket timestamp NOT NULL,
+    count BIGINT NOT NULL DEFAULT 0,
+    sum float NOT NULL DEFAULT 0,
+    min float NOT NULL,
+    max float NOT NULL,
+    PRIMARY KEY (device_id, key, bucket),
+    FOREIGN KEY (device_id) REFERENCES public.device(id) ON DELETE CASCADE
+);
+
+INSERT INTO numeric_data_rollup (device_id, key, bucket, count, sum, min, max)
+SELECT device_id, key, date_trunc('minute', created_at), count(*), sum(value), min(value), max(value)
+FROM numeric_data
+GROUP BY device_id, key, date_trunc('minute', created_at)
+ON CONFLICT (device_id, key, bucket) DO NOTHING;
@@ -53,6 +53,7 @@ def import_resources(app):
     from routes.tracker import api_tracker
     from routes.admin.contact_form import api_admin_contact_form
     from routes.admin.monitor import api_admin_monitor
+    from routes.admin.tracker import api_admin_tracker
     from routes.admin.ai import api_admin_prompt
     from routes.admin.ai import api_admin_adapter
     from routes.admin.storage import api_admin_kv
@@ -120,6 +121,7 @@ def import_resources(app):
     app.include_router(api_admin_device.router, tags = ['Admin IoT'], prefix = f'/{version}/admin/iot')
     app.include_router(api_admin_data.router, tags = ['Admin IoT'], prefix = f'/{version}/admin/iot')
     app.include_router(api_admin_monitor.router, tags = ['Admin Monitor'], prefix = f'/{version}/admin/monitor')
+    app.include_router(api_admin_tracker.router, tags = ['Admin Tracker'], prefix = f'/{version}/admin/tracker')
     app.include_router(api_admin_contact_form.router, tags = ['Admin Contact Form'], prefix = f'/{version}/admin/contactform')
     app.include_router(api_admin_email.router, tags = ['Admin Email'], prefix = f'/{version}/admin/email')
     app.include_router(api_admin_support.router, tags = ['Admin Support Tickets'], prefix = f'/{version}/admin/support')
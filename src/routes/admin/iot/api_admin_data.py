@@ -1,10 +1,12 @@
 from controllers.admin.iot.admin_data import get_datas, get_numeric_data, get_string_data
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query, Response
 from middleware.auth_guard import admin_required
 from sqlalchemy.orm import Session
-from typing import Annotated
+from typing import Annotated, Optional
 from database.postgres_db import get_db
 from schemas.User import UserSchema
+from utils.iot.timeseries import IOT_DATA_MAX_RESULTS
 from utils.observability.otel import get_otel_tracer
 from utils.observability.traces import span_format
 from utils.observability.counter import create_counter, increment_counter
@@ -16,19 +18,25 @@ _span_prefix = "adm-iot-data"
 _counter = create_counter("adm_iot_data_api", "Admin IoT data API counter")
 
 @router.get("/data")
-def get_all_data(current_user: Annotated[UserSchema, Depends(admin_required)], db: Session = Depends(get_db)):
+def get_all_data(response: Response, current_user: Annotated[UserSchema, Depends(admin_required)], device_id: Optional[str] = None, start: Optional[datetime] = None, end: Optional[datetime] = None, cursor: Optional[str] = None, max_results: int = Query(100, ge=1, le=IOT_DATA_MAX_RESULTS), db: Session = Depends(get_db)):
     with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.GET)):
         increment_counter(_counter, Method.GET)
-        return get_datas(current_user, db)
+        result = get_datas(current_user, db, device_id, start, end, cursor, max_results)
+        response.status_code = result['code']
+        return result
 
 @router.get("/data/numeric")
-def get_all_numeric_data(current_user: Annotated[UserSchema, Depends(admin_required)], db: Session = Depends(get_db)):
+def get_all_numeric_data(response: Response, current_user: Annotated[UserSchema, Depends(admin_required)], device_id: Optional[str] = None, key: Optional[str] = None, start: Optional[datetime] = None, end: Optional[datetime] = None, cursor: Optional[str] = None, max_results: int = Query(100, ge=1, le=IOT_DATA_MAX_RESULTS), db: Session = Depends(get_db)):
     with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.GET)):
         increment_counter(_counter, Method.GET)
-        return get_numeric_data(current_user, db)
+        result = get_numeric_data(current_user, db, device_id, key, start, end, cursor, max_results)
+        response.status_code = result['code']
+        return result
     
 @router.get("/data/string")
-def get_all_string_data(current_user: Annotated[UserSchema, Depends(admin_required)], db: Session = Depends(get_db)):
+def get_all_string_data(response: Response, current_user: Annotated[UserSchema, Depends(admin_required)], device_id: Optional[str] = None, key: Optional[str] = None, start: Optional[datetime] = None, end: Optional[datetime] = None, cursor: Optional[str] = None, max_results: int = Query(100, ge=1, le=IOT_DATA_MAX_RESULTS), db: Session = Depends(get_db)):
     with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.GET)):
         increment_counter(_counter, Method.GET)
-        return get_string_data(current_user, db)
+        result = get_string_data(current_user, db, device_id, key, start, end, cursor, max_results)
+        response.status_code = result['code']
+        return result
@@ -0,0 +1,26 @@
+from datetime import datetime
+from typing import Annotated, Optional
+from sqlalchemy.orm import Session
+from fastapi import Depends, APIRouter
+
+from controllers.admin.admin_tracker import get_tracker_stats
+from database.postgres_db import get_db
+from middleware.auth_guard import admin_required
+from schemas.Tracker import TrackerDimension, TrackerGranularity
+from schemas.User import UserSchema
+
+from utils.observability.otel import get_otel_tracer
+from utils.observability.traces import span_format
+from utils.observability.counter import create_counter, increment_counter
+from utils.observability.enums import Method
+
+router = APIRouter()
+
+_span_prefix = "admin-tracker"
+_counter = create_counter("admin_tracker_api", "Admin Tracker API counter")
+
+@router.get("/stats/{website}")
+def get_website_stats(current_user: Annotated[UserSchema, Depends(admin_required)], website: str, dimension: TrackerDimension = TrackerDimension.all, granularity: TrackerGranularity = TrackerGranularity.minute, start: Optional[datetime] = None, end: Optional[datetime] = None, db: Session = Depends(get_db)):
+    with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.GET)):
+        increment_counter(_counter, Method.GET)
+        return get_tracker_stats(website, dimension, granularity, start, end, db)
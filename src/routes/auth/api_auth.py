@@ -9,6 +9,7 @@ from sqlalchemy.orm import Session
 from adapters.AdapterConfig import get_adapter
 from schemas.User import UserLoginSchema
 from database.postgres_db import get_db
+from utils.auth_cache import invalidate_principal
 from utils.jwt import jwt_encode
 
 from utils.logger import log_msg
@@ -89,6 +90,7 @@ def login_user(request: Request, payload: UserLoginSchema, db: Session = Depends
             })
             CACHE_ADAPTER().delete(user.email)
             CACHE_ADAPTER().put(user.email, token, get_env_int("TOKEN_EXPIRATION_TIME"))
+            invalidate_principal(user.id)
             from entities.Mfa import Mfa
             mfaMethods = Mfa.getUserMfaMethods(user.id, db)
             mfaMethodsJson = json.loads(json.dumps(mfaMethods, cls = AlchemyEncoder))
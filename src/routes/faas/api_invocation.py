@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Annotated
 
-from database.postgres_db import get_db
+from database.postgres_db import get_async_db, get_db
 from middleware.auth_guard import get_current_not_mandatory_user, get_current_user, get_user_authentication
 from middleware.faasapi_guard import faasapi_required
 from schemas.User import UserSchema
@@ -10,7 +11,7 @@ from schemas.faas import InvocationContent
 from schemas.faas.InvocationArg import InvocationArgument
 from schemas.faas.Invocation import Invocation, CompletedInvocation
 from schemas.UserAuthentication import UserAuthentication
-from controllers.faas.invocations import clear_my_invocations, invoke, invoke_sync, complete, get_invocation, get_my_invocations, delete_invocation
+from controllers.faas.invocations import clear_my_invocations, ainvoke, ainvoke_sync, complete, get_invocation, get_my_invocations, delete_invocation
 
 from utils.common import is_not_empty_key, is_true
 from utils.observability.otel import get_otel_tracer
@@ -24,18 +25,18 @@ _span_prefix = "faas-invocation"
 _counter = create_counter("faas_invocation_api", "FaaS invocation API counter")
 
 @router.post("/invocation")
-def create_invocation(payload: Invocation, response: Response, current_user: Annotated[UserSchema, Depends(get_current_not_mandatory_user)], user_auth: Annotated[UserAuthentication, Depends(get_user_authentication)], db: Session = Depends(get_db)):
+async def create_invocation(payload: Invocation, response: Response, current_user: Annotated[UserSchema, Depends(get_current_not_mandatory_user)], user_auth: Annotated[UserAuthentication, Depends(get_user_authentication)], db: AsyncSession = Depends(get_async_db)):
     with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.POST)):
         increment_counter(_counter, Method.POST)
-        result = invoke(payload, current_user, user_auth, db)
+        result = await ainvoke(payload, current_user, user_auth, db)
         response.status_code = result['code']
         return result
 
 @router.post("/invocation/sync")
-def create_sync_invocation(payload: Invocation, response: Response, current_user: Annotated[UserSchema, Depends(get_current_not_mandatory_user)], user_auth: Annotated[UserAuthentication, Depends(get_user_authentication)], db: Session = Depends(get_db)):
+async def create_sync_invocation(payload: Invocation, response: Response, current_user: Annotated[UserSchema, Depends(get_current_not_mandatory_user)], user_auth: Annotated[UserAuthentication, Depends(get_user_authentication)], db: AsyncSession = Depends(get_async_db)):
     with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.POST, Action.SYNC)):
         increment_counter(_counter, Method.POST, Action.SYNC)
-        result = invoke_sync(payload, current_user, user_auth, db)
+        result = await ainvoke_sync(payload, current_user, user_auth, db)
         response.status_code = result['code']
         return result
 
@@ -1,10 +1,8 @@
-from sqlalchemy.orm import Session
-from fastapi import Depends, APIRouter
+from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
 
-from database.postgres_db import get_db
-
-from utils.provider import exist_provider, get_provider_infos
+from utils.fastapi import cached_json_response
+from utils.provider import exist_provider, get_provider_catalog
 from utils.observability.otel import get_otel_tracer
 from utils.observability.traces import span_format
 from utils.observability.counter import create_counter, increment_counter
@@ -17,7 +15,7 @@ _span_prefix = "instance-types"
 _counter = create_counter("instance_type_api", "Instance type API counter")
 
 @router.get("/{provider}/instance_types")
-def get_instance_types(provider: str, db: Session = Depends(get_db)):
+def get_instance_types(provider: str, request: Request):
     with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.GET)):
         increment_counter(_counter, Method.GET)
         if not exist_provider(provider):
@@ -27,7 +25,4 @@ def get_instance_types(provider: str, db: Session = Depends(get_db)):
                 'i18n_code': 'provider_not_exist',
                 'cid': get_current_cid()
             }, status_code = 404)
-        return {
-            "status": "ok",
-            "types": get_provider_infos(provider, "instance_types")
-        }
+        return cached_json_response(request, get_provider_catalog(provider, 'instance_types'))
@@ -1,16 +1,19 @@
-from controllers.iot.data import add_data
+from controllers.iot.data import add_bulk_data, add_data, get_data_aggregates
+from datetime import datetime
 from fastapi import APIRouter, Depends
-from middleware.auth_guard import get_current_not_mandatory_user, get_user_authentication
+from middleware.auth_guard import get_current_active_user, get_current_not_mandatory_user, get_user_authentication
 from schemas.UserAuthentication import UserAuthentication
 from schemas.iot.Data import DataSchema
 from sqlalchemy.orm import Session
-from typing import Annotated
+from typing import Annotated, Optional
 from database.postgres_db import get_db
 from schemas.User import UserSchema
 from utils.observability.otel import get_otel_tracer
 from utils.observability.traces import span_format
 from utils.observability.counter import create_counter, increment_counter
-from utils.observability.enums import Method
+from utils.fastapi import get_raw_body
+from utils.iot.ingestion import DATA_KEY
+from utils.observability.enums import Action, Method
 
 router = APIRouter()
 
@@ -22,3 +25,16 @@ def create_data(current_user: Annotated[UserSchema, Depends(get_current_not_mand
     with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.POST)):
         increment_counter(_counter, Method.POST)
         return add_data(current_user, user_auth, payload, db)
+
+@router.post("/data/bulk")
+def create_bulk_data(current_user: Annotated[UserSchema, Depends(get_current_not_mandatory_user)], user_auth: Annotated[UserAuthentication, Depends(get_user_authentication)], body: str = Depends(get_raw_body), db: Session = Depends(get_db)):
+    with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.POST, Action.BULK)):
+        increment_counter(_counter, Method.POST, Action.BULK)
+        return add_bulk_data(current_user, user_auth, body, db)
+
+@router.get("/data/aggregate")
+def get_aggregated_data(current_user: Annotated[UserSchema, Depends(get_current_active_user)], device_id: str, key: str = DATA_KEY, interval: str = "1h", start: Optional[datetime] = None, end: Optional[datetime] = None, percentiles: Optional[str] = None, db: Session = Depends(get_db)):
+    with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.GET, Action.AGGREGATE)):
+        increment_counter(_counter, Method.GET, Action.AGGREGATE)
+        return get_data_aggregates(current_user, device_id, key, interval, start, end, percentiles, db)
+
@@ -17,7 +17,7 @@ _span_prefix = "imalive"
 _counter = create_counter("imalive_api", "ImAlive API counter")
 
 @router.post("")
-def post_imalive(current_user: Annotated[UserSchema, Depends(get_current_user)], payload: ImAliveSchema):
+async def post_imalive(current_user: Annotated[UserSchema, Depends(get_current_user)], payload: ImAliveSchema):
     with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.POST)):
         increment_counter(_counter, Method.POST)
         return ingest_imalive(current_user, payload)
@@ -1,10 +1,9 @@
 from urllib.error import HTTPError
-from sqlalchemy.orm import Session
-from fastapi import Depends, APIRouter
+from fastapi import APIRouter, Request
 from fastapi.responses import JSONResponse
 
-from database.postgres_db import get_db
-from utils.provider import get_provider_instances_pricing
+from utils.fastapi import cached_json_response
+from utils.provider import get_provider_catalog
 from utils.observability.cid import get_current_cid
 from utils.observability.otel import get_otel_tracer
 from utils.observability.traces import span_format
@@ -17,15 +16,11 @@ _span_prefix = "pricing"
 _counter = create_counter("pricing_api", "Pricing API counter")
 
 @router.get("/{provider}/pricing")
-def get(provider: str, db: Session = Depends(get_db)):
+def get(provider: str, request: Request):
     with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.GET)):
         increment_counter(_counter, Method.GET)
         try:
-            prices = get_provider_instances_pricing(provider)
-            return {
-                'status': 'ok',
-                'prices': prices
-            }
+            return cached_json_response(request, get_provider_catalog(provider, 'pricing'))
         except HTTPError as e:
             return JSONResponse(content = {
                 'status': 'ko',
@@ -1,8 +1,9 @@
-from fastapi import status, APIRouter
+from fastapi import status, APIRouter, Request
 from fastapi.responses import JSONResponse
 
 from urllib.error import HTTPError
-from utils.provider import get_provider_available_instances_config_by_region_zone, get_provider_infos, get_provider_instances_pricing_by_region_zone, get_provider_available_instances, get_provider_available_instances_by_region_zone, get_providers, get_dns_providers
+from utils.fastapi import cached_json_response
+from utils.provider import get_provider_available_instances_config_by_region_zone, get_provider_catalog, get_provider_infos, get_provider_instances_pricing_by_region_zone, get_provider_available_instances_by_region_zone, get_providers, get_dns_providers
 from utils.observability.otel import get_otel_tracer
 from utils.observability.cid import get_current_cid
 from utils.observability.traces import span_format
@@ -59,15 +60,11 @@ def get_provider_regions(provider: str):
             }, status_code = e.code)
 
 @router.get("/{provider}/instance", status_code = status.HTTP_200_OK)
-def get_instances_by_provider(provider: str):
+def get_instances_by_provider(provider: str, request: Request):
     with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.GET, Action.INSTANCE)):
         increment_counter(_counter, Method.GET, Action.INSTANCE)
         try:
-            availability = get_provider_available_instances(provider)
-            return {
-                'status': 'ok',
-                'availability': availability
-            }
+            return cached_json_response(request, get_provider_catalog(provider, 'availability'))
         except HTTPError as e:
             return JSONResponse(content = {
                 'status': 'ko',
@@ -1,15 +1,18 @@
+import asyncio
+
 from datetime import datetime
 from enum import Enum
-from fastapi import APIRouter, Request
-from fastapi.responses import FileResponse
+from fastapi import APIRouter, BackgroundTasks, Request
+from fastapi.responses import Response
 
-from utils.common import is_empty
-from utils.logger import quiet_log_msg
+from utils.common import is_empty, is_true
+from utils.logger import log_msg, quiet_log_msg
 from utils.observability.otel import get_otel_tracer
 from utils.observability.traces import span_format
 from utils.observability.counter import create_counter, increment_counter
 from utils.observability.enums import Method
-from utils.observability.tracker import TRACKER_IMAGE_PATH, get_client_host_from_request, get_infos_from_ip, init_tracker_img, parse_user_agent
+from utils.observability.tracker import aget_infos_from_ip, get_client_host_from_request, get_tracker_img, parse_user_agent
+from utils.observability.tracker_events import TRACKER_EVENTS_ENABLED, publish_tracker_event
 
 router = APIRouter()
 
@@ -20,11 +23,24 @@ class TrackerFormat(str, Enum):
     img = "img"
     json = "json"
 
+async def log_tracked_payload(payload):
+    try:
+        payload['infos'] = await aget_infos_from_ip(payload['host'])
+    except Exception as e:
+        log_msg("WARN", "[track] unable to get the infos of host = {}: e.type = {}, e.msg = {}".format(payload['host'], type(e), e))
+
+    quiet_log_msg("INFO", payload)
+
+    if is_true(TRACKER_EVENTS_ENABLED):
+        try:
+            await asyncio.to_thread(publish_tracker_event, payload)
+        except Exception as e:
+            log_msg("WARN", "[track] unable to publish the tracker event: website = {}, e.type = {}, e.msg = {}".format(payload['website'], type(e), e))
+
 @router.get("/{format}/{website}")
-def track(request: Request, format: TrackerFormat, website: str):
+async def track(request: Request, format: TrackerFormat, website: str, bt: BackgroundTasks):
     with get_otel_tracer().start_as_current_span(span_format(_span_prefix, Method.GET)):
         increment_counter(_counter, Method.GET)
-        init_tracker_img()
 
         host = get_client_host_from_request(request)
         user_agent = request.headers.get("User-Agent")
@@ -43,16 +59,19 @@ def track(request: Request, format: TrackerFormat, website: str):
             "device": parsed_ua['device'],
             "browser": parsed_ua['browser'],
             "os": parsed_ua['os'],
-            "details": parsed_ua['details'],
-            "infos": get_infos_from_ip(host)
+            "details": parsed_ua['details']
         }
 
-        quiet_log_msg("INFO", payload)
+        if format is TrackerFormat.json:
+            await log_tracked_payload(payload)
+            return payload
 
-        return FileResponse(TRACKER_IMAGE_PATH, media_type="image/png", headers = {
+        #? the pixel is returned right away, the geolocation is resolved after the response is sent
+        bt.add_task(log_tracked_payload, payload)
+        return Response(content = get_tracker_img(), media_type="image/png", headers = {
             "x-cwcloud-client-host": host,
             "x-cwcloud-user-agent": user_agent,
             "x-cwcloud-website": website,
             "x-cwcloud-referrer": referrer,
             "x-cwcloud-time": vdate.isoformat()
-        }) if format is TrackerFormat.img else payload
+        })
@@ -6,7 +6,6 @@ from apscheduler.triggers.date import DateTrigger
 from dateutil.parser import parse
 
 from utils.common import is_empty_key, is_not_empty
-from utils.bytes_generator import generate_random_bytes
 from utils.cron import parse_crontab
 from utils.date import is_after_current_time
 from utils.faas.vars import FAAS_API_MAX_RESULTS, FAAS_API_TOKEN, FAAS_API_URL
@@ -37,28 +36,44 @@ def invoke_function(trigger):
         timeout=HTTP_REQUEST_TIMEOUT
     )
 
+def get_trigger_job_id(trigger):
+    return "{}".format(trigger['id'])
+
+def is_trigger_scheduled(trigger):
+    #? the same trigger is scheduled only once, unless it has been updated since
+    job = _scheduler.get_job(get_trigger_job_id(trigger))
+    return job is not None and job.args[0].get('updated_at') == trigger.get('updated_at')
+
 def handle_trigger(trigger):
     if is_empty_key(trigger, 'content') or any(is_empty_key(trigger['content'], k) for k in ['name', 'function_id']):
-        log_msg("WARN", "[scheduler][init_triggered_functions] missing some mandatory fields, ignoring trigger = {}".format(trigger))
+        log_msg("WARN", "[scheduler][handle_trigger] missing some mandatory fields, ignoring trigger = {}".format(trigger))
+        return
 
     if not 'args' in trigger['content']:
-        log_msg("WARN", "[scheduler][init_triggered_functions] missing args mandatory fields, ignoring trigger = {}".format(trigger))
+        log_msg("WARN", "[scheduler][handle_trigger] missing args mandatory fields, ignoring trigger = {}".format(trigger))
+        return
+
+    if is_trigger_scheduled(trigger):
+        log_msg("DEBUG", "[scheduler][handle_trigger] trigger already scheduled: id = {}".format(trigger['id']))
+        return
 
     if trigger['kind'] == "cron":
         if is_empty_key(trigger['content'], 'cron_expr'):
-            log_msg("WARN", "[scheduler][reinit_crontabs] missing cron_expr field, ignoring trigger = {}".format(trigger))
+            log_msg("WARN", "[scheduler][handle_trigger] missing cron_expr field, ignoring trigger = {}".format(trigger))
+            return
 
         apscheduler_args = parse_crontab(trigger['content']['cron_expr'])
-        log_msg("DEBUG", "[scheduler][reinit_crontabs] add this cron: name = {}, cron_expr = {}, apscheduler_args = {}".format(trigger['content']['name'], trigger['content']['cron_expr'], apscheduler_args))
-        _scheduler.add_job(lambda: invoke_function(trigger), CronTrigger(**apscheduler_args), id = "{}-{}".format(trigger['content']['name'], generate_random_bytes(6)))
+        log_msg("DEBUG", "[scheduler][handle_trigger] add this cron: name = {}, cron_expr = {}, apscheduler_args = {}".format(trigger['content']['name'], trigger['content']['cron_expr'], apscheduler_args))
+        _scheduler.add_job(invoke_function, CronTrigger(**apscheduler_args), args = [trigger], id = get_trigger_job_id(trigger), replace_existing = True)
     elif trigger['kind'] == "schedule":
         if is_empty_key(trigger['content'], 'execution_time'):
-            log_msg("WARN", "[scheduler][invoke_scheduled_functions] missing execution_time field, ignoring trigger = {}".format(trigger))
+            log_msg("WARN", "[scheduler][handle_trigger] missing execution_time field, ignoring trigger = {}".format(trigger))
+            return
 
         execution_time = parse(trigger['content']['execution_time'])
         if is_after_current_time(trigger['content']['execution_time']):
-            log_msg("DEBUG", "[scheduler][invoke_scheduled_functions] Scheduling function for trigger: {}".format(trigger))
-            _scheduler.add_job(lambda: invoke_function(trigger), DateTrigger(run_date=execution_time), id = "{}-{}".format(trigger['content']['name'], generate_random_bytes(6)), replace_existing=True)
+            log_msg("DEBUG", "[scheduler][handle_trigger] Scheduling function for trigger: {}".format(trigger))
+            _scheduler.add_job(invoke_function, DateTrigger(run_date=execution_time), args = [trigger], id = get_trigger_job_id(trigger), replace_existing = True)
 
 def init_triggered_functions():
     global _scheduler
@@ -81,30 +96,5 @@ def init_triggered_functions():
             break
 
         for trigger in triggers['results']:
-            if is_empty_key(trigger, 'content') or any(is_empty_key(trigger['content'], k) for k in ['name', 'function_id']):
-                log_msg("WARN", "[scheduler][init_triggered_functions] missing some mandatory fields, ignoring trigger = {}".format(trigger))
-                continue
-
-            if not 'args' in trigger['content']:
-                log_msg("WARN", "[scheduler][init_triggered_functions] missing args mandatory fields, ignoring trigger = {}".format(trigger))
-                continue
-
-            if trigger['kind'] == "cron":
-                if is_empty_key(trigger['content'], 'cron_expr'):
-                    log_msg("WARN", "[scheduler][reinit_crontabs] missing cron_expr field, ignoring trigger = {}".format(trigger))
-                    continue
-
-                apscheduler_args = parse_crontab(trigger['content']['cron_expr'])
-                log_msg("DEBUG", "[scheduler][reinit_crontabs] add this cron: name = {}, cron_expr = {}, apscheduler_args = {}".format(trigger['content']['name'], trigger['content']['cron_expr'], apscheduler_args))
-                _scheduler.add_job(lambda: invoke_function(trigger), CronTrigger(**apscheduler_args), id = "{}-{}".format(trigger['content']['name'], generate_random_bytes(6)))
-            elif trigger['kind'] == "schedule":
-                if is_empty_key(trigger['content'], 'execution_time'):
-                    log_msg("WARN", "[scheduler][invoke_scheduled_functions] missing execution_time field, ignoring trigger = {}".format(trigger))
-                    continue
-
-                execution_time = parse(trigger['content']['execution_time'])
-                if is_after_current_time(trigger['content']['execution_time']):
-                    log_msg("DEBUG", "[scheduler][invoke_scheduled_functions] Scheduling function for trigger: {}".format(trigger))
-                    _scheduler.add_job(lambda: invoke_function(trigger), DateTrigger(run_date=execution_time), id = "{}-{}".format(trigger['content']['name'], generate_random_bytes(6)), replace_existing=True)
-
+            handle_trigger(trigger)
             start_index = start_index + 1
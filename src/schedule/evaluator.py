@@ -0,0 +1,65 @@
+import time
+import threading
+
+from schedule.crontabs import handle_trigger
+from schedule.handler import pubsub_adapter
+from utils.common import get_env_bool, get_env_float, get_env_int, is_empty_key, is_false
+from utils.consumer import IOT_TRIGGERS_CHANNEL, TRIGGERS_GROUP, MessagesBatcher
+from utils.logger import log_msg
+
+TRIGGER_EVALUATOR_ENABLED = get_env_bool('TRIGGER_EVALUATOR_ENABLED', True)
+TRIGGER_EVENTS_BATCH_SIZE = max(1, get_env_int('TRIGGER_EVENTS_BATCH_SIZE', 100))
+TRIGGER_EVENTS_FLUSH_INTERVAL = get_env_float('TRIGGER_EVENTS_FLUSH_INTERVAL', 1)
+
+def dedupe_triggers(events):
+    #? the latest version of each trigger is kept, whatever the number of datapoints referencing it
+    triggers = {}
+    for event in events:
+        for trigger in event.get('triggers') or []:
+            if is_empty_key(trigger, 'id'):
+                continue
+
+            existing_trigger = triggers.get(trigger['id'])
+            if existing_trigger is None or "{}".format(existing_trigger.get('updated_at')) < "{}".format(trigger.get('updated_at')):
+                triggers[trigger['id']] = trigger
+
+    return list(triggers.values())
+
+def evaluate_trigger_events(events):
+    triggers = dedupe_triggers(events)
+    for trigger in triggers:
+        try:
+            handle_trigger(trigger)
+        except Exception as e:
+            log_msg("ERROR", "[evaluate_trigger_events] unable to handle the trigger: id = {}, e.type = {}, e.msg = {}".format(trigger['id'], type(e), e))
+
+    log_msg("DEBUG", lambda: "[evaluate_trigger_events] evaluated triggers: count = {}, events = {}".format(len(triggers), len(events)))
+    return True
+
+class TriggerEventsBatcher(MessagesBatcher):
+    def __init__(self, save = evaluate_trigger_events, batch_size = TRIGGER_EVENTS_BATCH_SIZE, interval = TRIGGER_EVENTS_FLUSH_INTERVAL):
+        super().__init__(save, batch_size, interval)
+
+def trigger_events():
+    if is_false(TRIGGER_EVALUATOR_ENABLED):
+        return
+
+    def consume():
+        while True:
+            batcher = TriggerEventsBatcher()
+
+            async def handle(msg):
+                event = pubsub_adapter().decode(msg)
+                if event is None:
+                    return True
+
+                return await batcher.add(event)
+
+            try:
+                pubsub_adapter().consume(TRIGGERS_GROUP, IOT_TRIGGERS_CHANNEL, handle, TRIGGER_EVENTS_BATCH_SIZE, TRIGGER_EVENTS_BATCH_SIZE)
+            except Exception as e:
+                log_msg("ERROR", "[trigger_events] unexpected error in the consumer: e.type = {}, e.msg = {}".format(type(e), e))
+                time.sleep(1)
+
+    consumer_thread = threading.Thread(target=consume, name="trigger-events", daemon=True)
+    consumer_thread.start()
@@ -7,6 +7,7 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     email: Union[str, None] = None
+    exp: Union[int, None] = None
 
 class TokenEnter(BaseModel):
     token: str
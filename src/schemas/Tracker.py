@@ -0,0 +1,12 @@
+from enum import Enum
+
+class TrackerDimension(str, Enum):
+    all = "all"
+    device = "device"
+    browser = "browser"
+    country = "country"
+
+class TrackerGranularity(str, Enum):
+    minute = "minute"
+    hour = "hour"
+    day = "day"
@@ -1,5 +1,10 @@
+from datetime import datetime
 from pydantic import BaseModel
+from typing import Optional
 
 class DataSchema(BaseModel):
     device_id: str
     content: str
+
+class DataBulkItemSchema(DataSchema):
+    timestamp: Optional[datetime] = None
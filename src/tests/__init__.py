@@ -0,0 +1,5 @@
+import os
+
+#? the tests are using the local configuration instead of the one mounted in the containers
+os.environ.setdefault('CLOUD_ENVIRONMENTS_PATH', os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', 'cloud_environments_local.yml.dist')))
+
@@ -0,0 +1,51 @@
+import asyncio
+
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from database.postgres_db import ThreadedAsyncSession, get_async_db
+
+class TestAsyncDb(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestAsyncDb, self).__init__(*args, **kwargs)
+
+    def test_threaded_async_session_delegate(self):
+        # Given
+        sync_session = Mock()
+        sync_session.scalar.return_value = "entity"
+        db = ThreadedAsyncSession(sync_session)
+        entity = Mock()
+
+        async def run():
+            db.add(entity)
+            await db.commit()
+            await db.refresh(entity)
+            return await db.scalar("statement")
+
+        # When
+        result = asyncio.run(run())
+
+        # Then
+        self.assertEqual(result, "entity")
+        sync_session.add.assert_called_once_with(entity)
+        sync_session.commit.assert_called_once()
+        sync_session.refresh.assert_called_once_with(entity)
+        sync_session.scalar.assert_called_once_with("statement")
+
+    @patch('database.postgres_db.postgres_async_enabled', False)
+    @patch('database.postgres_db.ThreadedSessionLocal')
+    def test_get_async_db_threaded_fallback(self, threaded_session_local):
+        # Given
+        async def run():
+            generator = get_async_db()
+            db = await generator.__anext__()
+            await generator.aclose()
+            return db
+
+        # When
+        db = asyncio.run(run())
+
+        # Then
+        self.assertIsInstance(db, ThreadedAsyncSession)
+        self.assertIs(db.sync_session, threaded_session_local.return_value)
+        threaded_session_local.return_value.close.assert_called_once()
@@ -0,0 +1,134 @@
+import asyncio
+
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from utils.auth_cache import PrincipalsCache
+
+def mock_user(id):
+    user = Mock()
+    user.id = id
+    return user
+
+class TestAuthCache(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestAuthCache, self).__init__(*args, **kwargs)
+
+    @patch('utils.auth_cache._pubsub_adapter')
+    def test_get_cached_principal(self, pubsub_adapter):
+        # Given
+        cache = PrincipalsCache(size = 10, ttl = 30)
+        user = mock_user(1)
+        cache.put("api:secret", user)
+
+        # When
+        result = cache.get("api:secret")
+
+        # Then
+        self.assertIs(result, user)
+        self.assertIsNone(cache.get("api:other"))
+        pubsub_adapter.return_value.subscribe.assert_called_once()
+
+    @patch('utils.auth_cache._pubsub_adapter')
+    @patch('utils.auth_cache.time')
+    def test_get_expired_principal(self, time, pubsub_adapter):
+        # Given
+        time.monotonic.return_value = 0
+        cache = PrincipalsCache(size = 10, ttl = 30)
+        cache.put("api:secret", mock_user(1))
+
+        # When
+        time.monotonic.return_value = 31
+        result = cache.get("api:secret")
+
+        # Then
+        self.assertIsNone(result)
+        self.assertEqual(len(cache), 0)
+
+    @patch('utils.auth_cache._pubsub_adapter')
+    def test_invalidate_event(self, pubsub_adapter):
+        # Given
+        cache = PrincipalsCache(size = 10, ttl = 30)
+        cache.put("user:token", mock_user(1))
+        cache.put("api:secret", mock_user(1))
+        cache.put("api:other", mock_user(2))
+
+        # When
+        cache.on_auth_event({'action': 'invalidate', 'user_id': 1})
+
+        # Then
+        self.assertIsNone(cache.get("user:token"))
+        self.assertIsNone(cache.get("api:secret"))
+        self.assertIsNotNone(cache.get("api:other"))
+
+    @patch('utils.auth_cache._pubsub_adapter')
+    def test_put_bounded_size(self, pubsub_adapter):
+        # Given
+        cache = PrincipalsCache(size = 2, ttl = 30)
+
+        # When
+        for i in range(0, 5):
+            cache.put("api:{}".format(i), mock_user(i))
+
+        # Then
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("api:0"))
+        self.assertIsNotNone(cache.get("api:4"))
+
+    @patch('middleware.auth_guard.principals_cache', PrincipalsCache(size = 10, ttl = 30))
+    @patch('utils.auth_cache._pubsub_adapter')
+    def test_cache_user_attach_copy(self, pubsub_adapter):
+        # Given
+        from middleware.auth_guard import cache_user, get_cached_user
+        db = Mock()
+        user = mock_user(1)
+
+        # When
+        cache_user("api", "secret", user, db)
+        result = get_cached_user("api", "secret", db)
+
+        # Then
+        db.expunge.assert_called_once_with(user)
+        db.merge.assert_called_with(user, load = False)
+        self.assertIs(result, db.merge.return_value)
+
+    @patch('utils.auth_cache._pubsub_adapter')
+    @patch('utils.auth_cache.time')
+    def test_put_capped_by_token_expiration(self, time, pubsub_adapter):
+        # Given
+        time.monotonic.return_value = 0
+        time.time.return_value = 1000
+        cache = PrincipalsCache(size = 10, ttl = 30)
+
+        # When
+        cache.put("user:token", mock_user(1), exp = 1010)
+        cache.put("user:expired", mock_user(2), exp = 1000)
+        time.monotonic.return_value = 11
+
+        # Then
+        self.assertIsNone(cache.get("user:token"))
+        self.assertIsNone(cache.get("user:expired"))
+        self.assertEqual(len(cache), 0)
+
+    @patch('middleware.auth_guard.principals_cache', PrincipalsCache(size = 10, ttl = 30))
+    @patch('middleware.auth_guard.get_mem_user_token')
+    @patch('middleware.auth_guard.User')
+    @patch('utils.auth_cache._pubsub_adapter')
+    def test_cached_user_token_checked_against_redis(self, pubsub_adapter, User, get_mem_user_token):
+        # Given
+        from exceptions.CwHTTPException import CwHTTPException
+        from middleware.auth_guard import cache_user, get_current_user
+        from schemas.Token import TokenData
+        db = Mock()
+        cache_user("user", "token", mock_user(1), db)
+
+        # When
+        get_mem_user_token.return_value = ("token", TokenData(email = "user@cwcloud.tech"))
+        user = asyncio.run(get_current_user(user_token = "token", auth_token = None, db = db))
+        get_mem_user_token.return_value = ("other", TokenData(email = "user@cwcloud.tech"))
+
+        # Then
+        self.assertIs(user, db.merge.return_value)
+        User.getUserByEmail.assert_not_called()
+        with self.assertRaises(CwHTTPException):
+            asyncio.run(get_current_user(user_token = "token", auth_token = None, db = db))
@@ -0,0 +1,50 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from utils.cache import LruCache
+
+class TestCache(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestCache, self).__init__(*args, **kwargs)
+
+    def test_lru_eviction(self):
+        # Given
+        cache = LruCache(size = 2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+
+        # When
+        cache.get("a")
+        cache.put("c", 3)
+
+        # Then
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+
+    @patch('utils.cache.time')
+    def test_ttl_expiration(self, time):
+        # Given
+        time.monotonic.return_value = 100
+        cache = LruCache(size = 10, ttl = 60)
+        cache.put("a", 1)
+        cache.put("b", 2, ttl = 5)
+
+        # When
+        time.monotonic.return_value = 110
+
+        # Then
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(len(cache), 1)
+
+    def test_disabled(self):
+        # Given
+        cache = LruCache(size = 0)
+
+        # When
+        cache.put("a", 1)
+        LruCache(size = 10).put("b", 2, ttl = 0)
+
+        # Then
+        self.assertIsNone(cache.get("a"))
@@ -0,0 +1,90 @@
+import os
+import tempfile
+
+from unittest import TestCase
+
+from utils.cloud_environments import CloudEnvironments, CloudEnvironmentsRegistry
+
+_config = """
+adapters:
+  pubsub: redis
+providers:
+  - name: scaleway
+    driver: ScalewayDriver
+    instance_configs:
+      - region: fr-par
+        zones:
+          - name: 1
+            instance_types:
+              - type: DEV1-S
+                price_variable: PRICE_SCALEWAY_DEV1_S
+  - name: azure
+    driver: AzureDriver
+    regions:
+      - name: francecentral
+        az_virtual_network_name: vnet
+images:
+  - fr-par-1: ubuntu
+dns_zones:
+  - name: comwork.cloud
+    driver: ScalewayDriver
+  - name: comwork.io
+    driver: CloudflareDriver
+    zone_id: abc
+"""
+
+def write_config(content):
+    fd, path = tempfile.mkstemp(suffix = ".yml")
+    with os.fdopen(fd, 'w') as config_file:
+        config_file.write(content)
+    return path
+
+class TestCloudEnvironments(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestCloudEnvironments, self).__init__(*args, **kwargs)
+
+    def test_indexes(self):
+        # Given
+        registry = CloudEnvironmentsRegistry(write_config(_config))
+
+        # When
+        config = registry.get()
+
+        # Then
+        self.assertIsInstance(config, CloudEnvironments)
+        self.assertEqual(config.get('adapters'), {'pubsub': 'redis'})
+        self.assertEqual(config.providers_by_name['scaleway']['driver'], "ScalewayDriver")
+        self.assertEqual(config.instance_configs['scaleway']['fr-par']['1']['instance_types'][0]['type'], "DEV1-S")
+        self.assertEqual(config.regions['azure']['francecentral']['az_virtual_network_name'], "vnet")
+        self.assertEqual(config.images['fr-par-1'], "ubuntu")
+        self.assertEqual(config.dns_zones_by_name['comwork.io']['zone_id'], "abc")
+        self.assertEqual(config.dns_zones_by_provider, {'scaleway': ['comwork.cloud'], 'cloudflare': ['comwork.io']})
+
+    def test_get_parse_once(self):
+        # Given
+        path = write_config(_config)
+        registry = CloudEnvironmentsRegistry(path)
+        config = registry.get()
+
+        # When
+        write_config(_config)
+        os.utime(path, (0, 0))
+
+        # Then
+        self.assertIs(registry.get(), config)
+
+    def test_get_hot_reload(self):
+        # Given
+        path = write_config(_config)
+        registry = CloudEnvironmentsRegistry(path, hot_reload = True, reload_interval = 0)
+        config = registry.get()
+
+        # When
+        with open(path, 'w') as config_file:
+            config_file.write("adapters:\n  pubsub: nats\n")
+        os.utime(path, (0, 0))
+
+        # Then
+        self.assertIsNot(registry.get(), config)
+        self.assertEqual(registry.get().get('adapters'), {'pubsub': 'nats'})
+        self.assertEqual(registry.get().providers, [])
@@ -0,0 +1,70 @@
+import asyncio
+
+from unittest import TestCase
+from unittest.mock import AsyncMock
+
+from utils.consumer import ConsumerPool, get_prefetch
+
+class TestConsumerPool(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestConsumerPool, self).__init__(*args, **kwargs)
+
+    def test_pool_bounded_concurrency(self):
+        # Given
+        concurrency = 3
+        state = {'running': 0, 'max_running': 0}
+
+        async def handler(msg):
+            state['running'] += 1
+            state['max_running'] = max(state['max_running'], state['running'])
+            await asyncio.sleep(0.01)
+            state['running'] -= 1
+
+        async def run():
+            pool = ConsumerPool(concurrency)
+            for i in range(0, 10):
+                await pool.submit(handler, i)
+            await pool.join()
+
+        # When
+        asyncio.run(run())
+
+        # Then
+        self.assertEqual(state['max_running'], concurrency)
+
+    def test_pool_ack_and_nack(self):
+        # Given
+        ack = AsyncMock()
+        nack = AsyncMock()
+
+        async def handler(msg):
+            if msg == "error":
+                raise ValueError("unexpected")
+            return msg != "ko"
+
+        async def run():
+            pool = ConsumerPool(2)
+            for msg in ["ok", "ko", "error"]:
+                await pool.submit(handler, msg, ack, nack)
+            await pool.join()
+
+        # When
+        asyncio.run(run())
+
+        # Then
+        ack.assert_awaited_once_with("ok")
+        self.assertEqual(nack.await_count, 2)
+
+    def test_get_prefetch(self):
+        # Given
+        concurrency = 4
+
+        # When
+        default_prefetch = get_prefetch(concurrency)
+        lower_prefetch = get_prefetch(concurrency, 2)
+        higher_prefetch = get_prefetch(concurrency, 10)
+
+        # Then
+        self.assertEqual(default_prefetch, 4)
+        self.assertEqual(lower_prefetch, 4)
+        self.assertEqual(higher_prefetch, 10)
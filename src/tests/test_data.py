@@ -1,6 +1,12 @@
+from datetime import datetime, timedelta
 from unittest import TestCase
+import json
+
 from unittest.mock import Mock, patch
 
+from controllers.iot.data import add_bulk_data, decode_bulk_data, get_data_aggregates, parse_bulk_data
+from entities.faas.Function import FunctionEntity as Function
+
 test_current_user = Mock()
 mock_user_auth = Mock()
 mock_db = Mock()
@@ -47,3 +53,181 @@ class TestData(TestCase):
         # Then
         self.assertEqual(result['status'], 'ok')
         self.assertEqual(result['message'], 'Data added successfully')
+
+    def test_parse_bulk_data_ndjson(self):
+        # Given
+        body = '{"device_id": "d1", "content": "1"}\n\nnot json\n{"device_id": "d2", "content": "2"}\n'
+
+        # When
+        items = parse_bulk_data(body)
+
+        # Then
+        self.assertEqual(len(items), 3)
+        self.assertEqual(items[0]['device_id'], "d1")
+        self.assertIsNone(items[1])
+
+    def test_parse_bulk_data_array(self):
+        # Given
+        body = ' [{"device_id": "d1", "content": "1"}, {"device_id": "d2", "content": "2"}]'
+
+        # When
+        items = parse_bulk_data(body)
+
+        # Then
+        self.assertEqual([item['device_id'] for item in items], ["d1", "d2"])
+
+    def test_add_bulk_data_invalid_body(self):
+        # Given
+        body = '[{"device_id": "d1"'
+
+        # When
+        response = add_bulk_data(test_current_user, mock_user_auth, body, mock_db)
+
+        # Then
+        self.assertEqual(response.status_code, 400)
+
+    @patch('controllers.iot.data.publish_iot_triggers')
+    @patch('controllers.iot.data.TriggerEntity')
+    @patch('controllers.iot.data.publish_iot_data_batch')
+    @patch('controllers.iot.data.IOT_ASYNC_INGESTION', True)
+    @patch('controllers.iot.data.FunctionEntity')
+    @patch('controllers.iot.data.ObjectType')
+    @patch('controllers.iot.data.Device')
+    def test_add_bulk_data_per_item_status(self, Device, ObjectType, FunctionEntity, publish_iot_data_batch, TriggerEntity, publish_iot_triggers):
+        # Given
+        device_id = "9f2b6c1e-4a3d-4b8e-9c7f-1a2b3c4d5e6f"
+        inactive_device_id = "0e1d2c3b-4a59-4687-a5b4-c3d2e1f0a9b8"
+        current_user = Mock(id = 1, email = "user@cwcloud.tech", is_admin = False)
+        Device.getDevicesByIds.return_value = [
+            Mock(id = device_id, typeobject_id = "t1", username = current_user.email, active = True),
+            Mock(id = inactive_device_id, typeobject_id = "t1", username = current_user.email, active = False)
+        ]
+        trigger_id = "5a4b3c2d-1e0f-4a9b-8c7d-6e5f4a3b2c1d"
+        ObjectType.findByIds.return_value = [Mock(id = "t1", content = {'decoding_function': "f1", 'triggers': [trigger_id]})]
+        FunctionEntity.findByIds.return_value = [Function(id = "f1", is_public = True, content = {'args': ["data"]})]
+        TriggerEntity.findByIds.return_value = [Mock(id = trigger_id)]
+        timestamp = (datetime.now() - timedelta(hours = 1)).replace(microsecond = 0)
+        body = "\n".join([
+            json.dumps({'device_id': device_id, 'content': "1", 'timestamp': timestamp.isoformat()}),
+            json.dumps({'device_id': device_id, 'content': "2"}),
+            json.dumps({'device_id': inactive_device_id, 'content': "3"}),
+            json.dumps({'content': "4"}),
+            json.dumps({'device_id': "unknown", 'content': "5"})
+        ])
+
+        # When
+        response = add_bulk_data(current_user, Mock(is_authenticated = False), body, mock_db)
+
+        # Then
+        results = json.loads(response.body)['results']
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([result['code'] for result in results], [202, 202, 403, 400, 404])
+        self.assertEqual(results[2]['i18n_code'], "device_not_active")
+        Device.getDevicesByIds.assert_called_once()
+        ObjectType.findByIds.assert_called_once()
+        FunctionEntity.findByIds.assert_called_once()
+        TriggerEntity.findByIds.assert_called_once_with({trigger_id}, mock_db)
+        publish_iot_triggers.assert_called_once_with(TriggerEntity.findByIds.return_value)
+        messages = publish_iot_data_batch.call_args.args[0]
+        self.assertEqual(len(messages), 2)
+        self.assertEqual(messages[0]['created_at'], timestamp.strftime("%Y-%m-%d %H:%M:%S"))
+
+    @patch('controllers.iot.data.publish_iot_data_batch')
+    @patch('controllers.iot.data.IOT_ASYNC_INGESTION', True)
+    @patch('controllers.iot.data.FunctionEntity')
+    @patch('controllers.iot.data.ObjectType')
+    @patch('controllers.iot.data.Device')
+    def test_add_bulk_data_invalid_timestamp(self, Device, ObjectType, FunctionEntity, publish_iot_data_batch):
+        # Given
+        device_id = "9f2b6c1e-4a3d-4b8e-9c7f-1a2b3c4d5e6f"
+        current_user = Mock(id = 1, email = "user@cwcloud.tech", is_admin = False)
+        Device.getDevicesByIds.return_value = [Mock(id = device_id, typeobject_id = "t1", username = current_user.email, active = True)]
+        ObjectType.findByIds.return_value = [Mock(id = "t1", content = {'decoding_function': "f1"})]
+        FunctionEntity.findByIds.return_value = [Function(id = "f1", is_public = True, content = {'args': ["data"]})]
+        body = "\n".join([
+            json.dumps({'device_id': device_id, 'content': "1"}),
+            json.dumps({'device_id': device_id, 'content': "2", 'timestamp': "0005-01-01T00:00:00"}),
+            json.dumps({'device_id': device_id, 'content': "3", 'timestamp': "9999-12-31T23:00:00"}),
+            json.dumps({'device_id': device_id, 'content': "4", 'timestamp': "9999-12-31T23:00:00-12:00"}),
+            json.dumps({'device_id': device_id, 'content': "5", 'timestamp': (datetime.now() + timedelta(days = 1)).isoformat()})
+        ])
+
+        # When
+        response = add_bulk_data(current_user, Mock(is_authenticated = False), body, mock_db)
+
+        # Then
+        results = json.loads(response.body)['results']
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([result['code'] for result in results], [202, 400, 400, 400, 400])
+        self.assertEqual({result['i18n_code'] for result in results[1:]}, {"invalid_timestamp"})
+        self.assertEqual(len(publish_iot_data_batch.call_args.args[0]), 1)
+
+    @patch('controllers.iot.data.save_decoded_data')
+    @patch('controllers.iot.data.wait_for_invocations')
+    @patch('controllers.iot.data.create_decoding_invocations')
+    def test_decode_bulk_data_rejected_item(self, create_decoding_invocations, wait_for_invocations, save_decoded_data):
+        # Given
+        messages = [{'index': 0, 'device_id': "d1"}, {'index': 1, 'device_id': "d1"}]
+        create_decoding_invocations.return_value = {"i0": messages[0], "i1": messages[1]}
+        wait_for_invocations.return_value = ({"i0": {'content': {'result': "1"}}, "i1": {'content': {'result': "x" * 255}}}, set())
+        save_decoded_data.return_value = (1, {"i1": "string result longer than 254 characters"})
+        results = [None, None]
+
+        # When
+        decode_bulk_data(messages, results, mock_db)
+
+        # Then
+        self.assertEqual([result['code'] for result in results], [201, 422])
+        self.assertEqual(results[1]['i18n_code'], 'invalid_decoded_data')
+
+    @patch('controllers.iot.data.get_aggregates')
+    @patch('controllers.iot.data.Device')
+    def test_get_data_aggregates(self, Device, get_aggregates):
+        # Given
+        device_id = "9f2b6c1e-4a3d-4b8e-9c7f-1a2b3c4d5e6f"
+        current_user = Mock(is_admin = False, email = "user@cwcloud.tech")
+        get_aggregates.return_value = [{'bucket': "2026-10-18T10:00:00", 'count': 2, 'min': 1.0, 'max': 3.0, 'avg': 2.0, 'p50': 2.0}]
+
+        # When
+        response = get_data_aggregates(current_user, device_id, "data", "1h", datetime(2026, 10, 17), datetime(2026, 10, 18), "50", mock_db)
+
+        # Then
+        content = json.loads(response.body.decode())
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(content['buckets'], get_aggregates.return_value)
+        self.assertEqual(get_aggregates.call_args.args[5], [50.0])
+        Device.getUserDeviceById.assert_called_once_with(current_user.email, device_id, mock_db)
+
+    @patch('controllers.iot.data.get_aggregates')
+    @patch('controllers.iot.data.Device')
+    def test_get_data_aggregates_default_range(self, Device, get_aggregates):
+        # Given
+        device_id = "9f2b6c1e-4a3d-4b8e-9c7f-1a2b3c4d5e6f"
+        current_user = Mock(is_admin = True)
+        get_aggregates.return_value = []
+
+        # When
+        responses = [get_data_aggregates(current_user, device_id, "data", interval, None, None, None, mock_db) for interval in ["1m", "5m", "1h", "1d"]]
+
+        # Then
+        self.assertEqual([response.status_code for response in responses], [200, 200, 200, 200])
+        self.assertEqual(get_aggregates.call_count, 4)
+
+    @patch('controllers.iot.data.get_aggregates')
+    @patch('controllers.iot.data.Device')
+    def test_get_data_aggregates_invalid_query(self, Device, get_aggregates):
+        # Given
+        device_id = "9f2b6c1e-4a3d-4b8e-9c7f-1a2b3c4d5e6f"
+        current_user = Mock(is_admin = True)
+
+        # When
+        invalid_interval = get_data_aggregates(current_user, device_id, "data", "2m", None, None, None, mock_db)
+        too_many_buckets = get_data_aggregates(current_user, device_id, "data", "1m", datetime(2026, 1, 1), datetime(2026, 10, 18), None, mock_db)
+        invalid_percentiles = get_data_aggregates(current_user, device_id, "data", "1h", None, None, "0,50", mock_db)
+
+        # Then
+        self.assertEqual(invalid_interval.status_code, 400)
+        self.assertEqual(json.loads(too_many_buckets.body.decode())['i18n_code'], 'aggregate_too_many_buckets')
+        self.assertEqual(invalid_percentiles.status_code, 400)
+        get_aggregates.assert_not_called()
+
@@ -0,0 +1,86 @@
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from consume.functions import FunctionsCache, get_template
+
+class TestFunctionsCache(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestFunctionsCache, self).__init__(*args, **kwargs)
+
+    def test_get_same_version(self):
+        # Given
+        cache = FunctionsCache(size = 10, ttl = 300)
+        cache.put("f1", "v1", {"content": {"language": "python"}})
+
+        # When
+        entry = cache.get("f1", "v1")
+
+        # Then
+        self.assertIsNotNone(entry)
+        self.assertEqual(entry['function']['content']['language'], "python")
+
+    def test_get_other_version(self):
+        # Given
+        cache = FunctionsCache(size = 10, ttl = 300)
+        cache.put("f1", "v1", {})
+
+        # When
+        entry = cache.get("f1", "v2")
+
+        # Then
+        self.assertIsNone(entry)
+        self.assertEqual(len(cache), 0)
+
+    def test_put_evict_least_recently_used(self):
+        # Given
+        cache = FunctionsCache(size = 2, ttl = 300)
+        cache.put("f1", "v1", {})
+        cache.put("f2", "v1", {})
+        cache.get("f1")
+
+        # When
+        cache.put("f3", "v1", {})
+
+        # Then
+        self.assertIsNotNone(cache.get("f1"))
+        self.assertIsNone(cache.get("f2"))
+        self.assertIsNotNone(cache.get("f3"))
+
+    @patch('consume.functions.time')
+    def test_get_expired(self, time):
+        # Given
+        time.monotonic.return_value = 0
+        cache = FunctionsCache(size = 10, ttl = 300)
+        cache.put("f1", "v1", {})
+
+        # When
+        time.monotonic.return_value = 301
+        entry = cache.get("f1")
+
+        # Then
+        self.assertIsNone(entry)
+
+    def test_invalidate(self):
+        # Given
+        cache = FunctionsCache(size = 10, ttl = 300)
+        cache.put("f1", "v1", {})
+
+        # When
+        cache.invalidate("f1")
+
+        # Then
+        self.assertIsNone(cache.get("f1"))
+
+    def test_get_template_render_once(self):
+        # Given
+        cache = FunctionsCache(size = 10, ttl = 300)
+        entry = cache.put("f1", "v1", {})
+        render = MagicMock(return_value = "r = {{ handle_call|safe }}")
+
+        # When
+        get_template(entry, "py", render)
+        template = get_template(entry, "py", render)
+
+        # Then
+        render.assert_called_once()
+        self.assertEqual(template.render(handle_call = "handle(\"a\")"), "r = handle(\"a\")")
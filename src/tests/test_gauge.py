@@ -1,7 +1,14 @@
 import re
 
 from unittest import TestCase
-from utils.observability.gauge import _numeric_value_pattern
+from unittest.mock import patch
+
+from prometheus_client import REGISTRY
+
+from utils.observability.gauge import _numeric_value_pattern, BoundedGaugesRegistry, create_gauge, get_series_key, get_numeric_value, observe_gauge_series, set_gauge
+
+def new_labels(source):
+    return {'source': source, 'kind': "cpu"}
 
 class TestGauge(TestCase):
     def init(self, *args, **kwargs):
@@ -46,3 +53,101 @@ class TestGauge(TestCase):
 
         ## Then
         self.assertFalse(result)
+
+    def test_get_numeric_value(self):
+        # Given
+        values = [12, 1.5, "42 ms", "-3.5", "ko", True]
+
+        # When
+        results = [get_numeric_value(value) for value in values]
+
+        # Then
+        self.assertEqual(results, [12.0, 1.5, 42.0, -3.5, None, None])
+
+    def test_get_series_key(self):
+        # Given
+        labels = {'source': "api", 'code': 1}
+        other_labels = {'code': "1", 'source': "api"}
+
+        # When
+        key = get_series_key(labels)
+
+        # Then
+        self.assertEqual(key, get_series_key(other_labels))
+        self.assertEqual(key, (('code', "1"), ('source', "api")))
+
+    @patch('utils.observability.gauge.gauge_series_rejected')
+    def test_set_per_owner_quota(self, gauge_series_rejected):
+        # Given
+        registry = BoundedGaugesRegistry("test_quota", max_series = 10, max_series_per_owner = 2, ttl = 60)
+
+        # When
+        results = [registry.set(1, "test_quota_cpu", "cpu", new_labels("node{}".format(i)), 10, now = 0) for i in range(0, 3)]
+        other_owner = registry.set(2, "test_quota_cpu", "cpu", new_labels("other"), 10, now = 0)
+        update = registry.set(1, "test_quota_cpu", "cpu", new_labels("node0"), 20, now = 0)
+
+        # Then
+        self.assertEqual(results, [True, True, False])
+        self.assertTrue(other_owner)
+        self.assertTrue(update)
+        self.assertEqual(registry.count(1), 2)
+        gauge_series_rejected.labels.assert_called_once_with("test_quota", 'quota')
+        self.assertEqual(REGISTRY.get_sample_value("test_quota_cpu", new_labels("node0")), 20)
+
+    @patch('utils.observability.gauge.gauge_series_rejected')
+    def test_set_max_series(self, gauge_series_rejected):
+        # Given
+        registry = BoundedGaugesRegistry("test_limit", max_series = 2, max_series_per_owner = 10, ttl = 60)
+
+        # When
+        results = [registry.set(i, "test_limit_cpu", "cpu", new_labels("node{}".format(i)), 10, now = 0) for i in range(0, 3)]
+
+        # Then
+        self.assertEqual(results, [True, True, False])
+        self.assertEqual(len(registry), 2)
+        gauge_series_rejected.labels.assert_called_once_with("test_limit", 'limit')
+
+    def test_expire_stale_series(self):
+        # Given
+        registry = BoundedGaugesRegistry("test_expire", max_series = 10, max_series_per_owner = 10, ttl = 60)
+        registry.set(1, "test_expire_cpu", "cpu", new_labels("node1"), 10, now = 0)
+        registry.set(1, "test_expire_ram", "ram", new_labels("node1"), 10, now = 0)
+        registry.set(1, "test_expire_cpu", "cpu", new_labels("node2"), 10, now = 50)
+
+        # When
+        registry.expire(now = 100)
+
+        # Then
+        self.assertEqual(len(registry), 1)
+        self.assertEqual(registry.count(1), 1)
+        self.assertIsNone(REGISTRY.get_sample_value("test_expire_cpu", new_labels("node1")))
+        self.assertEqual(REGISTRY.get_sample_value("test_expire_cpu", new_labels("node2")), 10)
+        self.assertIsNone(REGISTRY.get_sample_value("test_expire_ram", new_labels("node1")))
+        self.assertTrue(registry.set(1, "test_expire_ram", "ram", new_labels("node1"), 5, now = 100))
+
+    def test_observe_gauge_series_per_labels(self):
+        # Given
+        gauge = create_gauge("test_otel_result", "result", ['source', 'kind'])
+
+        # When
+        set_gauge(gauge, 1, new_labels("node1"))
+        set_gauge(gauge, 0, new_labels("node2"))
+        set_gauge(gauge, "12 ms", new_labels("node1"))
+
+        # Then
+        observations = {observation.attributes['source']: observation.value for observation in observe_gauge_series("test_otel_result")}
+        self.assertEqual(observations, {'node1': 12.0, 'node2': 0.0})
+        self.assertEqual(REGISTRY.get_sample_value("test_otel_result", new_labels("node1")), 12.0)
+
+    def test_expire_otel_series(self):
+        # Given
+        registry = BoundedGaugesRegistry("test_otel_expire", max_series = 10, max_series_per_owner = 10, ttl = 60)
+        registry.set(1, "test_otel_expire_cpu", "cpu", new_labels("node1"), 10, now = 0)
+        registry.set(1, "test_otel_expire_cpu", "cpu", new_labels("node2"), 20, now = 50)
+
+        # When
+        registry.expire(now = 100)
+
+        # Then
+        observations = [(observation.attributes, observation.value) for observation in observe_gauge_series("test_otel_expire_cpu")]
+        self.assertEqual(observations, [(new_labels("node2"), 20.0)])
@@ -0,0 +1,90 @@
+import asyncio
+
+from unittest import TestCase
+from unittest.mock import AsyncMock, patch
+
+from utils.observability.geoip import GeoIpCache, parse_geoip_record
+from utils.observability.tracker import aget_infos_from_ip, get_tracker_img
+
+class TestGeoIp(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestGeoIp, self).__init__(*args, **kwargs)
+
+    @patch('utils.cache.time')
+    def test_cache_lru_and_ttl(self, time):
+        # Given
+        time.monotonic.return_value = 0
+        cache = GeoIpCache(size = 2)
+        cache.put("1.1.1.1", {'status': "ok"}, 60)
+        cache.put("2.2.2.2", {'status': "ok"}, 60)
+        cache.get("1.1.1.1")
+
+        # When
+        cache.put("3.3.3.3", {'status': "ok"}, 10)
+        time.monotonic.return_value = 11
+
+        # Then
+        self.assertIsNotNone(cache.get("1.1.1.1"))
+        self.assertIsNone(cache.get("2.2.2.2"))
+        self.assertIsNone(cache.get("3.3.3.3"))
+
+    @patch('utils.observability.tracker.lookup_geoip_database', return_value = None)
+    @patch('utils.observability.tracker.acache_infos', new_callable = AsyncMock)
+    @patch('utils.observability.tracker.afetch_infos_from_ip', new_callable = AsyncMock)
+    @patch('utils.observability.tracker.aget_cached_infos', new_callable = AsyncMock)
+    def test_aget_infos_from_ip_cached(self, aget_cached_infos, afetch_infos_from_ip, acache_infos, lookup_geoip_database):
+        # Given
+        aget_cached_infos.return_value = {'status': "ok", 'city': "Paris"}
+
+        # When
+        result = asyncio.run(aget_infos_from_ip("1.1.1.1"))
+
+        # Then
+        self.assertEqual(result['city'], "Paris")
+        afetch_infos_from_ip.assert_not_called()
+        acache_infos.assert_not_called()
+
+    @patch('utils.observability.tracker.lookup_geoip_database', return_value = None)
+    @patch('utils.observability.tracker.acache_infos', new_callable = AsyncMock)
+    @patch('utils.observability.tracker.afetch_infos_from_ip', new_callable = AsyncMock)
+    @patch('utils.observability.tracker.aget_cached_infos', new_callable = AsyncMock)
+    def test_aget_infos_from_ip_miss(self, aget_cached_infos, afetch_infos_from_ip, acache_infos, lookup_geoip_database):
+        # Given
+        aget_cached_infos.return_value = None
+        afetch_infos_from_ip.return_value = {'status': "ok", 'city': "Lyon"}
+
+        # When
+        result = asyncio.run(aget_infos_from_ip("1.1.1.1"))
+
+        # Then
+        self.assertEqual(result['city'], "Lyon")
+        acache_infos.assert_awaited_once_with("1.1.1.1", {'status': "ok", 'city': "Lyon"})
+
+    def test_parse_geoip_record(self):
+        # Given
+        record = {
+            'city': {'names': {'en': "Paris"}},
+            'country': {'iso_code': "FR", 'names': {'en': "France"}},
+            'subdivisions': [{'iso_code': "IDF", 'names': {'en': "Ile-de-France"}}],
+            'location': {'latitude': 48.85, 'longitude': 2.35, 'time_zone': "Europe/Paris"}
+        }
+
+        # When
+        result = parse_geoip_record("1.1.1.1", record)
+
+        # Then
+        self.assertEqual(result['city'], "Paris")
+        self.assertEqual(result['country_iso'], "FR")
+        self.assertEqual(result['region_code'], "IDF")
+        self.assertEqual(result['loc'], "48.85,2.35")
+
+    def test_get_tracker_img_in_memory(self):
+        # Given
+        png_signature = b'\x89PNG'
+
+        # When
+        result = get_tracker_img()
+
+        # Then
+        self.assertTrue(result.startswith(png_signature))
+        self.assertIs(result, get_tracker_img())
@@ -0,0 +1,22 @@
+import asyncio
+
+from unittest import TestCase
+
+from utils import http
+from utils.http import close_async_http_client, get_async_http_client
+
+class TestHttp(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestHttp, self).__init__(*args, **kwargs)
+
+    def test_close_async_http_client(self):
+        # Given
+        client = get_async_http_client()
+
+        # When
+        asyncio.run(close_async_http_client())
+
+        # Then
+        self.assertTrue(client.is_closed)
+        self.assertIsNone(http._async_http_client)
+        self.assertIsNot(get_async_http_client(), client)
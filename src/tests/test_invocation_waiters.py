@@ -0,0 +1,88 @@
+import asyncio
+import threading
+
+from unittest import TestCase
+from unittest.mock import AsyncMock, Mock, patch
+
+from utils.faas.waiters import InvocationWaiters
+
+class TestInvocationWaiters(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestInvocationWaiters, self).__init__(*args, **kwargs)
+
+    @patch('utils.faas.waiters._pubsub_adapter')
+    def test_event_notified(self, pubsub_adapter):
+        # Given
+        waiters = InvocationWaiters()
+
+        # When
+        with waiters.event("1") as event:
+            threading.Timer(0.05, waiters.on_invocation_event, [{'id': "1", 'state': "complete"}]).start()
+            notified = event.wait(5)
+
+        # Then
+        self.assertTrue(notified)
+        pubsub_adapter.return_value.subscribe.assert_called_once()
+
+    @patch('utils.faas.waiters._pubsub_adapter')
+    def test_event_other_invocation(self, pubsub_adapter):
+        # Given
+        waiters = InvocationWaiters()
+
+        # When
+        with waiters.event("1") as event:
+            waiters.on_invocation_event({'id': "2", 'state': "complete"})
+            notified = event.wait(0.05)
+
+        # Then
+        self.assertFalse(notified)
+
+    @patch('utils.faas.waiters._pubsub_adapter')
+    def test_aevent_notified_from_another_thread(self, pubsub_adapter):
+        # Given
+        waiters = InvocationWaiters()
+
+        async def wait():
+            with waiters.aevent("1") as event:
+                threading.Timer(0.05, waiters.on_invocation_event, [{'id': "1", 'state': "complete"}]).start()
+                await asyncio.wait_for(event.wait(), timeout = 5)
+            return event.is_set()
+
+        # When
+        notified = asyncio.run(wait())
+
+        # Then
+        self.assertTrue(notified)
+
+    @patch('controllers.faas.invocations.invocation_waiters', InvocationWaiters())
+    @patch('utils.faas.waiters._pubsub_adapter')
+    @patch('controllers.faas.invocations.afind_invocation_state')
+    @patch('controllers.faas.invocations.ainvoke', return_value = {'status': 'ok', 'code': 202, 'id': "1"})
+    def test_ainvoke_sync_wait_for_completion(self, ainvoke, afind_invocation_state, pubsub_adapter):
+        # Given
+        from controllers.faas.invocations import ainvoke_sync, invocation_waiters
+        completed = {'status': 'ok', 'code': 200, 'entity': Mock()}
+        afind_invocation_state.side_effect = [({'status': 'ok'}, False), (completed, True)]
+
+        # When
+        threading.Timer(0.1, invocation_waiters.on_invocation_event, [{'id': "1", 'state': "complete"}]).start()
+        result = asyncio.run(ainvoke_sync(Mock(), Mock(), Mock(), AsyncMock()))
+
+        # Then
+        self.assertEqual(result, completed)
+        self.assertEqual(afind_invocation_state.call_count, 2)
+
+    @patch('utils.faas.waiters._pubsub_adapter')
+    def test_subscribe_retry_failure(self, pubsub_adapter):
+        # Given
+        waiters = InvocationWaiters()
+        pubsub_adapter.return_value.subscribe.side_effect = [Exception("connection refused"), None]
+
+        # When
+        with self.assertRaises(Exception):
+            waiters.subscribe()
+        waiters.subscribe()
+        waiters.subscribe()
+
+        # Then
+        self.assertEqual(pubsub_adapter.return_value.subscribe.call_count, 2)
@@ -0,0 +1,143 @@
+from datetime import datetime
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from entities.faas.Invocation import InvocationEntity
+from schemas.UserAuthentication import UserAuthentication
+from utils.iot.ingestion import new_iot_data_message, save_decoded_data, to_data_rows, wait_for_invocations
+
+def new_invocation(id, state = "complete", result = "12.5"):
+    return InvocationEntity(id = id, invoker_id = 1, content = {'function_id': "f1", 'state': state, 'result': result})
+
+class TestIotIngestion(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestIotIngestion, self).__init__(*args, **kwargs)
+
+    def test_new_iot_data_message(self):
+        # Given
+        user_auth = UserAuthentication(is_authenticated = True, header_key = "X-Auth-Token", header_value = "token")
+
+        # When
+        message = new_iot_data_message("d1", "f1", 1, user_auth, "payload")
+
+        # Then
+        self.assertEqual(message['device_id'], "d1")
+        self.assertEqual(message['user_auth']['header_value'], "token")
+        self.assertIsNotNone(message['created_at'])
+
+    def test_to_data_rows_numeric(self):
+        # Given
+        message = new_iot_data_message("d1", "f1", 1, None, "payload", "2026-10-18 10:00:00")
+
+        # When
+        data, numeric_data, string_data = to_data_rows(message, {'content': {'result': "12.5"}})
+
+        # Then
+        self.assertIsNone(string_data)
+        self.assertEqual(numeric_data['value'], 12.5)
+        self.assertEqual(numeric_data['data_id'], data['id'])
+        self.assertEqual(data['created_at'], datetime(2026, 10, 18, 10, 0, 0))
+        self.assertEqual(data['normalized_content']['entity'], {'content': {'result': "12.5"}})
+
+    def test_to_data_rows_string(self):
+        # Given
+        message = new_iot_data_message("d1", "f1", 1, None, "payload")
+
+        # When
+        _, numeric_data, string_data = to_data_rows(message, {'content': {'result': "on"}})
+
+        # Then
+        self.assertIsNone(numeric_data)
+        self.assertEqual(string_data['value'], "on")
+
+    @patch('utils.iot.ingestion.ensure_data_partitions')
+    @patch('entities.iot.Data.StringData.insertStringData')
+    @patch('entities.iot.Data.NumericData.insertNumericData')
+    @patch('entities.iot.Data.Data.insertData')
+    def test_save_decoded_data_bulk_insert(self, insert_data, insert_numeric_data, insert_string_data, ensure_data_partitions):
+        # Given
+        db = Mock()
+        invocations = {"i{}".format(i): new_iot_data_message("d1", "f1", 1, None, "payload") for i in range(0, 3)}
+        results = {
+            "i0": {'content': {'state': "complete", 'result': "1"}},
+            "i1": {'content': {'state': "complete", 'result': "on"}},
+            "i2": {'content': {'state': "error", 'result': None}}
+        }
+
+        # When
+        count, rejected = save_decoded_data(invocations, results, db)
+
+        # Then
+        self.assertEqual(count, 2)
+        self.assertEqual(rejected, {})
+        self.assertEqual(len(insert_data.call_args.args[0]), 2)
+        self.assertEqual(len(insert_numeric_data.call_args.args[0]), 1)
+        self.assertEqual(len(insert_string_data.call_args.args[0]), 1)
+        db.commit.assert_called_once()
+
+    @patch('utils.iot.ingestion.ensure_data_partitions')
+    @patch('entities.iot.Data.StringData.insertStringData')
+    @patch('entities.iot.Data.NumericData.insertNumericData')
+    @patch('entities.iot.Data.Data.insertData')
+    def test_save_decoded_data_rejects_invalid_rows(self, insert_data, insert_numeric_data, insert_string_data, ensure_data_partitions):
+        # Given
+        db = Mock()
+        invocations = {
+            "i0": new_iot_data_message("d1", "f1", 1, None, "payload"),
+            "i1": new_iot_data_message("d1", "f1", 1, None, "payload"),
+            "i2": new_iot_data_message("d1", "f1", 1, None, "payload", "5-01-01 00:00:00"),
+            "i3": new_iot_data_message("d1", "f1", 1, None, "payload", "9999-12-31 23:00:00")
+        }
+        results = {id: {'content': {'state': "complete", 'result': "1"}} for id in invocations}
+        results["i1"] = {'content': {'state': "complete", 'result': "x" * 255}}
+
+        # When
+        count, rejected = save_decoded_data(invocations, results, db)
+
+        # Then
+        self.assertEqual(count, 1)
+        self.assertEqual(set(rejected), {"i1", "i2", "i3"})
+        self.assertEqual(len(insert_data.call_args.args[0]), 1)
+        insert_string_data.assert_not_called()
+        db.commit.assert_called_once()
+
+    def test_to_data_rows_json_result(self):
+        # Given
+        message = new_iot_data_message("d1", "f1", 1, None, "payload")
+
+        # When
+        _, _, string_data = to_data_rows(message, {'content': {'result': {'temperature': 21}}})
+
+        # Then
+        self.assertEqual(string_data['value'], '{"temperature": 21}')
+
+    @patch('utils.iot.ingestion.invocation_waiters')
+    def test_wait_for_invocations_single_query_per_check(self, invocation_waiters):
+        # Given
+        db = Mock()
+        db.query.return_value.filter.return_value.all.side_effect = [
+            [new_invocation("i1"), new_invocation("i2", state = "in_progress")],
+            [new_invocation("i2")]
+        ]
+
+        # When
+        results, pending = wait_for_invocations(["i1", "i2"], db, timeout = 5, interval = 0)
+
+        # Then
+        self.assertEqual(set(results.keys()), {"i1", "i2"})
+        self.assertEqual(pending, set())
+        self.assertEqual(db.query.call_count, 2)
+        self.assertEqual(invocation_waiters.register.call_count, 2)
+
+    @patch('utils.iot.ingestion.invocation_waiters')
+    def test_wait_for_invocations_timeout(self, invocation_waiters):
+        # Given
+        db = Mock()
+        db.query.return_value.filter.return_value.all.return_value = [new_invocation("i1", state = "in_progress")]
+
+        # When
+        results, pending = wait_for_invocations(["i1"], db, timeout = 0, interval = 0)
+
+        # Then
+        self.assertEqual(results, {})
+        self.assertEqual(pending, {"i1"})
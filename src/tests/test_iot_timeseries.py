@@ -0,0 +1,182 @@
+from datetime import datetime
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from utils.iot import timeseries
+from utils.iot.timeseries import count_buckets, decode_cursor, encode_cursor, ensure_data_partitions, is_accepted_time, format_percentile, get_expired_partitions, get_page, get_retention_cutoff, parse_percentiles, rollup_numeric_data
+
+_id = "9f2b6c1e-4a3d-4b8e-9c7f-1a2b3c4d5e6f"
+
+class TestIotTimeseries(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestIotTimeseries, self).__init__(*args, **kwargs)
+
+    def test_cursor_round_trip(self):
+        # Given
+        entity = Mock(created_at = datetime(2026, 10, 18, 10, 0, 0), id = _id)
+
+        # When
+        cursor = decode_cursor(encode_cursor(entity))
+
+        # Then
+        self.assertEqual(cursor, (datetime(2026, 10, 18, 10, 0, 0), _id))
+
+    def test_decode_invalid_cursor(self):
+        # Given
+        cursor = "bm90LWEtY3Vyc29y"
+
+        # When / Then
+        with self.assertRaises(ValueError):
+            decode_cursor(cursor)
+
+    def test_get_page_next_cursor(self):
+        # Given
+        rows = [Mock(created_at = datetime(2026, 10, 18, 10, 0, 3 - i), id = _id) for i in range(0, 3)]
+        entity = Mock()
+        entity.findPage.return_value = rows
+
+        # When
+        results, next_cursor = get_page(entity, None, None, None, None, None, 2, Mock())
+
+        # Then
+        self.assertEqual(entity.findPage.call_args.args[5], 3)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(decode_cursor(next_cursor)[0], rows[1].created_at)
+
+    def test_get_page_last_page(self):
+        # Given
+        entity = Mock()
+        entity.findPage.return_value = [Mock(created_at = datetime(2026, 10, 18), id = _id)]
+
+        # When
+        results, next_cursor = get_page(entity, None, None, None, None, None, 2, Mock())
+
+        # Then
+        self.assertEqual(len(results), 1)
+        self.assertIsNone(next_cursor)
+
+    def test_get_retention_cutoff(self):
+        # Given
+        now = datetime(2026, 2, 15, 10, 0, 0)
+
+        # When
+        cutoff = get_retention_cutoff(now, 3)
+
+        # Then
+        self.assertEqual(cutoff, datetime(2025, 11, 1))
+
+    def test_get_expired_partitions(self):
+        # Given
+        partitions = ["numeric_data_202509", "numeric_data_202510", "numeric_data_202511", "numeric_data_default"]
+
+        # When
+        expired = get_expired_partitions(partitions, datetime(2025, 11, 1))
+
+        # Then
+        self.assertEqual(expired, ["numeric_data_202509", "numeric_data_202510"])
+
+    def test_rollup_numeric_data(self):
+        # Given
+        numeric_datas = [
+            {'device_id': _id, 'key': "data", 'value': 3.0, 'created_at': datetime(2026, 10, 18, 10, 0, 5)},
+            {'device_id': _id, 'key': "data", 'value': 1.0, 'created_at': datetime(2026, 10, 18, 10, 0, 50)},
+            {'device_id': _id, 'key': "data", 'value': 7.0, 'created_at': datetime(2026, 10, 18, 10, 1, 0)}
+        ]
+
+        # When
+        rollups = rollup_numeric_data(numeric_datas)
+
+        # Then
+        self.assertEqual(len(rollups), 2)
+        self.assertEqual(rollups[0], {'device_id': _id, 'key': "data", 'bucket': datetime(2026, 10, 18, 10, 0), 'count': 2, 'sum': 4.0, 'min': 1.0, 'max': 3.0})
+        self.assertEqual(rollups[1]['bucket'], datetime(2026, 10, 18, 10, 1))
+
+    def test_parse_percentiles(self):
+        # Given
+        percentiles = "99,50,99.9"
+
+        # When
+        values = parse_percentiles(percentiles)
+
+        # Then
+        self.assertEqual(values, [50.0, 99.0, 99.9])
+        self.assertEqual([format_percentile(value) for value in values], ["p50", "p99", "p99.9"])
+
+    def test_parse_invalid_percentiles(self):
+        # Given
+        percentiles = "50,100"
+
+        # When / Then
+        with self.assertRaises(ValueError):
+            parse_percentiles(percentiles)
+
+    def test_count_buckets(self):
+        # Given
+        start, end = datetime(2026, 9, 18), datetime(2026, 10, 18)
+
+        # When
+        count = count_buckets(start, end, 3600)
+
+        # Then
+        self.assertEqual(count, 721)
+
+    def test_count_buckets_unaligned(self):
+        # Given
+        start, end = datetime(2026, 10, 18, 10, 59), datetime(2026, 10, 18, 11, 1)
+
+        # When
+        count = count_buckets(start, end, 3600)
+
+        # Then
+        self.assertEqual(count, 2)
+
+    @patch('utils.iot.timeseries.IOT_DATA_MAX_AGE_MONTHS', 3)
+    @patch('utils.iot.timeseries.IOT_DATA_MAX_FUTURE_SKEW', 300)
+    def test_is_accepted_time(self):
+        # Given
+        now = datetime(2026, 10, 18, 10, 0, 0)
+
+        # When
+        results = [is_accepted_time(created_at, now) for created_at in [datetime(2026, 7, 1), datetime(2026, 6, 30), datetime(2026, 10, 18, 10, 5), datetime(2026, 10, 18, 10, 6), datetime(9999, 12, 31), datetime(5, 1, 1)]]
+
+        # Then
+        self.assertEqual(results, [True, False, True, False, False, False])
+
+    @patch('entities.iot.Data.StringData')
+    @patch('entities.iot.Data.NumericData')
+    @patch.object(timeseries, '_partitions', set())
+    def test_ensure_data_partitions_accepted_range(self, NumericData, StringData):
+        # Given
+        now = datetime.now()
+        times = [now, now.replace(year = now.year - 5), datetime(9999, 12, 31)]
+
+        # When
+        ensure_data_partitions(times, Mock())
+
+        # Then
+        NumericData.createMonthlyPartition.assert_called_once()
+        StringData.createMonthlyPartition.assert_called_once()
+
+    @patch('entities.iot.Data.StringData')
+    @patch('entities.iot.Data.NumericData')
+    @patch.object(timeseries, '_partitions', set())
+    @patch.object(timeseries, '_failed_partitions', {})
+    @patch('utils.iot.timeseries.time')
+    def test_ensure_data_partitions_retry_failure(self, time, NumericData, StringData):
+        # Given
+        db = Mock()
+        time.monotonic.return_value = 0
+        NumericData.createMonthlyPartition.side_effect = [Exception("default partition contains rows"), None, None]
+
+        # When
+        ensure_data_partitions([datetime.now()], db)
+        ensure_data_partitions([datetime.now()], db)
+        time.monotonic.return_value = timeseries.IOT_DATA_PARTITION_RETRY_INTERVAL + 1
+        ensure_data_partitions([datetime.now()], db)
+        ensure_data_partitions([datetime.now()], db)
+
+        # Then
+        db.rollback.assert_called_once()
+        self.assertEqual(NumericData.createMonthlyPartition.call_count, 2)
+        self.assertEqual(timeseries._failed_partitions, {})
+
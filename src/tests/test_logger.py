@@ -0,0 +1,49 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from utils.logger import log_msg, quiet_log_msg
+
+class TestLogger(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestLogger, self).__init__(*args, **kwargs)
+
+    @patch('utils.logger._log_level_value', 1)
+    @patch('utils.logger.get_current_cid')
+    def test_quiet_log_msg_suppressed_level(self, get_current_cid):
+        # Given
+        message = Mock(return_value = "message")
+
+        # When
+        result = quiet_log_msg("DEBUG", message)
+
+        # Then
+        self.assertIsNone(result)
+        message.assert_not_called()
+        get_current_cid.assert_not_called()
+
+    @patch('utils.logger._log_level_value', 0)
+    @patch('utils.logger.get_current_cid', return_value = "cid")
+    def test_quiet_log_msg_lazy_message(self, get_current_cid):
+        # Given
+        message = Mock(return_value = "message")
+
+        # When
+        result = quiet_log_msg("DEBUG", message)
+
+        # Then
+        message.assert_called_once()
+        self.assertTrue(result.startswith("[DEBUG]["))
+        self.assertTrue(result.endswith("[cid] message"))
+
+    @patch('utils.logger._log_level_value', 2)
+    @patch('utils.logger._notif_enabled', True)
+    @patch('utils.logger.slack_message')
+    def test_log_msg_suppressed_notification(self, slack_message):
+        # Given
+        level = "INFO"
+
+        # When
+        log_msg(level, "message")
+
+        # Then
+        slack_message.assert_not_called()
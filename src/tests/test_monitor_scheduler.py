@@ -0,0 +1,130 @@
+import asyncio
+
+from unittest import TestCase
+from unittest.mock import AsyncMock, Mock, patch
+
+from utils.observability.monitor import check_tcp_monitor
+from utils.observability.monitor_callbacks import CallbacksQueue
+from utils.observability.monitor_scheduler import MonitorScheduler, rendezvous_owner
+
+def mock_membership(member_id):
+    membership = Mock()
+    membership.member_id = member_id
+    return membership
+
+def new_monitors(count):
+    return [{'id': "monitor-{}".format(i), 'name': "monitor{}".format(i), 'check_interval': None} for i in range(0, count)]
+
+class TestMonitorScheduler(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestMonitorScheduler, self).__init__(*args, **kwargs)
+
+    def test_assign_without_duplicates(self):
+        # Given
+        members = ["pod1:1", "pod1:2", "pod2:1"]
+        monitors = new_monitors(300)
+        schedulers = [MonitorScheduler(mock_membership(member)) for member in members]
+
+        # When
+        for scheduler in schedulers:
+            scheduler.assign(monitors, members, 0)
+
+        # Then
+        owned = [monitor_id for scheduler in schedulers for monitor_id in scheduler._monitors.keys()]
+        self.assertEqual(len(owned), len(monitors))
+        self.assertEqual(set(owned), {monitor['id'] for monitor in monitors})
+        self.assertTrue(all(len(scheduler._monitors) > 0 for scheduler in schedulers))
+
+    def test_rendezvous_owner_stable_on_leave(self):
+        # Given
+        members = ["pod1:1", "pod1:2", "pod2:1"]
+        monitors = new_monitors(100)
+        before = {monitor['id']: rendezvous_owner(monitor['id'], members) for monitor in monitors}
+
+        # When
+        after = {monitor['id']: rendezvous_owner(monitor['id'], members[1:]) for monitor in monitors}
+
+        # Then
+        moved = [monitor_id for monitor_id in before.keys() if before[monitor_id] != after[monitor_id]]
+        self.assertTrue(all(before[monitor_id] == members[0] for monitor_id in moved))
+
+    def test_due_with_interval_and_jitter(self):
+        # Given
+        scheduler = MonitorScheduler(mock_membership("pod1:1"), wait_time = 300, jitter_ratio = 0.1)
+        monitors = [{'id': "1", 'name': "monitor1", 'check_interval': None}, {'id': "2", 'name': "monitor2", 'check_interval': 60}]
+        scheduler.assign(monitors, ["pod1:1"], 0)
+
+        # When
+        first_due = scheduler.due(300)
+        scheduler.schedule("1", 300)
+        scheduler.schedule("2", 300)
+
+        # Then
+        self.assertEqual(sorted(first_due), ["1", "2"])
+        self.assertEqual(scheduler.due(300), [])
+        self.assertTrue(570 <= scheduler._next_runs["1"] <= 630)
+        self.assertTrue(354 <= scheduler._next_runs["2"] <= 366)
+
+    @patch('utils.observability.monitor.set_gauge')
+    def test_check_tcp_monitor_refused(self, set_gauge):
+        # Given
+        monitor = {'name': "tcp", 'type': "tcp", 'url': "127.0.0.1:1", 'timeout': 1, 'user_id': 1}
+
+        # When
+        _, callback_payload = asyncio.run(check_tcp_monitor(monitor, {'result': Mock(), 'duration': Mock()}))
+
+        # Then
+        self.assertEqual(callback_payload['status'], "ko")
+
+    @patch('utils.observability.monitor_scheduler.save_monitors_status')
+    def test_flush_statuses_once(self, save_monitors_status):
+        # Given
+        scheduler = MonitorScheduler(mock_membership("pod1:1"))
+        scheduler.record_status({'id': "1"}, 10, {'status': "ko"})
+        scheduler.record_status({'id': "1"}, 12, {'status': "ok"})
+        scheduler.record_status({'id': "2"}, 0, {'status': "ko"})
+
+        # When
+        asyncio.run(scheduler.flush_statuses())
+
+        # Then
+        save_monitors_status.assert_called_once_with([
+            {'id': "1", 'status': "success", 'response_time': "12 ms"},
+            {'id': "2", 'status': "failure", 'response_time': "0 ms"}
+        ])
+        self.assertEqual(scheduler._statuses, {})
+
+    def test_callbacks_queue_retry(self):
+        # Given
+        http_clients = Mock()
+        http_clients.get.return_value.post = AsyncMock(side_effect = [Exception("timeout"), Mock(status_code = 503), Mock(status_code = 200)])
+        callback = {'type': "http", 'endpoint': "https://callback"}
+
+        async def run():
+            queue = CallbacksQueue(http_clients, size = 10, workers = 1, retries = 3, retry_delay = 0)
+            queue.start()
+            queue.submit(callback, {'status': "ko"})
+            await queue.join()
+            await queue.aclose()
+
+        # When
+        asyncio.run(run())
+
+        # Then
+        self.assertEqual(http_clients.get.return_value.post.call_count, 3)
+
+    def test_callbacks_queue_bounded(self):
+        # Given
+        callback = {'type': "http", 'endpoint': "https://callback"}
+
+        async def run():
+            queue = CallbacksQueue(Mock(), size = 1, workers = 1)
+            queue._queue = asyncio.Queue(maxsize = 1)
+            return queue.submit(callback, {}), queue.submit(callback, {})
+
+        # When
+        first, second = asyncio.run(run())
+
+        # Then
+        self.assertTrue(first)
+        self.assertFalse(second)
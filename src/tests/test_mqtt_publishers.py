@@ -0,0 +1,106 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from utils.faas.iot import MqttPublishersPool, get_publisher_settings, send_payload_in_realtime
+
+def mock_paho_client(published = True):
+    client = Mock()
+    client.loop_start.side_effect = lambda: client.on_connect(client, None, {}, 0)
+    client.publish.return_value.is_published.return_value = published
+    return client
+
+def new_callback(endpoint, username = "user"):
+    return {'type': "mqtt", 'endpoint': endpoint, 'username': username, 'password': "secret", 'topic': "faas/result"}
+
+class TestMqttPublishers(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestMqttPublishers, self).__init__(*args, **kwargs)
+
+    @patch('utils.faas.iot.new_ssl_context')
+    @patch('utils.faas.iot.paho')
+    def test_get_reuse_publisher(self, paho, new_ssl_context):
+        # Given
+        paho.Client.side_effect = lambda *args, **kwargs: mock_paho_client()
+        pool = MqttPublishersPool(size = 10, idle_timeout = 300)
+
+        # When
+        key1, publisher1 = pool.get(get_publisher_settings(new_callback("broker1")))
+        key2, publisher2 = pool.get(get_publisher_settings(new_callback("broker1")))
+        key3, publisher3 = pool.get(get_publisher_settings(new_callback("broker1", "other")))
+
+        # Then
+        self.assertEqual(key1, key2)
+        self.assertIs(publisher1, publisher2)
+        self.assertNotEqual(key1, key3)
+        self.assertIsNot(publisher1, publisher3)
+        self.assertEqual(paho.Client.call_count, 2)
+        publisher1._client.subscribe.assert_called_once_with("faas/#", qos = 1)
+
+    @patch('utils.faas.iot.new_ssl_context')
+    @patch('utils.faas.iot.paho')
+    def test_get_bounded_size(self, paho, new_ssl_context):
+        # Given
+        paho.Client.side_effect = lambda *args, **kwargs: mock_paho_client()
+        pool = MqttPublishersPool(size = 2, idle_timeout = 300)
+
+        # When
+        publishers = [pool.get(get_publisher_settings(new_callback("broker{}".format(i))))[1] for i in range(0, 3)]
+
+        # Then
+        self.assertEqual(len(pool), 2)
+        publishers[0]._client.disconnect.assert_called_once()
+        publishers[2]._client.disconnect.assert_not_called()
+
+    @patch('utils.faas.iot.new_ssl_context')
+    @patch('utils.faas.iot.paho')
+    @patch('utils.faas.iot.time')
+    def test_get_evict_idle_on_hit(self, time, paho, new_ssl_context):
+        # Given
+        time.monotonic.return_value = 0
+        paho.Client.side_effect = lambda *args, **kwargs: mock_paho_client()
+        pool = MqttPublishersPool(size = 10, idle_timeout = 300)
+        _, idle = pool.get(get_publisher_settings(new_callback("broker1")))
+        time.monotonic.return_value = 200
+        _, active = pool.get(get_publisher_settings(new_callback("broker2")))
+
+        # When
+        time.monotonic.return_value = 400
+        _, publisher = pool.get(get_publisher_settings(new_callback("broker2")))
+
+        # Then
+        self.assertIs(publisher, active)
+        self.assertEqual(len(pool), 1)
+        idle._client.disconnect.assert_called_once()
+        active._client.disconnect.assert_not_called()
+
+    @patch('utils.faas.iot.new_ssl_context')
+    @patch('utils.faas.iot.paho')
+    def test_send_payload_waits_for_ack(self, paho, new_ssl_context):
+        # Given
+        client = mock_paho_client()
+        paho.Client.return_value = client
+
+        # When
+        with patch('utils.faas.iot.mqtt_publishers', MqttPublishersPool()):
+            send_payload_in_realtime(new_callback("broker1"), {'status': "ok"})
+
+        # Then
+        client.publish.assert_called_once_with("faas/result", payload = '{"status": "ok"}', qos = 1)
+        client.publish.return_value.wait_for_publish.assert_called_once()
+
+    @patch('utils.faas.iot.new_ssl_context')
+    @patch('utils.faas.iot.paho')
+    def test_send_payload_invalidate_on_failure(self, paho, new_ssl_context):
+        # Given
+        client = mock_paho_client(published = False)
+        paho.Client.return_value = client
+        pool = MqttPublishersPool()
+
+        # When
+        with patch('utils.faas.iot.mqtt_publishers', pool):
+            with self.assertRaises(TimeoutError):
+                send_payload_in_realtime(new_callback("broker1"), {'status': "ok"})
+
+        # Then
+        self.assertEqual(len(pool), 0)
+        client.disconnect.assert_called_once()
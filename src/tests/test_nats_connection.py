@@ -0,0 +1,64 @@
+from unittest import TestCase
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from database.nats_connection import NatsConnection
+
+def mock_nats_client():
+    nc = MagicMock()
+    nc.is_closed = False
+    nc.publish = AsyncMock()
+    js = MagicMock()
+    js.add_stream = AsyncMock()
+    js.publish = AsyncMock()
+    nc.jetstream.return_value = js
+    return nc, js
+
+class TestNatsConnection(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestNatsConnection, self).__init__(*args, **kwargs)
+
+    @patch('database.nats_connection.nats.connect', new_callable = AsyncMock)
+    def test_publish_reuse_connection(self, connect):
+        # Given
+        nc, _ = mock_nats_client()
+        connect.return_value = nc
+        connection = NatsConnection()
+
+        # When
+        for i in range(0, 5):
+            connection.publish("faas", {"id": i}).result(timeout = 5)
+
+        # Then
+        self.assertEqual(connect.await_count, 1)
+        self.assertEqual(nc.publish.await_count, 5)
+
+    @patch('database.nats_connection.nats.connect', new_callable = AsyncMock)
+    def test_jspublish_declare_stream_once(self, connect):
+        # Given
+        nc, js = mock_nats_client()
+        connect.return_value = nc
+        connection = NatsConnection()
+
+        # When
+        for i in range(0, 3):
+            connection.jspublish("faas", "faas_channel", {"id": i}).result(timeout = 5)
+
+        # Then
+        self.assertEqual(connect.await_count, 1)
+        self.assertEqual(js.add_stream.await_count, 1)
+        self.assertEqual(js.publish.await_count, 3)
+
+    @patch('database.nats_connection.nats.connect', new_callable = AsyncMock)
+    def test_publish_reconnect_when_closed(self, connect):
+        # Given
+        nc, _ = mock_nats_client()
+        connect.return_value = nc
+        connection = NatsConnection()
+        connection.publish("faas", {"id": 1}).result(timeout = 5)
+
+        # When
+        nc.is_closed = True
+        connection.publish("faas", {"id": 2}).result(timeout = 5)
+
+        # Then
+        self.assertEqual(connect.await_count, 2)
@@ -0,0 +1,76 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from utils.notifier import NotificationsQueue
+
+def new_queue(size = 10):
+    notifications = NotificationsQueue(size = size, interval = 1, batch_size = 10, rate_limits = {'slack': 1})
+    notifications.start = Mock()
+    return notifications
+
+class TestNotifier(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestNotifier, self).__init__(*args, **kwargs)
+
+    @patch('utils.notifier.requests')
+    def test_flush_coalesce_messages(self, requests):
+        # Given
+        notifications = new_queue()
+        requests.post.return_value.status_code = 200
+        notifications.submit('slack', "https://slack/1", {'username': "cwcloud"}, {'text': "first"})
+        notifications.submit('slack', "https://slack/1", {'username': "cwcloud"}, {'text': "second"})
+
+        # When
+        notifications.flush(10)
+
+        # Then
+        requests.post.assert_called_once()
+        self.assertEqual(requests.post.call_args.kwargs['json'], {'username': "cwcloud", 'attachments': [{'text': "first"}, {'text': "second"}]})
+
+    @patch('utils.notifier.requests')
+    def test_flush_rate_limited(self, requests):
+        # Given
+        notifications = new_queue()
+        requests.post.return_value.status_code = 200
+        notifications.submit('slack', "https://slack/1", {}, {'text': "first"})
+        notifications.flush(10)
+
+        # When
+        notifications.submit('slack', "https://slack/1", {}, {'text': "second"})
+        notifications.flush(10.5)
+        calls_before_interval = requests.post.call_count
+        notifications.flush(11)
+
+        # Then
+        self.assertEqual(calls_before_interval, 1)
+        self.assertEqual(requests.post.call_count, 2)
+
+    @patch('utils.notifier.requests')
+    def test_flush_retry_after_throttling(self, requests):
+        # Given
+        notifications = new_queue()
+        requests.post.side_effect = [Mock(status_code = 429, headers = {'Retry-After': "5"}), Mock(status_code = 200)]
+        notifications.submit('slack', "https://slack/1", {}, {'text': "first"})
+
+        # When
+        notifications.flush(10)
+        notifications.flush(12)
+        notifications.flush(15)
+
+        # Then
+        self.assertEqual(requests.post.call_count, 2)
+        self.assertEqual(requests.post.call_args.kwargs['json'], {'attachments': [{'text': "first"}]})
+
+    @patch('utils.notifier.notifications_dropped')
+    def test_submit_drop_when_full(self, notifications_dropped):
+        # Given
+        notifications = new_queue(size = 1)
+
+        # When
+        first = notifications.submit('slack', "https://slack/1", {}, {'text': "first"})
+        second = notifications.submit('slack', "https://slack/1", {}, {'text': "second"})
+
+        # Then
+        self.assertTrue(first)
+        self.assertFalse(second)
+        notifications_dropped.labels.assert_called_once_with('slack')
@@ -0,0 +1,77 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+from urllib.error import HTTPError
+
+from utils.cloud_environments import CloudEnvironments
+from utils.fastapi import cached_json_response
+from utils.provider import get_provider_catalog
+
+_config = CloudEnvironments({
+    'providers': [{
+        'name': 'scaleway',
+        'driver': 'ScalewayDriver',
+        'instance_types': ['DEV1-S'],
+        'instance_configs': [{
+            'region': 'fr-par',
+            'zones': [{
+                'name': 1,
+                'instance_types': [{'type': 'DEV1-S', 'price_variable': 'PRICE_DEV1_S'}]
+            }]
+        }]
+    }]
+})
+
+class TestProviderCatalog(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestProviderCatalog, self).__init__(*args, **kwargs)
+
+    @patch('utils.provider.get_cloud_environments', return_value = _config)
+    def test_get_provider_catalog_built_once(self, get_cloud_environments):
+        # Given
+        pricing = get_provider_catalog("scaleway", 'pricing')
+
+        # When
+        with patch('utils.provider.build_provider_catalog') as build_provider_catalog:
+            cached_pricing = get_provider_catalog("scaleway", 'pricing')
+
+        # Then
+        build_provider_catalog.assert_not_called()
+        self.assertIs(pricing, cached_pricing)
+        self.assertEqual(pricing['content']['prices'][0]['region'], "fr-par")
+        self.assertEqual(get_provider_catalog("scaleway", 'instance_types')['content']['types'], ['DEV1-S'])
+
+    @patch('utils.provider.get_cloud_environments', return_value = _config)
+    def test_get_provider_catalog_unknown_provider(self, get_cloud_environments):
+        # Given
+        provider = "unknown"
+
+        # When / Then
+        with self.assertRaises(HTTPError):
+            get_provider_catalog(provider, 'pricing')
+
+    def test_cached_json_response_not_modified(self):
+        # Given
+        entry = {'content': {'status': 'ok'}, 'etag': '"abc"'}
+        request = Mock()
+        request.headers = {'if-none-match': 'W/"abc", "def"'}
+
+        # When
+        response = cached_json_response(request, entry, 60)
+
+        # Then
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.headers['etag'], '"abc"')
+        self.assertEqual(response.headers['cache-control'], "public, max-age=60")
+
+    def test_cached_json_response_modified(self):
+        # Given
+        entry = {'content': {'status': 'ok'}, 'etag': '"abc"'}
+        request = Mock()
+        request.headers = {'if-none-match': '"def"'}
+
+        # When
+        response = cached_json_response(request, entry, 60)
+
+        # Then
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.body, b'{"status":"ok"}')
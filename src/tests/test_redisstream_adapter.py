@@ -0,0 +1,83 @@
+from unittest import TestCase
+from unittest.mock import patch
+
+from adapters.pubsub.RedisstreamAdapter import RedisstreamAdapter, get_dead_letter_stream, reclaim, trim
+
+class TestRedisstreamAdapter(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestRedisstreamAdapter, self).__init__(*args, **kwargs)
+
+    @patch('adapters.pubsub.RedisstreamAdapter.redis')
+    def test_reclaim_dead_letter_poison_message(self, redis):
+        # Given
+        redis.xpending_range.return_value = [
+            {'message_id': '1-0', 'consumer': 'consumer_1', 'time_since_delivered': 600000, 'times_delivered': 5},
+            {'message_id': '2-0', 'consumer': 'consumer_1', 'time_since_delivered': 600000, 'times_delivered': 1}
+        ]
+        redis.xrange.return_value = [('1-0', {'data': '{"id": "poison"}'})]
+        redis.xautoclaim.return_value = ['0-0', [('2-0', {'data': '{"id": "retry"}'})], []]
+        redis.xinfo_groups.return_value = []
+
+        # When
+        messages = reclaim("faas", "faas_channel", 10)
+
+        # Then
+        self.assertEqual(messages, [('2-0', {'data': '{"id": "retry"}'})])
+        redis.xadd.assert_called_once()
+        self.assertEqual(redis.xadd.call_args[0][0], get_dead_letter_stream("faas_channel"))
+        self.assertEqual(redis.xadd.call_args[0][1]['id'], '1-0')
+        redis.xack.assert_called_once_with("faas_channel", "faas", '1-0')
+
+    @patch('adapters.pubsub.RedisstreamAdapter.redis')
+    def test_reclaim_skip_deleted_entries(self, redis):
+        # Given
+        redis.xpending_range.return_value = []
+        redis.xautoclaim.return_value = ['0-0', [(None, None), ('3-0', {'data': '{}'})], []]
+        redis.xinfo_groups.return_value = []
+
+        # When
+        messages = reclaim("faas", "faas_channel", 10)
+
+        # Then
+        self.assertEqual(messages, [('3-0', {'data': '{}'})])
+
+    @patch('adapters.pubsub.RedisstreamAdapter.redis')
+    def test_trim_keep_pending_entries(self, redis):
+        # Given
+        redis.xinfo_groups.return_value = [
+            {'name': 'faas', 'last-delivered-id': '20-0'},
+            {'name': 'other', 'last-delivered-id': '15-0'}
+        ]
+        redis.xpending.side_effect = lambda channel, group: {'pending': 2, 'min': '9-0'} if group == 'faas' else {'pending': 0, 'min': None}
+
+        # When
+        trim("faas_channel")
+
+        # Then
+        redis.xtrim.assert_called_once_with("faas_channel", minid='9-0', approximate=True)
+
+    @patch('adapters.pubsub.RedisstreamAdapter.redis')
+    def test_trim_without_group(self, redis):
+        # Given
+        redis.xinfo_groups.return_value = []
+
+        # When
+        result = trim("faas_channel")
+
+        # Then
+        self.assertEqual(result, 0)
+        redis.xtrim.assert_not_called()
+
+    @patch('adapters.pubsub.RedisstreamAdapter.redis')
+    def test_publish_batch_single_pipeline(self, redis):
+        # Given
+        payloads = [{'id': 1}, {'id': 2}, {'id': 3}]
+
+        # When
+        RedisstreamAdapter().publish_batch("faas", "faas_channel", payloads)
+
+        # Then
+        redis.pipeline.assert_called_once_with(transaction = False)
+        self.assertEqual(redis.pipeline.return_value.xadd.call_count, 3)
+        redis.pipeline.return_value.execute.assert_called_once()
+        redis.xadd.assert_not_called()
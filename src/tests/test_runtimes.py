@@ -0,0 +1,70 @@
+import os
+import tempfile
+
+from unittest import TestCase
+from unittest.mock import MagicMock, patch
+
+from consume.runtimes import GoBinaries, RuntimePool
+
+_py_worker = ["python", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "consume", "py_worker.py")]
+
+class TestRuntimes(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestRuntimes, self).__init__(*args, **kwargs)
+
+    def test_python_pool_reuse_worker(self):
+        # Given
+        pool = RuntimePool(_py_worker, 1)
+
+        # When
+        first = pool.execute("print('hello')", 30)
+        second = pool.execute("import os\nprint(os.getppid())", 30)
+        third = pool.execute("import os\nprint(os.getppid())", 30)
+
+        # Then
+        self.assertEqual(first, (True, "hello\n"))
+        self.assertTrue(second[0])
+        self.assertEqual(second, third)
+
+    def test_python_pool_isolate_failure(self):
+        # Given
+        pool = RuntimePool(_py_worker, 1)
+
+        # When
+        failure = pool.execute("raise ValueError('boom')", 30)
+        success = pool.execute("print('ok')", 30)
+
+        # Then
+        self.assertFalse(failure[0])
+        self.assertIn("ValueError: boom", failure[1])
+        self.assertEqual(success, (True, "ok\n"))
+
+    def test_python_pool_replace_worker_on_timeout(self):
+        # Given
+        pool = RuntimePool(_py_worker, 1)
+
+        # When
+        timeout = pool.execute("import time\ntime.sleep(10)", 1)
+        success = pool.execute("print('ok')", 30)
+
+        # Then
+        self.assertFalse(timeout[0])
+        self.assertEqual(success, (True, "ok\n"))
+
+    @patch('consume.runtimes.subprocess.run')
+    def test_go_binaries_compile_once(self, run):
+        # Given
+        def fake_run(cmd, **kwargs):
+            if cmd[0] == "go":
+                open(cmd[3], 'w').close()
+            return MagicMock(returncode = 0, stdout = "{}\n".format(cmd[1:]))
+        run.side_effect = fake_run
+        binaries = GoBinaries(tempfile.mkdtemp(), 10)
+
+        # When
+        binaries.execute("package main", ["a"], 30)
+        result = binaries.execute("package main", ["b"], 30)
+
+        # Then
+        self.assertEqual(result, (True, "['b']\n"))
+        self.assertEqual(len([call for call in run.call_args_list if call[0][0][0] == "go"]), 1)
@@ -1,5 +1,18 @@
 from unittest import TestCase
-from utils.observability.tracker import parse_user_agent
+from unittest.mock import patch
+
+from utils.observability.tracker import UserAgentsCache, parse_user_agent, parse_user_agent_uncached
+
+_user_agents_corpus = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:127.0) Gecko/20100101 Firefox/127.0",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.5 Safari/605.1.15",
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/126.0.0.0 Safari/537.36",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_5 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.5 Mobile/15E148 Safari/604.1",
+    "Mozilla/5.0 (Linux; Android 13; SAMSUNG SM-A536B) AppleWebKit/537.36 (KHTML, like Gecko) SamsungBrowser/25.0 Chrome/121.0.0.0 Mobile Safari/537.36",
+    "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)",
+    "Mozilla/5.0 (SMART-TV; Linux; Tizen 6.0) AppleWebKit/537.36 (KHTML, like Gecko) SamsungBrowser/4.0 Chrome/76.0.3809.146 TV Safari/537.36"
+]
 
 class TestTracker(TestCase):
     def init(self, *args, **kwargs):
@@ -82,3 +95,19 @@ class TestTracker(TestCase):
         self.assertEqual(result['os'], "unknown")
         self.assertEqual(result['device'], "unknown")
         self.assertEqual(result['browser'], "unknown")
+
+    @patch('utils.observability.tracker.user_agents_cache', UserAgentsCache(size = 100))
+    @patch('utils.observability.tracker._user_agents_cache_hits')
+    @patch('utils.observability.tracker.parse_user_agent_uncached', side_effect = parse_user_agent_uncached)
+    def test_parse_user_agent_cached(self, parse_user_agent_uncached, user_agents_cache_hits):
+        ## Given
+        traffic = _user_agents_corpus * 10
+
+        #When
+        results = [parse_user_agent(user_agent) for user_agent in traffic]
+
+        ## Then
+        self.assertEqual(parse_user_agent_uncached.call_count, len(_user_agents_corpus))
+        self.assertEqual(user_agents_cache_hits.inc.call_count, len(traffic) - len(_user_agents_corpus))
+        self.assertEqual(results[-1], parse_user_agent_uncached(_user_agents_corpus[-1]))
+        self.assertIsNot(results[0]['details'], results[len(_user_agents_corpus)]['details'])
@@ -0,0 +1,78 @@
+import asyncio
+
+from datetime import datetime
+from unittest import TestCase
+from unittest.mock import Mock
+
+from utils.observability.tracker_events import TrackerEventsBatcher, rollup_tracker_events, to_tracker_event, to_tracker_event_row
+
+def new_event(time, device = "mobile", country = "FR"):
+    return {'website': "site", 'time': time, 'device': device, 'browser': "chrome", 'os': "linux", 'country': country}
+
+class TestTrackerEvents(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestTrackerEvents, self).__init__(*args, **kwargs)
+
+    def test_to_tracker_event(self):
+        # Given
+        payload = {'website': "site", 'time': "2026-10-18T10:00:01", 'host': "1.1.1.1", 'device': "mobile", 'browser': "chrome", 'os': "ios", 'infos': {'country_iso': "FR", 'city': "Paris"}}
+
+        # When
+        event = to_tracker_event(payload)
+
+        # Then
+        self.assertEqual(event['country'], "FR")
+        self.assertEqual(event['city'], "Paris")
+        self.assertEqual(event['device'], "mobile")
+
+    def test_rollup_tracker_events(self):
+        # Given
+        rows = [to_tracker_event_row(event) for event in [
+            new_event("2026-10-18T10:00:01"),
+            new_event("2026-10-18T10:00:59", "computer"),
+            new_event("2026-10-18T10:01:00", country = "DE")
+        ]]
+
+        # When
+        rollups = rollup_tracker_events(rows)
+
+        # Then
+        hits = {(rollup['bucket'].minute, rollup['dimension'], rollup['value']): rollup['hits'] for rollup in rollups}
+        self.assertEqual(hits[(0, 'all', 'all')], 2)
+        self.assertEqual(hits[(0, 'device', 'mobile')], 1)
+        self.assertEqual(hits[(0, 'country', 'FR')], 2)
+        self.assertEqual(hits[(1, 'country', 'DE')], 1)
+        self.assertTrue(all(rollup['bucket'].second == 0 for rollup in rollups))
+        self.assertIsInstance(rows[0]['time'], datetime)
+
+    def test_batcher_flush_on_size(self):
+        # Given
+        save = Mock()
+        events = [new_event("2026-10-18T10:00:0{}".format(i)) for i in range(0, 4)]
+
+        async def run():
+            batcher = TrackerEventsBatcher(save, batch_size = 2, interval = 60)
+            return await asyncio.gather(*[batcher.add(event) for event in events])
+
+        # When
+        results = asyncio.run(run())
+
+        # Then
+        self.assertEqual(results, [True, True, True, True])
+        self.assertEqual(save.call_count, 2)
+        save.assert_called_with(events[2:])
+
+    def test_batcher_flush_on_interval_failure(self):
+        # Given
+        save = Mock(side_effect = Exception("db down"))
+
+        async def run():
+            batcher = TrackerEventsBatcher(save, batch_size = 10, interval = 0.01)
+            return await batcher.add(new_event("2026-10-18T10:00:00"))
+
+        # When
+        result = asyncio.run(run())
+
+        # Then
+        self.assertFalse(result)
+        save.assert_called_once()
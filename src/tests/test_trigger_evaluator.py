@@ -0,0 +1,76 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from schedule.crontabs import handle_trigger
+from schedule.evaluator import dedupe_triggers, evaluate_trigger_events
+
+_id = "5a4b3c2d-1e0f-4a9b-8c7d-6e5f4a3b2c1d"
+
+def new_trigger(id = _id, updated_at = "2026-10-18 10:00:00"):
+    return {
+        'id': id,
+        'kind': "cron",
+        'content': {'name': "trigger", 'function_id': "f1", 'args': [], 'cron_expr': "*/5 * * * *"},
+        'created_at': "2026-10-18 09:00:00",
+        'updated_at': updated_at,
+        'owner': {'id': 1}
+    }
+
+class TestTriggerEvaluator(TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestTriggerEvaluator, self).__init__(*args, **kwargs)
+
+    def test_dedupe_triggers(self):
+        # Given
+        other_id = "0e1d2c3b-4a59-4687-a5b4-c3d2e1f0a9b8"
+        events = [
+            {'action': "evaluate", 'triggers': [new_trigger(), new_trigger(other_id)]},
+            {'action': "evaluate", 'triggers': [new_trigger(updated_at = "2026-10-18 11:00:00")]},
+            {'action': "evaluate", 'triggers': [new_trigger()]}
+        ]
+
+        # When
+        triggers = dedupe_triggers(events)
+
+        # Then
+        self.assertEqual(len(triggers), 2)
+        self.assertEqual(triggers[0]['updated_at'], "2026-10-18 11:00:00")
+
+    @patch('schedule.evaluator.handle_trigger')
+    def test_evaluate_trigger_events(self, handle_trigger):
+        # Given
+        events = [{'action': "evaluate", 'triggers': [new_trigger()]} for _ in range(0, 50)]
+
+        # When
+        result = evaluate_trigger_events(events)
+
+        # Then
+        self.assertTrue(result)
+        handle_trigger.assert_called_once_with(new_trigger())
+
+    @patch('schedule.crontabs._scheduler')
+    def test_handle_trigger_already_scheduled(self, scheduler):
+        # Given
+        scheduler.get_job.return_value = Mock(args = [new_trigger()])
+
+        # When
+        handle_trigger(new_trigger())
+
+        # Then
+        scheduler.get_job.assert_called_once_with(_id)
+        scheduler.add_job.assert_not_called()
+
+    @patch('schedule.crontabs._scheduler')
+    def test_handle_trigger_updated(self, scheduler):
+        # Given
+        scheduler.get_job.return_value = Mock(args = [new_trigger()])
+        trigger = new_trigger(updated_at = "2026-10-18 11:00:00")
+
+        # When
+        handle_trigger(trigger)
+
+        # Then
+        scheduler.add_job.assert_called_once()
+        self.assertEqual(scheduler.add_job.call_args.kwargs['id'], _id)
+        self.assertEqual(scheduler.add_job.call_args.kwargs['args'], [trigger])
+        self.assertTrue(scheduler.add_job.call_args.kwargs['replace_existing'])
@@ -0,0 +1,117 @@
+import os
+import time
+import hashlib
+import threading
+
+from collections import OrderedDict
+
+from adapters.AdapterConfig import get_adapter
+from utils.common import get_env_int
+from utils.logger import log_msg
+
+AUTH_CHANNEL = os.getenv('AUTH_CHANNEL', 'authprincipals')
+AUTH_CACHE_TTL = get_env_int('AUTH_CACHE_TTL', 30)
+AUTH_CACHE_SIZE = get_env_int('AUTH_CACHE_SIZE', 10000)
+
+_pubsub_adapter = get_adapter("pubsub")
+
+def hash_token(token):
+    return hashlib.sha256(token.encode('UTF-8')).hexdigest()
+
+class PrincipalsCache():
+    def __init__(self, size = AUTH_CACHE_SIZE, ttl = AUTH_CACHE_TTL):
+        self._size = size
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._subscribed = False
+
+    def is_enabled(self):
+        return self._ttl > 0 and self._size > 0
+
+    def subscribe(self):
+        with self._lock:
+            if self._subscribed:
+                return
+            self._subscribed = True
+
+        _pubsub_adapter().subscribe(AUTH_CHANNEL, self.on_auth_event)
+
+    def on_auth_event(self, payload):
+        if payload is None or payload.get('action') != 'invalidate':
+            return
+
+        log_msg("DEBUG", "[PrincipalsCache][on_auth_event] invalidate user_id = {}".format(payload.get('user_id')))
+        self.invalidate(payload.get('user_id'))
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            keys = self._keys_by_user.get(entry['user_id'])
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_user[entry['user_id']]
+
+    def get(self, token):
+        if not self.is_enabled():
+            return None
+
+        self.subscribe()
+        key = hash_token(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            if time.monotonic() > entry['expires_at']:
+                self._remove(key)
+                return None
+
+            self._entries.move_to_end(key)
+            return entry['user']
+
+    def put(self, token, user, exp = None):
+        if not self.is_enabled():
+            return
+
+        #? the entry mustn't outlive the token's own expiration
+        ttl = self._ttl if exp is None else min(self._ttl, exp - time.time())
+        if ttl <= 0:
+            return
+
+        key = hash_token(token)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = {
+                'user': user,
+                'user_id': user.id,
+                'expires_at': time.monotonic() + ttl
+            }
+            self._keys_by_user.setdefault(user.id, set()).add(key)
+            while len(self._entries) > self._size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, user_id = None):
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+                self._keys_by_user.clear()
+                return
+
+            for key in list(self._keys_by_user.get(user_id, [])):
+                self._remove(key)
+
+    def __len__(self):
+        return len(self._entries)
+
+principals_cache = PrincipalsCache()
+
+def invalidate_principal(user_id):
+    #? every api process has its own cache, the invalidation is broadcasted to all of them
+    principals_cache.invalidate(user_id)
+    try:
+        _pubsub_adapter().broadcast(AUTH_CHANNEL, { 'action': 'invalidate', 'user_id': user_id })
+    except Exception as e:
+        log_msg("WARN", "[invalidate_principal] unable to broadcast the invalidation of user_id = {}: e.type = {}, e.msg = {}".format(user_id, type(e), e))
@@ -0,0 +1,49 @@
+import time
+import threading
+
+from collections import OrderedDict
+
+class LruCache():
+    def __init__(self, size, ttl = None):
+        self._size = size
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires_at = entry
+            if expires_at is not None and time.monotonic() > expires_at:
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value, ttl = None):
+        #? the entries are kept without expiration when there's no ttl at all
+        ttl = ttl if ttl is not None else self._ttl
+        if self._size <= 0 or (ttl is not None and ttl <= 0):
+            return
+
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, time.monotonic() + ttl if ttl is not None else None)
+            while len(self._entries) > self._size:
+                self._entries.popitem(last = False)
+
+    def pop(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            return entry[0] if entry is not None else None
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
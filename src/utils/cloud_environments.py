@@ -0,0 +1,103 @@
+import os
+import time
+import yaml
+import threading
+
+from utils.common import get_env_bool, get_env_int, is_not_empty
+
+CLOUD_ENVIRONMENTS_HOT_RELOAD = get_env_bool('CLOUD_ENVIRONMENTS_HOT_RELOAD', False)
+CLOUD_ENVIRONMENTS_RELOAD_INTERVAL = get_env_int('CLOUD_ENVIRONMENTS_RELOAD_INTERVAL', 5)
+
+CLOUD_ENVIRONMENTS_PATH = os.getenv('CLOUD_ENVIRONMENTS_PATH', os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', 'cloud_environments.yml')))
+
+def extract_provider_name(driver):
+    return driver.replace("Driver", "").lower()
+
+class CloudEnvironments():
+    def __init__(self, data):
+        self.data = data if is_not_empty(data) else {}
+        self._derived = {}
+        self.providers = self.data['providers'] if is_not_empty(self.data.get('providers')) else []
+        self.dns_zones = self.data['dns_zones'] if is_not_empty(self.data.get('dns_zones')) else []
+
+        #? the first match wins like the former linear lookups
+        self.providers_by_name = {}
+        self.instance_configs = {}
+        self.regions = {}
+        for provider in self.providers:
+            if provider['name'] in self.providers_by_name:
+                continue
+
+            self.providers_by_name[provider['name']] = provider
+            self.instance_configs[provider['name']] = instance_configs = {}
+            for instance_config in provider.get('instance_configs') or []:
+                zones = instance_configs.setdefault(instance_config['region'], {})
+                for zone in instance_config.get('zones') or []:
+                    zones.setdefault(str(zone['name']), zone)
+
+            self.regions[provider['name']] = regions = {}
+            for region in provider.get('regions') or []:
+                regions.setdefault(region['name'], region)
+
+        self.images = {}
+        for image in self.data.get('images') or []:
+            for region_zone, value in image.items():
+                self.images.setdefault(region_zone, value)
+
+        self.dns_zones_by_name = {}
+        self.dns_zones_by_provider = {}
+        for dns_zone in self.dns_zones:
+            self.dns_zones_by_name.setdefault(dns_zone['name'], dns_zone)
+            if is_not_empty(dns_zone.get('driver')):
+                self.dns_zones_by_provider.setdefault(extract_provider_name(dns_zone['driver']), []).append(dns_zone['name'])
+
+    def get(self, key, default = None):
+        return self.data[key] if key in self.data and is_not_empty(self.data[key]) else default
+
+    def memoize(self, key, build):
+        #? derived data is bound to this instance so it's rebuilt with the config on reload
+        if key not in self._derived:
+            self._derived[key] = build()
+        return self._derived[key]
+
+class CloudEnvironmentsRegistry():
+    def __init__(self, path = CLOUD_ENVIRONMENTS_PATH, hot_reload = CLOUD_ENVIRONMENTS_HOT_RELOAD, reload_interval = CLOUD_ENVIRONMENTS_RELOAD_INTERVAL):
+        self._path = path
+        self._hot_reload = hot_reload
+        self._reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._config = None
+        self._mtime = None
+        self._checked_at = 0
+
+    def load(self):
+        mtime = os.path.getmtime(self._path)
+        with open(self._path, "r") as stream:
+            config = CloudEnvironments(yaml.safe_load(stream))
+
+        self._config = config
+        self._mtime = mtime
+        self._checked_at = time.monotonic()
+        return config
+
+    def is_stale(self):
+        if not self._hot_reload or time.monotonic() - self._checked_at < self._reload_interval:
+            return False
+
+        self._checked_at = time.monotonic()
+        return os.path.getmtime(self._path) != self._mtime
+
+    def get(self):
+        config = self._config
+        if config is not None and not self.is_stale():
+            return config
+
+        with self._lock:
+            if self._config is None or self._config is config:
+                return self.load()
+            return self._config
+
+cloud_environments = CloudEnvironmentsRegistry()
+
+def get_cloud_environments():
+    return cloud_environments.get()
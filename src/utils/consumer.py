@@ -1,10 +1,104 @@
 import os
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
 
 from utils.common import get_env_int
+from utils.logger import log_msg
 
 CONSUMER_SLEEP_TIME = get_env_int('CONSUMER_SLEEP_TIME', 3600)
 CONSUMER_GROUP = os.getenv('CONSUMER_GROUP', 'faas')
 CONSUMER_CHANNEL = os.getenv('CONSUMER_CHANNEL', 'faas')
+CONSUMER_CONCURRENCY = max(1, get_env_int('CONSUMER_CONCURRENCY', 1))
+CONSUMER_PREFETCH = max(1, get_env_int('CONSUMER_PREFETCH', CONSUMER_CONCURRENCY))
+
+FUNCTIONS_CHANNEL = os.getenv('FUNCTIONS_CHANNEL', 'faasfunctions')
+INVOCATIONS_CHANNEL = os.getenv('INVOCATIONS_CHANNEL', 'faasinvocations')
 
 TRIGGERS_GROUP = os.getenv('TRIGGERS_GROUP', 'faastriggers')
 TRIGGERS_CHANNEL = os.getenv('TRIGGERS_CHANNEL', 'faastriggers')
+IOT_TRIGGERS_CHANNEL = os.getenv('IOT_TRIGGERS_CHANNEL', 'iottriggers')
+
+def get_prefetch(concurrency, prefetch = None):
+    return max(1, concurrency, prefetch if prefetch is not None else concurrency)
+
+def is_handled(result):
+    #? handlers returning nothing are considered successful, only an explicit False is not acknowledged
+    return result is not False
+
+class ConsumerPool():
+    def __init__(self, concurrency = 1):
+        self._concurrency = max(1, concurrency)
+        self._semaphore = asyncio.Semaphore(self._concurrency)
+        self._tasks = set()
+
+        if self._concurrency > 1:
+            #? the handlers are offloading their blocking calls with asyncio.to_thread
+            asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers = self._concurrency, thread_name_prefix = "consumer"))
+
+    async def submit(self, handler, msg, ack = None, nack = None):
+        await self._semaphore.acquire()
+        task = asyncio.create_task(self._run(handler, msg, ack, nack))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _run(self, handler, msg, ack, nack):
+        try:
+            try:
+                result = await handler(msg)
+            except Exception as e:
+                log_msg("ERROR", "[ConsumerPool][run] unexpected error in handler: e.type = {}, e.msg = {}".format(type(e), e))
+                result = False
+
+            callback = ack if is_handled(result) else nack
+            if callback is not None:
+                await callback(msg)
+        except Exception as e:
+            log_msg("ERROR", "[ConsumerPool][run] unable to acknowledge the message: e.type = {}, e.msg = {}".format(type(e), e))
+        finally:
+            self._semaphore.release()
+
+    async def join(self):
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions = True)
+
+class MessagesBatcher():
+    def __init__(self, save, batch_size, interval):
+        self._save = save
+        self._batch_size = batch_size
+        self._interval = interval
+        self._pending = []
+        self._timer = None
+
+    async def add(self, message):
+        #? the message is acknowledged only once the batch containing it is persisted
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((message, future))
+        if len(self._pending) >= self._batch_size:
+            await self.flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._interval, lambda: asyncio.ensure_future(self.flush()))
+
+        return await future
+
+    async def flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+
+        try:
+            result = await asyncio.to_thread(self._save, [message for message, _ in batch])
+            result = result is not False
+        except Exception as e:
+            log_msg("ERROR", "[{}][flush] unable to save the batch: count = {}, e.type = {}, e.msg = {}".format(type(self).__name__, len(batch), type(e), e))
+            result = False
+
+        for _, future in batch:
+            if not future.done():
+                future.set_result(result)
@@ -83,3 +83,12 @@ def is_expired(date_str):
     current_date = datetime.now().date()
     expiration_date = datetime.strptime(date_str, "%Y-%m-%d").date()
     return current_date > expiration_date
+
+def get_month_range(time):
+    month = time.replace(day = 1, hour = 0, minute = 0, second = 0, microsecond = 0)
+    next_month = month.replace(year = month.year + 1, month = 1) if month.month == 12 else month.replace(month = month.month + 1)
+    return month, next_month
+
+def to_naive(time):
+    #? the iot data are stored without timezone in the server local time
+    return time.astimezone().replace(tzinfo = None) if time is not None and time.tzinfo is not None else time
@@ -1,4 +1,10 @@
+import os
 import asyncio
+import threading
+
+_background_loop = None
+_background_loop_pid = None
+_background_loop_lock = threading.Lock()
 
 def get_event_loop():
     try:
@@ -7,3 +13,16 @@ def get_event_loop():
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
     return loop
+
+def get_background_event_loop():
+    global _background_loop, _background_loop_pid
+    with _background_loop_lock:
+        #? the loop is owned by a daemon thread which doesn't survive a fork, so each process gets its own
+        if _background_loop is None or _background_loop.is_closed() or _background_loop_pid != os.getpid():
+            _background_loop = asyncio.new_event_loop()
+            _background_loop_pid = os.getpid()
+            threading.Thread(target=_background_loop.run_forever, name="cwcloud-background-loop", daemon=True).start()
+    return _background_loop
+
+def run_in_background_loop(coro):
+    return asyncio.run_coroutine_threadsafe(coro, get_background_event_loop())
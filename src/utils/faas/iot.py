@@ -1,12 +1,21 @@
+import os
+import ssl
 import json
-import asyncio
+import time
+import hashlib
+import tempfile
+import threading
 import paho.mqtt.client as paho
 
-from paho import mqtt
+from collections import OrderedDict
 
 from utils.logger import log_msg
-from utils.common import is_not_empty_key
-from utils.file import create_cert_locally, delete_cert_locally
+from utils.common import get_env_int, is_not_empty_key
+
+MQTT_POOL_SIZE = get_env_int('MQTT_POOL_SIZE', 100)
+MQTT_PUBLISH_TIMEOUT = get_env_int('MQTT_PUBLISH_TIMEOUT', 10)
+MQTT_IDLE_TIMEOUT = get_env_int('MQTT_IDLE_TIMEOUT', 300)
+MQTT_KEEPALIVE = get_env_int('MQTT_KEEPALIVE', 60)
 
 def on_connect(client, userdata, flags, rc, properties=None):
     log_msg("DEBUG", "[on_connect] CONNACK received with code %s." % rc)
@@ -20,58 +29,179 @@ def on_subscribe(client, userdata, mid, granted_qos, properties=None):
 def on_message(client, userdata, msg):
     log_msg("DEBUG", "[on_message] topic: {} qos: {} payload: {}".format(msg.topic, str(msg.qos), str(msg.payload)))
 
-async def send_payload_in_realtime(callback, payload):
-    client_id = callback['client_id'] if is_not_empty_key(callback, 'client_id') else ""
-    user_data = callback['user_data'] if is_not_empty_key(callback, 'user_data') else None
-    username = callback['username'] if is_not_empty_key(callback, 'username') else ""
-    password = callback['password'] if is_not_empty_key(callback, 'password') else ""
-    endpoint = callback['endpoint'] if is_not_empty_key(callback, 'endpoint') else ""
-    port = int(callback['port']) if is_not_empty_key(callback, 'port') else 8883
-    subscription = callback['subscription'] if is_not_empty_key(callback, 'subscription') else "faas/#"
-    qos = int(callback['qos']) if is_not_empty_key(callback, 'qos') else 1
-    topic = callback['topic'] if is_not_empty_key(callback, 'topic') else "faas/test"
+def get_publisher_settings(callback):
     certificates_are_required = callback['certificates_are_required'] if is_not_empty_key(callback, 'certificates_are_required') else False
-    certificates = callback['certificates'] if is_not_empty_key(callback, 'certificates') else None
-
-    if callback['type'] == "mqtt":
-        log_msg("DEBUG", "[consume][handle] invoke mqtt callback: {}".format(endpoint))
-        client = paho.Client(client_id=client_id, userdata=user_data, protocol=paho.MQTTv5)
-    elif callback['type'] == "websocket":
-        log_msg("DEBUG", "[consume][handle] invoke websocket callback: {}".format(endpoint))
-        client = paho.Client(client_id=client_id, userdata=user_data, transport='websockets')
-
-    client.on_connect = on_connect
-    client.on_subscribe = on_subscribe
-    client.on_message = on_message
-    client.on_publish = on_publish
-
-    if certificates_are_required:
-        create_cert_locally("iot_hub_certificate", certificates['iot_hub_certificate'])
-        create_cert_locally("device_certificate", certificates['device_certificate'])
-        create_cert_locally("device_key_certificate", certificates['device_key_certificate'])
-        client.tls_set(
-            ca_certs="./iot_hub_certificate.pem",
-            certfile="./device_certificate.pem",
-            keyfile="./device_key_certificate.pem",
-            tls_version=mqtt.client.ssl.PROTOCOL_TLS
-        )
-    else:
-        client.tls_set(tls_version=mqtt.client.ssl.PROTOCOL_TLS)
-
-    client.username_pw_set(username, password)
-    client.connect(endpoint, port)
-
-    client.loop_start()
-
-    client.subscribe(subscription, qos=qos)
-    client.publish(topic, payload=json.dumps(payload), qos=qos)
-
-    await asyncio.sleep(1) #? Give some time for the message to be sent before stopping the loop
-
-    if certificates_are_required:
-        delete_cert_locally("iot_hub_certificate")
-        delete_cert_locally("device_certificate")
-        delete_cert_locally("device_key_certificate")
-    
-    client.loop_stop()
-    client.disconnect()
+    return {
+        'type': callback['type'],
+        'client_id': callback['client_id'] if is_not_empty_key(callback, 'client_id') else "",
+        'user_data': callback['user_data'] if is_not_empty_key(callback, 'user_data') else None,
+        'username': callback['username'] if is_not_empty_key(callback, 'username') else "",
+        'password': callback['password'] if is_not_empty_key(callback, 'password') else "",
+        'endpoint': callback['endpoint'] if is_not_empty_key(callback, 'endpoint') else "",
+        'port': int(callback['port']) if is_not_empty_key(callback, 'port') else 8883,
+        'subscription': callback['subscription'] if is_not_empty_key(callback, 'subscription') else "faas/#",
+        'qos': int(callback['qos']) if is_not_empty_key(callback, 'qos') else 1,
+        'certificates': callback['certificates'] if certificates_are_required and is_not_empty_key(callback, 'certificates') else None
+    }
+
+def get_publisher_key(settings):
+    return hashlib.sha256(json.dumps(settings, sort_keys = True, default = str).encode('UTF-8')).hexdigest()
+
+def load_cert_chain(context, certificate, key):
+    #? the ssl module can only load a client certificate from a path: the pem files are private to this call and removed right after
+    paths = []
+    try:
+        for content in [certificate, key]:
+            fd, path = tempfile.mkstemp(suffix = ".pem")
+            paths.append(path)
+            with os.fdopen(fd, "w") as file:
+                file.write(content)
+
+        context.load_cert_chain(certfile = paths[0], keyfile = paths[1])
+    finally:
+        for path in paths:
+            os.remove(path)
+
+def new_ssl_context(certificates):
+    if certificates is None:
+        return ssl.create_default_context()
+
+    context = ssl.create_default_context(cadata = certificates['iot_hub_certificate'])
+    load_cert_chain(context, certificates['device_certificate'], certificates['device_key_certificate'])
+    return context
+
+class MqttPublisher():
+    def __init__(self, settings, connect_timeout = MQTT_PUBLISH_TIMEOUT):
+        self._settings = settings
+        self._connected = threading.Event()
+        self.used_at = time.monotonic()
+
+        if settings['type'] == "websocket":
+            self._client = paho.Client(client_id=settings['client_id'], userdata=settings['user_data'], transport='websockets')
+        else:
+            self._client = paho.Client(client_id=settings['client_id'], userdata=settings['user_data'], protocol=paho.MQTTv5)
+
+        self._client.on_connect = self.on_connect
+        self._client.on_disconnect = self.on_disconnect
+        self._client.on_subscribe = on_subscribe
+        self._client.on_message = on_message
+        self._client.on_publish = on_publish
+
+        self._client.tls_set_context(new_ssl_context(settings['certificates']))
+        self._client.username_pw_set(settings['username'], settings['password'])
+        self._client.connect(settings['endpoint'], settings['port'], keepalive = MQTT_KEEPALIVE)
+        self._client.loop_start()
+
+        if not self._connected.wait(connect_timeout):
+            self.close()
+            raise TimeoutError("no CONNACK received from {}:{}".format(settings['endpoint'], settings['port']))
+
+    def on_connect(self, client, userdata, flags, rc, properties=None):
+        on_connect(client, userdata, flags, rc, properties)
+        if rc == 0:
+            #? the subscription is renewed each time the client reconnects
+            client.subscribe(self._settings['subscription'], qos=self._settings['qos'])
+            self._connected.set()
+
+    def on_disconnect(self, client, userdata, rc, properties=None, *args):
+        log_msg("DEBUG", "[on_disconnect] endpoint = {}, rc = {}".format(self._settings['endpoint'], rc))
+        self._connected.clear()
+
+    def is_connected(self):
+        return self._connected.is_set()
+
+    def publish(self, topic, payload, qos, timeout = MQTT_PUBLISH_TIMEOUT):
+        self.used_at = time.monotonic()
+        info = self._client.publish(topic, payload=json.dumps(payload), qos=qos)
+        info.wait_for_publish(timeout)
+        if not info.is_published():
+            raise TimeoutError("message not acknowledged by {} after {}s".format(self._settings['endpoint'], timeout))
+
+    def close(self):
+        try:
+            self._client.disconnect()
+            self._client.loop_stop()
+        except Exception as e:
+            log_msg("WARN", "[MqttPublisher][close] endpoint = {}, e.type = {}, e.msg = {}".format(self._settings['endpoint'], type(e), e))
+
+class MqttPublishersPool():
+    def __init__(self, size = MQTT_POOL_SIZE, idle_timeout = MQTT_IDLE_TIMEOUT):
+        self._size = size
+        self._idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        self._publishers = OrderedDict()
+
+    def _evict(self, now):
+        evicted = []
+        for key in list(self._publishers.keys()):
+            if now - self._publishers[key].used_at > self._idle_timeout:
+                evicted.append(self._publishers.pop(key))
+
+        while len(self._publishers) > self._size:
+            evicted.append(self._publishers.popitem(last = False)[1])
+
+        return evicted
+
+    def _close(self, publishers):
+        for publisher in publishers:
+            publisher.close()
+
+    def get(self, settings):
+        key = get_publisher_key(settings)
+        with self._lock:
+            #? the idle publishers are also evicted on the hit path, not only when a new one is connected
+            evicted = self._evict(time.monotonic())
+            publisher = self._publishers.get(key)
+            if publisher is not None:
+                self._publishers.move_to_end(key)
+
+        self._close(evicted)
+        if publisher is not None:
+            return key, publisher
+
+        publisher = MqttPublisher(settings)
+        with self._lock:
+            current = self._publishers.get(key)
+            if current is None:
+                self._publishers[key] = publisher
+                evicted = self._evict(time.monotonic())
+            else:
+                #? another thread connected the same publisher in the meantime
+                evicted = [publisher]
+                publisher = current
+
+        self._close(evicted)
+        return key, publisher
+
+    def invalidate(self, key):
+        with self._lock:
+            publisher = self._publishers.pop(key, None)
+
+        if publisher is not None:
+            publisher.close()
+
+    def close(self):
+        with self._lock:
+            publishers = list(self._publishers.values())
+            self._publishers.clear()
+
+        for publisher in publishers:
+            publisher.close()
+
+    def __len__(self):
+        return len(self._publishers)
+
+mqtt_publishers = MqttPublishersPool()
+
+def send_payload_in_realtime(callback, payload):
+    settings = get_publisher_settings(callback)
+    topic = callback['topic'] if is_not_empty_key(callback, 'topic') else "faas/test"
+
+    log_msg("DEBUG", "[send_payload_in_realtime] invoke {} callback: {}".format(settings['type'], settings['endpoint']))
+    key, publisher = mqtt_publishers.get(settings)
+    try:
+        publisher.publish(topic, payload, settings['qos'])
+    except Exception:
+        #? the next callback will open a new connection instead of reusing a broken one
+        mqtt_publishers.invalidate(key)
+        raise
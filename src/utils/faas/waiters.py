@@ -0,0 +1,76 @@
+import asyncio
+import threading
+
+from contextlib import contextmanager
+
+from adapters.AdapterConfig import get_adapter
+from utils.consumer import INVOCATIONS_CHANNEL
+from utils.logger import log_msg
+
+_pubsub_adapter = get_adapter("pubsub")
+
+class InvocationWaiters():
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waiters = {}
+        self._subscribed = False
+
+    def subscribe(self):
+        with self._lock:
+            if self._subscribed:
+                return
+            self._subscribed = True
+
+        try:
+            _pubsub_adapter().subscribe(INVOCATIONS_CHANNEL, self.on_invocation_event)
+        except Exception:
+            #? the subscription is retried by the next waiter
+            with self._lock:
+                self._subscribed = False
+            raise
+
+    def on_invocation_event(self, payload):
+        if payload is None or 'id' not in payload:
+            return
+
+        with self._lock:
+            callbacks = list(self._waiters.get("{}".format(payload['id']), []))
+
+        log_msg("DEBUG", "[InvocationWaiters][on_invocation_event] id = {}, waiters = {}".format(payload['id'], len(callbacks)))
+        for callback in callbacks:
+            callback()
+
+    @contextmanager
+    def register(self, id, callback):
+        self.subscribe()
+        key = "{}".format(id)
+        with self._lock:
+            self._waiters.setdefault(key, []).append(callback)
+
+        try:
+            yield
+        finally:
+            with self._lock:
+                callbacks = self._waiters.get(key, [])
+                if callback in callbacks:
+                    callbacks.remove(callback)
+                if not callbacks:
+                    self._waiters.pop(key, None)
+
+    @contextmanager
+    def event(self, id):
+        event = threading.Event()
+        with self.register(id, event.set):
+            yield event
+
+    @contextmanager
+    def aevent(self, id):
+        event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        with self.register(id, lambda: loop.call_soon_threadsafe(event.set)):
+            yield event
+
+invocation_waiters = InvocationWaiters()
+
+def notify_invocation(id, state):
+    _pubsub_adapter().broadcast(INVOCATIONS_CHANNEL, { 'id': "{}".format(id), 'state': state })
@@ -1,4 +1,23 @@
-from fastapi import Request
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+from utils.common import get_env_int
+
+CATALOG_CACHE_MAX_AGE = get_env_int('CATALOG_CACHE_MAX_AGE', 300)
 
 async def get_raw_body(request: Request) -> str:
     return (await request.body()).decode("utf-8")
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get('if-none-match')
+    if not if_none_match:
+        return False
+
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+def cached_json_response(request: Request, entry: dict, max_age: int = CATALOG_CACHE_MAX_AGE) -> Response:
+    headers = { 'ETag': entry['etag'], 'Cache-Control': "public, max-age={}".format(max_age) }
+    if is_not_modified(request, entry['etag']):
+        return Response(status_code = 304, headers = headers)
+    return JSONResponse(content = entry['content'], headers = headers)
@@ -1,5 +1,4 @@
 import os
-import time
 import base64
 
 from utils.logger import log_msg
@@ -15,15 +14,6 @@ def quiet_remove(path):
     except FileNotFoundError as e:
         log_msg("WARN", "[quiet_remove] file {} doesn't exists".format(path))
 
-def create_cert_locally(file_name, file_content):
-    with open(f"{file_name}.pem" , "w") as file:
-        file.write(file_content)
-
-    time.sleep(1)
-
-def delete_cert_locally(file_name):
-    quiet_remove(f"{file_name}.pem")
-
 def get_b64_content(file_name: str, remove: bool):
     b64_content = ""
     with open(file_name, "rb") as file:
@@ -3,7 +3,6 @@ import base64
 import secrets
 import gitlab
 import requests
-import yaml
 
 from fastapi.responses import JSONResponse
 from datetime import datetime, timedelta
@@ -12,7 +11,8 @@ from urllib.parse import urlparse
 
 from utils.api_url import is_url_not_responding
 from utils.bytes_generator import generate_random_bytes
-from utils.common import exists_entry, get_env_int, is_disabled, is_empty, is_empty_key, is_not_empty, is_not_empty_key, is_response_ko, safe_compare_entry, safe_contain_entry, is_response_ok
+from utils.cloud_environments import get_cloud_environments
+from utils.common import exists_entry, get_env_int, is_disabled, is_empty, is_empty_key, is_not_empty_key, is_response_ko, safe_compare_entry, safe_contain_entry, is_response_ok
 from utils.http import HTTP_REQUEST_TIMEOUT
 from utils.logger import log_msg
 from utils.mail import send_email
@@ -39,12 +39,7 @@ def is_public_instance(gitlab_url):
     return gitlab_url in get_public_instances()
 
 def get_public_instances():
-    config_path = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', 'cloud_environments.yml'))
-    result = ["https://gitlab.com"]
-    with open(config_path, "r") as stream:
-        loaded_data = yaml.safe_load(stream)
-        if is_not_empty(loaded_data) and 'gitlab_public_instances' in loaded_data and is_not_empty(loaded_data['gitlab_public_instances']):
-            result = loaded_data['gitlab_public_instances']
+    result = get_cloud_environments().get('gitlab_public_instances', ["https://gitlab.com"])
 
     log_msg("INFO", "[gitlab][get_public_instances] gitlab loaded public instances are : {}".format(result))
     return result
@@ -1,3 +1,29 @@
+import httpx
+import logging
+
 from utils.common import get_env_int
 
 HTTP_REQUEST_TIMEOUT = get_env_int('TIMEOUT', 60)
+HTTP_MAX_CONNECTIONS = get_env_int('HTTP_MAX_CONNECTIONS', 100)
+HTTP_MAX_KEEPALIVE_CONNECTIONS = get_env_int('HTTP_MAX_KEEPALIVE_CONNECTIONS', 20)
+
+#? one info log per request would flood the logs of the monitors and the trackers
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+_async_http_client = None
+
+def get_async_http_client():
+    #? shared by all the coroutines of the event loop to reuse the keep-alive connections
+    global _async_http_client
+    if _async_http_client is None or _async_http_client.is_closed:
+        _async_http_client = httpx.AsyncClient(
+            timeout = HTTP_REQUEST_TIMEOUT,
+            limits = httpx.Limits(max_connections = HTTP_MAX_CONNECTIONS, max_keepalive_connections = HTTP_MAX_KEEPALIVE_CONNECTIONS)
+        )
+    return _async_http_client
+
+async def close_async_http_client():
+    global _async_http_client
+    if _async_http_client is not None:
+        await _async_http_client.aclose()
+        _async_http_client = None
@@ -0,0 +1,271 @@
+import os
+import json
+import time
+import uuid
+import threading
+
+from contextlib import ExitStack
+from datetime import datetime
+
+from adapters.AdapterConfig import get_adapter
+from schemas.faas.Invocation import Invocation
+from schemas.faas.InvocationArg import InvocationArgument
+from schemas.faas.InvocationContent import InvocationContent
+from utils.common import get_env_bool, get_env_float, get_env_int, is_false, is_not_empty, is_numeric
+from utils.consumer import CONSUMER_CHANNEL, CONSUMER_GROUP, IOT_TRIGGERS_CHANNEL, TRIGGERS_GROUP, MessagesBatcher
+from utils.encoder import AlchemyEncoder
+from utils.faas.invocations import _in_progress
+from utils.faas.waiters import invocation_waiters
+from utils.iot.timeseries import ensure_data_partitions, is_accepted_time, save_numeric_data
+from utils.logger import log_msg
+
+IOT_ASYNC_INGESTION = get_env_bool('IOT_ASYNC_INGESTION', False)
+IOT_INGESTION_CONSUMER_ENABLED = get_env_bool('IOT_INGESTION_CONSUMER_ENABLED', True)
+IOT_INGESTION_GROUP = os.getenv('IOT_INGESTION_GROUP', 'iot')
+IOT_INGESTION_CHANNEL = os.getenv('IOT_INGESTION_CHANNEL', 'iotdata')
+IOT_INGESTION_BATCH_SIZE = max(1, get_env_int('IOT_INGESTION_BATCH_SIZE', 100))
+IOT_INGESTION_CONCURRENCY = max(1, get_env_int('IOT_INGESTION_CONCURRENCY', 4))
+IOT_INGESTION_FLUSH_INTERVAL = get_env_float('IOT_INGESTION_FLUSH_INTERVAL', 1)
+IOT_DECODING_TIMEOUT = get_env_float('IOT_DECODING_TIMEOUT', 100)
+IOT_DECODING_CHECK_INTERVAL = get_env_float('IOT_DECODING_CHECK_INTERVAL', 5)
+
+DATA_KEY = "data"
+STRING_DATA_MAX_LENGTH = 254
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+pubsub_adapter = get_adapter("pubsub")
+
+def new_decoding_invocation(invoker_id, function_id, content):
+    return Invocation(
+        invoker_id = invoker_id,
+        content = InvocationContent(
+            function_id = function_id,
+            args = [
+                InvocationArgument(
+                    key = DATA_KEY,
+                    value = content
+                )
+            ]
+        )
+    )
+
+def new_iot_data_message(device_id, function_id, invoker_id, user_auth, content, created_at = None):
+    return {
+        'device_id': device_id,
+        'function_id': "{}".format(function_id),
+        'invoker_id': invoker_id,
+        'user_auth': user_auth.dict() if is_not_empty(user_auth) else None,
+        'content': content,
+        'created_at': created_at if is_not_empty(created_at) else datetime.now().strftime(DATE_FORMAT)
+    }
+
+def publish_iot_data(message):
+    pubsub_adapter().publish(IOT_INGESTION_GROUP, IOT_INGESTION_CHANNEL, message)
+
+def publish_iot_data_batch(messages):
+    pubsub_adapter().publish_batch(IOT_INGESTION_GROUP, IOT_INGESTION_CHANNEL, messages)
+
+def new_trigger_event(trigger):
+    return {
+        'id': "{}".format(trigger.id),
+        'kind': trigger.kind,
+        'content': trigger.content,
+        'created_at': "{}".format(trigger.created_at),
+        'updated_at': "{}".format(trigger.updated_at),
+        'owner': {
+            'id': trigger.owner_id
+        }
+    }
+
+def publish_iot_triggers(triggers):
+    #? the triggers are evaluated by the scheduler instead of adding jobs in the api workers
+    pubsub_adapter().publish(TRIGGERS_GROUP, IOT_TRIGGERS_CHANNEL, {
+        'action': 'evaluate',
+        'triggers': [new_trigger_event(trigger) for trigger in triggers]
+    })
+
+def create_decoding_invocations(messages, db):
+    from entities.faas.Function import FunctionEntity
+    from entities.faas.Invocation import InvocationEntity
+    from entities.faas.InvocationExecutionTrace import InvocationExecutionTraceEntity
+
+    #? the decoding functions are loaded once per batch
+    function_ids = {message['function_id'] for message in messages}
+    functions = {"{}".format(function.id): function for function in FunctionEntity.findByIds(function_ids, db)}
+
+    invocations = {}
+    publications = []
+    for message in messages:
+        function = functions.get(message['function_id'])
+        if function is None:
+            log_msg("WARN", "[create_decoding_invocations] decoding function not found: device_id = {}, function_id = {}".format(message['device_id'], message['function_id']))
+            continue
+
+        id = "{}".format(uuid.uuid4())
+        invoker_id = message['invoker_id'] if is_not_empty(message['invoker_id']) else function.owner_id
+        payload = new_decoding_invocation(invoker_id, message['function_id'], message['content'])
+        payload.content.state = _in_progress
+        content = payload.content.dict()
+        db.add(InvocationEntity(id = id, invoker_id = invoker_id, content = content))
+        db.add(InvocationExecutionTraceEntity(invocation_id = id, invoker_id = invoker_id, content = content))
+        payload.content.user_auth = message['user_auth']
+        publications.append({'id': id, 'function_updated_at': "{}".format(function.updated_at), **payload.dict()})
+        invocations[id] = message
+
+    db.commit()
+
+    if publications:
+        pubsub_adapter().publish_batch(CONSUMER_GROUP, CONSUMER_CHANNEL, publications)
+
+    return invocations
+
+def wait_for_invocations(ids, db, timeout = IOT_DECODING_TIMEOUT, interval = IOT_DECODING_CHECK_INTERVAL):
+    from entities.faas.Invocation import InvocationEntity
+
+    pending = set(ids)
+    results = {}
+    deadline = time.monotonic() + timeout
+    event = threading.Event()
+    #? one query per notification or check interval for the whole batch instead of one polling loop per datapoint
+    with ExitStack() as waiters:
+        for id in ids:
+            waiters.enter_context(invocation_waiters.register(id, event.set))
+
+        while True:
+            for invocation in db.query(InvocationEntity).filter(InvocationEntity.id.in_(pending)).all():
+                if invocation.content.get('state') != _in_progress:
+                    id = "{}".format(invocation.id)
+                    results[id] = json.loads(json.dumps(invocation, cls = AlchemyEncoder))
+                    pending.discard(id)
+
+            remaining = deadline - time.monotonic()
+            if not pending or remaining <= 0:
+                return results, pending
+
+            db.rollback()
+            event.wait(min(remaining, interval))
+            event.clear()
+
+def to_data_rows(message, invocation):
+    data_id = "{}".format(uuid.uuid4())
+    result = invocation['content'].get('result')
+    created_at = datetime.strptime(message['created_at'], DATE_FORMAT)
+    data = {
+        'id': data_id,
+        'device_id': message['device_id'],
+        'normalized_content': {'status': 'ok', 'code': 200, 'entity': invocation},
+        'created_at': created_at
+    }
+
+    value = {
+        'data_id': data_id,
+        'device_id': message['device_id'],
+        'key': DATA_KEY,
+        'value': result,
+        'created_at': created_at
+    }
+
+    if isinstance(result, (dict, list)):
+        value['value'] = json.dumps(result)
+        return data, None, value
+
+    if is_numeric(result):
+        value['value'] = float(result)
+        return data, value, None
+
+    return data, None, value
+
+def get_data_rows_error(data, string_data):
+    if not is_accepted_time(data['created_at']):
+        return "created_at outside the accepted range: {}".format(data['created_at'])
+
+    if string_data is not None and len("{}".format(string_data['value'])) > STRING_DATA_MAX_LENGTH:
+        return "string result longer than {} characters".format(STRING_DATA_MAX_LENGTH)
+
+    return None
+
+def save_decoded_data(invocations, results, db):
+    from entities.iot.Data import Data, StringData
+
+    datas, numeric_datas, string_datas = [], [], []
+    rejected = {}
+    for id, invocation in results.items():
+        if invocation['content'].get('result') is None:
+            log_msg("WARN", "[save_decoded_data] decoding invocation without result: id = {}, state = {}".format(id, invocation['content'].get('state')))
+            continue
+
+        #? an invalid row would fail the whole multi-row insert so it's rejected alone
+        try:
+            data, numeric_data, string_data = to_data_rows(invocations[id], invocation)
+            error = get_data_rows_error(data, string_data)
+        except ValueError as e:
+            error = "{}".format(e)
+
+        if error is not None:
+            log_msg("WARN", "[save_decoded_data] rejecting the decoded data: id = {}, device_id = {}, error = {}".format(id, invocations[id]['device_id'], error))
+            rejected[id] = error
+            continue
+
+        datas.append(data)
+        if numeric_data is not None:
+            numeric_datas.append(numeric_data)
+        else:
+            string_datas.append(string_data)
+
+    if not datas:
+        return 0, rejected
+
+    ensure_data_partitions([data['created_at'] for data in datas], db)
+    Data.insertData(datas, db)
+    if numeric_datas:
+        save_numeric_data(numeric_datas, db)
+    if string_datas:
+        StringData.insertStringData(string_datas, db)
+    db.commit()
+    return len(datas), rejected
+
+def decode_iot_data(messages):
+    from database.postgres_db import ThreadedSessionLocal
+
+    with ThreadedSessionLocal() as db:
+        invocations = create_decoding_invocations(messages, db)
+        if not invocations:
+            return True
+
+        results, pending = wait_for_invocations(list(invocations.keys()), db)
+        if pending:
+            log_msg("WARN", "[decode_iot_data] decoding invocations not completed before the timeout: count = {}, timeout = {}".format(len(pending), IOT_DECODING_TIMEOUT))
+
+        count, rejected = save_decoded_data(invocations, results, db)
+        log_msg("DEBUG", lambda: "[decode_iot_data] saved decoded data: count = {}, rejected = {}, batch = {}".format(count, len(rejected), len(messages)))
+        return True
+
+class IotDataBatcher(MessagesBatcher):
+    def __init__(self, save = decode_iot_data, batch_size = IOT_INGESTION_BATCH_SIZE, interval = IOT_INGESTION_FLUSH_INTERVAL):
+        super().__init__(save, batch_size, interval)
+
+def iot_ingestion():
+    if is_false(IOT_ASYNC_INGESTION) or is_false(IOT_INGESTION_CONSUMER_ENABLED):
+        return
+
+    def consume():
+        while True:
+            batcher = IotDataBatcher()
+
+            async def handle(msg):
+                message = pubsub_adapter().decode(msg)
+                if message is None or not is_not_empty(message.get('device_id')) or not is_not_empty(message.get('function_id')):
+                    return True
+
+                return await batcher.add(message)
+
+            #? several batches can be decoded at the same time while waiting for the functions results
+            concurrency = IOT_INGESTION_BATCH_SIZE * IOT_INGESTION_CONCURRENCY
+            try:
+                pubsub_adapter().consume(IOT_INGESTION_GROUP, IOT_INGESTION_CHANNEL, handle, concurrency, concurrency)
+            except Exception as e:
+                log_msg("ERROR", "[iot_ingestion] unexpected error in the consumer: e.type = {}, e.msg = {}".format(type(e), e))
+                time.sleep(1)
+
+    consumer_thread = threading.Thread(target=consume, name="iot-ingestion", daemon=True)
+    consumer_thread.start()
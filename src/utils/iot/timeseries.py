@@ -0,0 +1,207 @@
+import os
+import re
+import time
+import base64
+import threading
+
+from datetime import datetime, timedelta
+
+from database.redis_db import redis_client
+from utils.common import get_env_int, is_empty, is_not_uuid
+from utils.date import get_month_range
+from utils.logger import log_msg
+
+IOT_DATA_MAX_RESULTS = max(1, get_env_int('IOT_DATA_MAX_RESULTS', 1000))
+IOT_DATA_RETENTION_MONTHS = get_env_int('IOT_DATA_RETENTION_MONTHS', 0)
+IOT_DATA_RETENTION_INTERVAL = max(1, get_env_int('IOT_DATA_RETENTION_INTERVAL', 3600))
+IOT_DATA_RETENTION_BATCH_SIZE = max(1, get_env_int('IOT_DATA_RETENTION_BATCH_SIZE', 10000))
+IOT_DATA_RETENTION_LOCK = os.getenv('IOT_DATA_RETENTION_LOCK', 'cwcloud:iot:retention')
+IOT_DATA_MAX_AGE_MONTHS = max(1, get_env_int('IOT_DATA_MAX_AGE_MONTHS', IOT_DATA_RETENTION_MONTHS if IOT_DATA_RETENTION_MONTHS > 0 else 12))
+IOT_DATA_MAX_FUTURE_SKEW = max(0, get_env_int('IOT_DATA_MAX_FUTURE_SKEW', 300))
+IOT_DATA_PARTITION_RETRY_INTERVAL = max(0, get_env_int('IOT_DATA_PARTITION_RETRY_INTERVAL', 600))
+IOT_AGGREGATE_MAX_BUCKETS = max(1, get_env_int('IOT_AGGREGATE_MAX_BUCKETS', 1000))
+
+AGGREGATE_INTERVALS = {
+    '1m': 60,
+    '5m': 300,
+    '1h': 3600,
+    '1d': 86400
+}
+
+_partition_pattern = re.compile(r"_(\d{6})$")
+_partitions = set()
+_failed_partitions = {}
+
+def get_accepted_range(now = None):
+    #? the datapoints older than the retention or too far in the future are rejected instead of creating their partitions
+    now = now if now is not None else datetime.now()
+    return get_retention_cutoff(now, IOT_DATA_MAX_AGE_MONTHS), now + timedelta(seconds = IOT_DATA_MAX_FUTURE_SKEW)
+
+def is_accepted_time(created_at, now = None):
+    start, end = get_accepted_range(now)
+    return start <= created_at <= end
+
+def ensure_data_partitions(times, db):
+    from entities.iot.Data import NumericData, StringData
+
+    months = set()
+    for created_at in times:
+        if is_accepted_time(created_at):
+            months.add(get_month_range(created_at))
+        else:
+            log_msg("WARN", "[ensure_data_partitions] ignoring a time outside the accepted range: {}".format(created_at))
+
+    for month, next_month in months:
+        if month in _partitions:
+            continue
+
+        #? the failing ddl isn't retried on every batch but only once the backoff is over
+        retry_at = _failed_partitions.get(month)
+        if retry_at is not None and time.monotonic() < retry_at:
+            continue
+
+        try:
+            NumericData.createMonthlyPartition(month, next_month, db)
+            StringData.createMonthlyPartition(month, next_month, db)
+            _partitions.add(month)
+            _failed_partitions.pop(month, None)
+        except Exception as e:
+            #? the rows are kept in the default partition, e.g. when it already contains some rows of this month
+            db.rollback()
+            _failed_partitions[month] = time.monotonic() + IOT_DATA_PARTITION_RETRY_INTERVAL
+            log_msg("WARN", "[ensure_data_partitions] unable to create the partitions of {}: e.type = {}, e.msg = {}".format(month, type(e), e))
+
+def rollup_numeric_data(numeric_datas):
+    #? one row per minute bucket: the same bucket can't be upserted twice in the same statement
+    rollups = {}
+    for numeric_data in numeric_datas:
+        bucket = numeric_data['created_at'].replace(second = 0, microsecond = 0)
+        rollup_key = ("{}".format(numeric_data['device_id']), numeric_data['key'], bucket)
+        value = numeric_data['value']
+        rollup = rollups.get(rollup_key)
+        if rollup is None:
+            rollups[rollup_key] = {'device_id': rollup_key[0], 'key': rollup_key[1], 'bucket': bucket, 'count': 1, 'sum': value, 'min': value, 'max': value}
+        else:
+            rollup['count'] += 1
+            rollup['sum'] += value
+            rollup['min'] = min(rollup['min'], value)
+            rollup['max'] = max(rollup['max'], value)
+
+    #? sorted to lock the rows in the same order between the concurrent batches
+    return [rollups[rollup_key] for rollup_key in sorted(rollups)]
+
+def save_numeric_data(numeric_datas, db):
+    from entities.iot.Data import NumericData, NumericDataRollup
+
+    NumericData.insertNumericData(numeric_datas, db)
+    NumericDataRollup.upsertNumericDataRollups(rollup_numeric_data(numeric_datas), db)
+
+def parse_percentiles(percentiles):
+    if is_empty(percentiles):
+        return []
+
+    values = sorted({float(percentile) for percentile in percentiles.split(',')})
+    if any(value <= 0 or value >= 100 for value in values):
+        raise ValueError("the percentiles must be between 0 and 100: {}".format(percentiles))
+    return values
+
+def format_percentile(percentile):
+    return "p{}".format(int(percentile) if float(percentile).is_integer() else percentile)
+
+def count_buckets(start, end, seconds):
+    #? the buckets are aligned on the epoch like the aggregation query
+    epoch = datetime(1970, 1, 1)
+    return int((end - epoch).total_seconds() // seconds - (start - epoch).total_seconds() // seconds) + 1
+
+def get_aggregates(device_id, key, interval, start, end, percentiles, db):
+    from entities.iot.Data import NumericData, NumericDataRollup
+
+    seconds = AGGREGATE_INTERVALS[interval]
+    buckets = {}
+    for row in NumericDataRollup.getAggregates(device_id, key, seconds, start, end, db):
+        count = int(row.count)
+        buckets[row.bucket] = {
+            'bucket': row.bucket.isoformat(),
+            'count': count,
+            'min': row.min,
+            'max': row.max,
+            'avg': row.sum / count if count else None
+        }
+
+    #? the percentiles can't be merged from the rollups so they're computed on the raw values of the range
+    if percentiles:
+        for row in NumericData.getPercentiles(device_id, key, seconds, start, end, [p / 100 for p in percentiles], db):
+            bucket = buckets.get(row.bucket)
+            if bucket is not None:
+                bucket.update({format_percentile(percentile): value for percentile, value in zip(percentiles, row.percentiles)})
+
+    return list(buckets.values())
+
+def encode_cursor(entity):
+    return base64.urlsafe_b64encode("{}|{}".format(entity.created_at.isoformat(), entity.id).encode('UTF-8')).decode('UTF-8')
+
+def decode_cursor(cursor):
+    if is_empty(cursor):
+        return None
+
+    created_at, id = base64.urlsafe_b64decode(cursor.encode('UTF-8')).decode('UTF-8').split('|', 1)
+    if is_not_uuid(id):
+        raise ValueError("invalid cursor id: {}".format(id))
+
+    return datetime.fromisoformat(created_at), id
+
+def get_page(entity, device_id, key, start, end, cursor, max_results, db):
+    max_results = min(max_results, IOT_DATA_MAX_RESULTS)
+    #? one more row to know if there's a next page
+    results = entity.findPage(device_id, key, start, end, decode_cursor(cursor), max_results + 1, db)
+    next_cursor = encode_cursor(results[max_results - 1]) if len(results) > max_results else None
+    return results[:max_results], next_cursor
+
+def get_retention_cutoff(now, months):
+    month, _ = get_month_range(now)
+    year, month_index = divmod(month.year * 12 + month.month - 1 - months, 12)
+    return month.replace(year = year, month = month_index + 1)
+
+def get_expired_partitions(partitions, cutoff):
+    expired = []
+    for partition in partitions:
+        match = _partition_pattern.search(partition)
+        if match and get_month_range(datetime.strptime(match.group(1), "%Y%m"))[1] <= cutoff:
+            expired.append(partition)
+    return expired
+
+def apply_retention(now = None, months = IOT_DATA_RETENTION_MONTHS):
+    from database.postgres_db import SessionLocal
+    from entities.iot.Data import Data, NumericData, StringData
+
+    cutoff = get_retention_cutoff(now if now is not None else datetime.now(), months)
+    with SessionLocal() as db:
+        #? the expired months are dropped as a whole, only the remaining rows are deleted in batches
+        for entity in [NumericData, StringData]:
+            for partition in get_expired_partitions(entity.getPartitions(db), cutoff):
+                entity.dropPartition(partition, db)
+                log_msg("INFO", "[apply_retention] dropped the partition {}".format(partition))
+
+        deleted = IOT_DATA_RETENTION_BATCH_SIZE
+        while deleted >= IOT_DATA_RETENTION_BATCH_SIZE:
+            deleted = Data.deleteDataBefore(cutoff, IOT_DATA_RETENTION_BATCH_SIZE, db)
+
+    return cutoff
+
+def iot_retention():
+    if IOT_DATA_RETENTION_MONTHS <= 0:
+        return
+
+    def run():
+        while True:
+            try:
+                #? only one api instance is applying the retention per interval
+                if redis_client.set(IOT_DATA_RETENTION_LOCK, "{}".format(os.getpid()), nx = True, ex = IOT_DATA_RETENTION_INTERVAL):
+                    cutoff = apply_retention()
+                    log_msg("DEBUG", lambda: "[iot_retention] applied the retention: cutoff = {}".format(cutoff))
+            except Exception as e:
+                log_msg("ERROR", "[iot_retention] unexpected error: e.type = {}, e.msg = {}".format(type(e), e))
+            time.sleep(IOT_DATA_RETENTION_INTERVAL)
+
+    retention_thread = threading.Thread(target=run, name="iot-retention", daemon=True)
+    retention_thread.start()
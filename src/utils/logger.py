@@ -1,14 +1,14 @@
 import os
-import requests
 import logging
 import json
 import sys
 
 from datetime import datetime
+from functools import lru_cache
 
-from utils.http import HTTP_REQUEST_TIMEOUT
 from utils.observability.cid import get_current_cid
 from utils.common import get_env_bool, is_disabled, is_enabled
+from utils.notifier import notifications_queue
 
 SLACK_WEBHOOK_TPL = "https://hooks.slack.com/services/{}"
 DISCORD_WEBHOOK_TPL = "https://discord.com/api/webhooks/{}/slack"
@@ -41,11 +41,8 @@ def slack_message(log_level, message, is_public):
         token = _slack_public_token
 
     if is_enabled(token):
-        data = { "attachments": [{ "color": get_color_level(log_level), "text": message, "title": log_level }], "username": _username, "channel": _slack_channel, "icon_emoji": _slack_emoji }
-        try:
-            requests.post(SLACK_WEBHOOK_TPL.format(token), json=data, timeout=HTTP_REQUEST_TIMEOUT)
-        except Exception as e:
-            logging.warning("[slack_message] unexpected exception: {}".format(e))
+        data = { "username": _username, "channel": _slack_channel, "icon_emoji": _slack_emoji }
+        notifications_queue.submit('slack', SLACK_WEBHOOK_TPL.format(token), data, { "color": get_color_level(log_level), "text": message, "title": log_level })
 
 def discord_message(log_level, message, is_public):
     token = _discord_token
@@ -55,11 +52,8 @@ def discord_message(log_level, message, is_public):
         token = _discord_public_token
 
     if is_enabled(token):
-        data = { "attachments": [{ "color": get_color_level(log_level), "text": message, "title": log_level }], "username": _username }
-        try:
-            requests.post(DISCORD_WEBHOOK_TPL.format(token), json=data, timeout=HTTP_REQUEST_TIMEOUT)
-        except Exception as e:
-            logging.warning("[discord_message] unexpected exception: {}".format(e))
+        data = { "username": _username }
+        notifications_queue.submit('discord', DISCORD_WEBHOOK_TPL.format(token), data, { "color": get_color_level(log_level), "text": message, "title": log_level })
 
 def is_level_partof(level, levels):
     return any(log == "{}".format(level).lower() for log in levels)
@@ -83,6 +77,7 @@ def get_color_level(level):
     else:
         return "#95C8F3"
 
+@lru_cache(maxsize = 32)
 def get_int_value_level(level):
     if is_debug(level):
         return 0
@@ -93,6 +88,8 @@ def get_int_value_level(level):
     else:
         return 1
 
+_logging_levels = [logging.DEBUG, logging.INFO, logging.WARNING, logging.ERROR]
+
 if is_debug(LOG_LEVEL):
     logging.basicConfig(stream = sys.stdout, level = "DEBUG")
 elif is_warn(LOG_LEVEL):
@@ -102,12 +99,25 @@ elif is_error(LOG_LEVEL):
 else:
     logging.basicConfig(stream = sys.stdout, level = "INFO")
 
+_log_level_value = get_int_value_level(LOG_LEVEL)
+_json_format = is_enabled(LOG_FORMAT) and LOG_FORMAT == "json"
+
+def is_level_enabled(log_level):
+    return get_int_value_level(log_level) >= _log_level_value
+
 def quiet_log_msg (log_level, message):
+    #? the suppressed levels exit before any formatting, message can be a callable evaluated only when it's logged
+    if not is_level_enabled(log_level):
+        return None
+
+    if callable(message):
+        message = message()
+
     vdate = datetime.now().isoformat()
     cid = get_current_cid()
 
     formatted_log = "[{}][{}][{}] {}".format(log_level, vdate, cid, message)
-    if is_enabled(LOG_FORMAT) and LOG_FORMAT == "json":
+    if _json_format:
         if isinstance(message, dict):
             message['level'] = log_level
             message['time'] = vdate
@@ -116,14 +126,7 @@ def quiet_log_msg (log_level, message):
         else:
             formatted_log = json.dumps({"body": message, "level": log_level, "time": vdate, "cid": cid })
 
-    if is_debug(log_level):
-        logging.debug(formatted_log)
-    elif is_warn(log_level):
-        logging.warning(formatted_log)
-    elif is_error(log_level):
-        logging.error(formatted_log)
-    else:
-        logging.info(formatted_log)
+    logging.log(_logging_levels[get_int_value_level(log_level)], formatted_log)
 
     return formatted_log
 
@@ -131,9 +134,11 @@ def is_notif_enabled():
     notifs_providers = ['SLACK', 'DISCORD']
     return any(get_env_bool("{}_TRIGGER".format(n)) for n in notifs_providers)
 
+_notif_enabled = is_notif_enabled()
+
 def log_msg(log_level, message, is_public = False):
     formated_log = quiet_log_msg (log_level, message)
 
-    if get_int_value_level(log_level) >= get_int_value_level(LOG_LEVEL) and is_notif_enabled():
+    if formated_log is not None and _notif_enabled:
         slack_message(log_level, formated_log, is_public)
         discord_message(log_level, formated_log, is_public)
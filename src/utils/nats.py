@@ -10,17 +10,23 @@ from utils.logger import log_msg
 _nats_url = os.getenv("NATS_URL", "nats://changeit.com:4222")
 _creds_file = "{}/faas.creds".format(get_src_path())
 _creds_base64 = os.getenv("NATS_CREDS_BASE64")
+_creds_written = False
 
 def get_nats_url():
     log_msg("DEBUG", "[NatsUtils][get_nats_url] connecting nats_url = {}".format(_nats_url))
     return _nats_url
 
 def get_creds_file_if_exists():
+    global _creds_written
     if is_enabled(_creds_base64):
+        if _creds_written and os.path.exists(_creds_file):
+            return _creds_file
+
         quiet_remove(_creds_file)
         creds_content = base64.b64decode(_creds_base64).decode()
         with open(_creds_file, "w") as creds_file:
             creds_file.write(creds_content)
+            _creds_written = True
             return _creds_file
     return None
 
@@ -30,9 +36,8 @@ async def close_nats(nc):
 
 async def reply(msg, payload):
     log_msg("DEBUG", "[NatsUtils][reply] replying to {}".format(msg))
+    #? the acknowledgement is done by the consumer pool once the handler is done
     try:
         await msg.respond(json.dumps(payload).encode('UTF-8'))
     except nats.errors.Error as e:
         log_msg("DEBUG", "[NatsUtils][reply] cannot reply: e.type = {}, e.msg = {}".format(type(e), e))
-    finally:
-        await msg.ack()
@@ -0,0 +1,102 @@
+import time
+import queue
+import atexit
+import logging
+import requests
+import threading
+
+from collections import deque
+from prometheus_client import Counter
+
+from utils.common import get_env_float, get_env_int
+from utils.http import HTTP_REQUEST_TIMEOUT
+
+NOTIF_QUEUE_SIZE = get_env_int('NOTIF_QUEUE_SIZE', 1000)
+NOTIF_FLUSH_INTERVAL = get_env_float('NOTIF_FLUSH_INTERVAL', 1)
+NOTIF_BATCH_SIZE = get_env_int('NOTIF_BATCH_SIZE', 10)
+
+#? slack accepts one message per second and per webhook, discord 30 per minute
+NOTIF_RATE_LIMITS = {
+    'slack': get_env_float('SLACK_RATE_LIMIT_INTERVAL', 1),
+    'discord': get_env_float('DISCORD_RATE_LIMIT_INTERVAL', 2)
+}
+
+notifications_dropped = Counter('log_notifications_dropped', "Log notifications dropped before being sent", ['provider'])
+
+class NotificationsQueue():
+    def __init__(self, size = NOTIF_QUEUE_SIZE, interval = NOTIF_FLUSH_INTERVAL, batch_size = NOTIF_BATCH_SIZE, rate_limits = NOTIF_RATE_LIMITS):
+        self._size = size
+        self._interval = interval
+        self._batch_size = batch_size
+        self._rate_limits = rate_limits
+        self._queue = queue.Queue(maxsize = size)
+        self._webhooks = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+
+            self._thread = threading.Thread(target = self.run, name = "notifier", daemon = True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def submit(self, provider, url, data, attachment):
+        self.start()
+        try:
+            self._queue.put_nowait((provider, url, data, attachment))
+            return True
+        except queue.Full:
+            notifications_dropped.labels(provider).inc()
+            return False
+
+    def drain(self):
+        while True:
+            try:
+                provider, url, data, attachment = self._queue.get_nowait()
+            except queue.Empty:
+                return
+
+            webhook = self._webhooks.setdefault(url, {'provider': provider, 'data': data, 'pending': deque(), 'next_at': 0})
+            if len(webhook['pending']) >= self._size:
+                webhook['pending'].popleft()
+                notifications_dropped.labels(provider).inc()
+            webhook['pending'].append(attachment)
+
+    def send(self, url, webhook, now):
+        #? all the pending messages of a webhook are coalesced into a single call
+        batch = [webhook['pending'].popleft() for _ in range(0, min(self._batch_size, len(webhook['pending'])))]
+        webhook['next_at'] = now + self._rate_limits.get(webhook['provider'], 1)
+        try:
+            response = requests.post(url, json = {**webhook['data'], 'attachments': batch}, timeout = HTTP_REQUEST_TIMEOUT)
+            if response.status_code == 429:
+                retry_after = response.headers.get('Retry-After')
+                webhook['next_at'] = now + (float(retry_after) if retry_after else self._rate_limits.get(webhook['provider'], 1))
+                webhook['pending'].extendleft(reversed(batch))
+        except Exception as e:
+            notifications_dropped.labels(webhook['provider']).inc(len(batch))
+            logging.warning("[NotificationsQueue][send] unexpected exception: provider = {}, e.type = {}, e.msg = {}".format(webhook['provider'], type(e), e))
+
+    def flush(self, now):
+        with self._flush_lock:
+            self.drain()
+            for url, webhook in self._webhooks.items():
+                if webhook['pending'] and webhook['next_at'] <= now:
+                    self.send(url, webhook, now)
+
+    def run(self):
+        while not self._stopped.wait(self._interval):
+            self.flush(time.monotonic())
+
+    def close(self):
+        self._stopped.set()
+        try:
+            self.flush(time.monotonic())
+        except Exception as e:
+            logging.warning("[NotificationsQueue][close] unexpected exception: {}".format(e))
+
+notifications_queue = NotificationsQueue()
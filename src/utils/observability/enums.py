@@ -52,6 +52,8 @@ Action = Enum('Action', [
     'LOGS',
     'POD',
     'ASYNCWORKER',
+    'BULK',
+    'AGGREGATE',
     'UNKNOWN'
 ])
 
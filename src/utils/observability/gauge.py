@@ -1,27 +1,54 @@
 import re
+import time
+import threading
 
-from prometheus_client import Gauge
+from collections import Counter, OrderedDict
+from prometheus_client import REGISTRY, Gauge, Counter as PromCounter
 from opentelemetry.metrics import Observation
 
 from utils.common import is_not_empty, sanitize_metric_name
 from utils.observability.otel import get_otel_meter
 
-_numeric_value_pattern = r"-?\d+\.?\d*"
-_current_gauge_values = {}
-_current_gauge_labels = {}
+_numeric_value_pattern = re.compile(r"-?\d+\.?\d*")
+_otel_gauges = set()
+
+#? metric name => { label items tuple => value }, written without lock: a dict item assignment is atomic
+_gauge_series = {}
+
+gauge_series_rejected = PromCounter('gauge_series_rejected', "Gauge series rejected by a bounded registry", ['registry', 'reason'])
+
+def get_gauge_series(name):
+    return _gauge_series.setdefault(name, {})
+
+def get_series_key(labels):
+    #? same series whatever the labels order and types, as prometheus stringifies the label values
+    return tuple(sorted((k, str(v)) for k, v in labels.items())) if is_not_empty(labels) and isinstance(labels, dict) else ()
+
+def observe_gauge_series(name):
+    for key, value in list(get_gauge_series(name).items()):
+        yield Observation(value, dict(key))
+
+def remove_gauge_series(name, labels = None):
+    if labels is None:
+        get_gauge_series(name).clear()
+    else:
+        get_gauge_series(name).pop(get_series_key(labels), None)
 
 def create_gauge(name, description, labels = []):
     name = sanitize_metric_name(name)
-    _current_gauge_values[name] = 0.0
+    get_gauge_series(name)
 
     def observable_gauge_func(_):
-        yield Observation(_current_gauge_values[name], _current_gauge_labels[name])
+        return observe_gauge_series(name)
 
-    get_otel_meter().create_observable_gauge(
-        name = name,
-        description = description,
-        callbacks=[observable_gauge_func]
-    )
+    #? a gauge removed from the prometheus registry can be created again, the otel instrument can't
+    if name not in _otel_gauges:
+        _otel_gauges.add(name)
+        get_otel_meter().create_observable_gauge(
+            name = name,
+            description = description,
+            callbacks=[observable_gauge_func]
+        )
 
     return Gauge(
         name,
@@ -32,15 +59,101 @@ def create_gauge(name, description, labels = []):
         description
     )
 
+def get_numeric_value(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+
+    match = _numeric_value_pattern.search("{}".format(value))
+    return float(match.group()) if match else None
+
 def set_gauge(gauge, value, labels = {}):
-    match = re.search(_numeric_value_pattern, "{}".format(value))
+    val = get_numeric_value(value)
 
-    if match:
-        val = float(match.group())
-        if is_not_empty(labels) and isinstance(labels, dict):
+    if val is not None:
+        key = get_series_key(labels)
+        if key:
             gauge.labels(**labels).set(val)
-            _current_gauge_labels[gauge._name] = labels
         else:
             gauge.set(val)
-            _current_gauge_labels[gauge._name] = {}
-        _current_gauge_values[gauge._name] = val
+        get_gauge_series(gauge._name)[key] = val
+
+class BoundedGaugesRegistry():
+    def __init__(self, name, max_series, max_series_per_owner, ttl):
+        self._name = name
+        self._max_series = max_series
+        self._max_series_per_owner = max_series_per_owner
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        self._families = {}
+        self._series = OrderedDict()
+        self._owners = Counter()
+
+    def _reject(self, reason):
+        gauge_series_rejected.labels(self._name, reason).inc()
+        return False
+
+    def _remove_series(self, key):
+        name, label_values = key
+        series = self._series.pop(key)
+        self._owners[series['owner']] -= 1
+        if self._owners[series['owner']] <= 0:
+            del self._owners[series['owner']]
+
+        family = self._families[name]
+        family['gauge'].remove(*label_values)
+        family['series'].discard(label_values)
+        remove_gauge_series(name, series['labels'])
+        if not family['series']:
+            REGISTRY.unregister(family['gauge'])
+            del self._families[name]
+
+    def expire(self, now = None):
+        #? the series are ordered by last update, the stale ones are at the beginning
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            while self._series:
+                key, series = next(iter(self._series.items()))
+                if now - series['seen_at'] <= self._ttl:
+                    break
+                self._remove_series(key)
+
+    def set(self, owner, name, description, labels, value, now = None):
+        now = time.monotonic() if now is None else now
+        name = sanitize_metric_name(name)
+        with self._lock:
+            family = self._families.get(name)
+            label_names = family['labels'] if family is not None else list(labels.keys())
+            key = (name, tuple("{}".format(labels[label]) for label in label_names))
+            series = self._series.get(key)
+            if series is None:
+                if len(self._series) >= self._max_series:
+                    return self._reject('limit')
+
+                if self._owners[owner] >= self._max_series_per_owner:
+                    return self._reject('quota')
+
+                if family is None:
+                    family = {'gauge': create_gauge(name, description, label_names), 'labels': label_names, 'series': set()}
+                    self._families[name] = family
+
+                series_labels = dict(zip(label_names, key[1]))
+                series = {'owner': owner, 'seen_at': now, 'child': family['gauge'].labels(*key[1]), 'labels': series_labels, 'key': get_series_key(series_labels)}
+                self._series[key] = series
+                self._owners[owner] += 1
+                family['series'].add(key[1])
+            else:
+                series['seen_at'] = now
+                self._series.move_to_end(key)
+
+        #? the labelled child is kept with the series instead of being resolved again on each sample
+        val = get_numeric_value(value)
+        if val is not None:
+            series['child'].set(val)
+            get_gauge_series(name)[series['key']] = val
+        return True
+
+    def count(self, owner = None):
+        return len(self._series) if owner is None else self._owners.get(owner, 0)
+
+    def __len__(self):
+        return len(self._series)
@@ -0,0 +1,134 @@
+import os
+import json
+import threading
+
+from database.redis_db import async_redis_client, redis_client
+from utils.cache import LruCache
+from utils.common import get_env_int, is_disabled
+from utils.logger import log_msg
+
+GEOIP_DATABASE_PATH = os.getenv('GEOIP_DATABASE_PATH')
+GEOIP_CACHE_TTL = get_env_int('GEOIP_CACHE_TTL', 86400)
+GEOIP_CACHE_ERROR_TTL = get_env_int('GEOIP_CACHE_ERROR_TTL', 60)
+GEOIP_CACHE_SIZE = get_env_int('GEOIP_CACHE_SIZE', 10000)
+GEOIP_REDIS_PREFIX = os.getenv('GEOIP_REDIS_PREFIX', 'cwcloud:geoip:')
+
+DEFAULT_VALUE = "unknown"
+
+def get_geoip_ttl(infos):
+    #? the failed lookups are kept for a short time only so a rate limited provider isn't hammered
+    return GEOIP_CACHE_TTL if infos.get('status') == "ok" else GEOIP_CACHE_ERROR_TTL
+
+class GeoIpCache(LruCache):
+    def __init__(self, size = GEOIP_CACHE_SIZE):
+        super().__init__(size)
+
+geoip_cache = GeoIpCache()
+
+_database = None
+_database_lock = threading.Lock()
+
+def get_geoip_database():
+    global _database
+    if is_disabled(GEOIP_DATABASE_PATH):
+        return None
+
+    with _database_lock:
+        if _database is None:
+            try:
+                import maxminddb
+                _database = maxminddb.open_database(GEOIP_DATABASE_PATH)
+            except Exception as e:
+                log_msg("WARN", "[get_geoip_database] unable to open {}: e.type = {}, e.msg = {}".format(GEOIP_DATABASE_PATH, type(e), e))
+                _database = False
+
+    return _database or None
+
+def get_name(record, key):
+    return record.get(key, {}).get('names', {}).get('en', DEFAULT_VALUE)
+
+def parse_geoip_record(ip, record):
+    subdivisions = record.get('subdivisions') or [{}]
+    country = record.get('country', {})
+    location = record.get('location', {})
+    return {
+        "status": "ok",
+        "source": "database",
+        "ip": ip,
+        "city": get_name(record, 'city'),
+        "region": subdivisions[0].get('names', {}).get('en', DEFAULT_VALUE),
+        "region_code": subdivisions[0].get('iso_code', DEFAULT_VALUE),
+        "country": get_name(record, 'country'),
+        "country_iso": country.get('iso_code', DEFAULT_VALUE),
+        "lookup": country.get('iso_code', DEFAULT_VALUE),
+        "timezone": location.get('time_zone', DEFAULT_VALUE),
+        "loc": "{},{}".format(location['latitude'], location['longitude']) if 'latitude' in location and 'longitude' in location else DEFAULT_VALUE
+    }
+
+def lookup_geoip_database(ip):
+    database = get_geoip_database()
+    if database is None:
+        return None
+
+    try:
+        record = database.get(ip)
+        return parse_geoip_record(ip, record) if record else None
+    except Exception as e:
+        log_msg("WARN", "[lookup_geoip_database] unexpected error: ip = {}, e.type = {}, e.msg = {}".format(ip, type(e), e))
+        return None
+
+def get_cached_infos(ip):
+    infos = geoip_cache.get(ip)
+    if infos is not None:
+        return infos
+
+    try:
+        cached = redis_client.get("{}{}".format(GEOIP_REDIS_PREFIX, ip))
+    except Exception as e:
+        log_msg("WARN", "[get_cached_infos] redis error: ip = {}, e.type = {}, e.msg = {}".format(ip, type(e), e))
+        return None
+
+    return cache_locally(ip, cached)
+
+async def aget_cached_infos(ip):
+    infos = geoip_cache.get(ip)
+    if infos is not None:
+        return infos
+
+    try:
+        cached = await async_redis_client.get("{}{}".format(GEOIP_REDIS_PREFIX, ip))
+    except Exception as e:
+        log_msg("WARN", "[aget_cached_infos] redis error: ip = {}, e.type = {}, e.msg = {}".format(ip, type(e), e))
+        return None
+
+    return cache_locally(ip, cached)
+
+def cache_locally(ip, cached):
+    if cached is None:
+        return None
+
+    infos = json.loads(cached)
+    geoip_cache.put(ip, infos, get_geoip_ttl(infos))
+    return infos
+
+def cache_infos(ip, infos):
+    ttl = get_geoip_ttl(infos)
+    if ttl <= 0:
+        return
+
+    geoip_cache.put(ip, infos, ttl)
+    try:
+        redis_client.set("{}{}".format(GEOIP_REDIS_PREFIX, ip), json.dumps(infos), ex = ttl)
+    except Exception as e:
+        log_msg("WARN", "[cache_infos] redis error: ip = {}, e.type = {}, e.msg = {}".format(ip, type(e), e))
+
+async def acache_infos(ip, infos):
+    ttl = get_geoip_ttl(infos)
+    if ttl <= 0:
+        return
+
+    geoip_cache.put(ip, infos, ttl)
+    try:
+        await async_redis_client.set("{}{}".format(GEOIP_REDIS_PREFIX, ip), json.dumps(infos), ex = ttl)
+    except Exception as e:
+        log_msg("WARN", "[acache_infos] redis error: ip = {}, e.type = {}, e.msg = {}".format(ip, type(e), e))
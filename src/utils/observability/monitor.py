@@ -2,44 +2,39 @@ import os
 import re
 import asyncio
 import socket
-import threading
 import time
-import requests
+import httpx
 
 from datetime import datetime
-from time import sleep
-
-from requests.auth import HTTPBasicAuth
 
 from utils.common import del_key_if_exists, get_env_int, get_or_else, is_empty_key, is_not_empty, is_not_empty_key, is_true, sanitize_header_name, sanitize_metric_name
 from utils.faas.iot import send_payload_in_realtime
-from utils.http import HTTP_REQUEST_TIMEOUT
 from utils.logger import LOG_LEVEL, get_int_value_level, log_msg
-from utils.observability.enums import Method
-from utils.observability.gauge import create_gauge, set_gauge
-from utils.observability.otel import get_otel_tracer
-from utils.observability.traces import span_format
+from utils.observability.gauge import BoundedGaugesRegistry, create_gauge, set_gauge
 from utils.env_vars import APP_ENV, APP_VERSION, DOMAIN
 
 MONITOR_SRC = os.getenv("MONITOR_SRC", "cwcloud-api")
 MONITOR_WAIT_TIME = get_env_int("MONITOR_WAIT_TIME", 300)
 _supported_monitor_types = ["http", "tcp"]
 
-imalive_gauges = {}
+IMALIVE_MAX_SERIES = get_env_int('IMALIVE_MAX_SERIES', 100000)
+IMALIVE_MAX_SERIES_PER_USER = get_env_int('IMALIVE_MAX_SERIES_PER_USER', 1000)
+IMALIVE_SERIES_TTL = get_env_int('IMALIVE_SERIES_TTL', 3600)
+
+imalive_gauges = BoundedGaugesRegistry("imalive", IMALIVE_MAX_SERIES, IMALIVE_MAX_SERIES_PER_USER, IMALIVE_SERIES_TTL)
 
-def convert_imalive_metric_to_gauge(name, node, payload, key, labels):
+def convert_imalive_metric_to_gauge(name, node, payload, key, labels, user_id):
     if is_not_empty_key(payload, key):
         disk = payload[key]
         for k in ['total', 'used', 'free', 'percent']:
             metric_name = sanitize_metric_name(f"imalive_{name}_{k}")
             metric_name_label = sanitize_metric_name(f"imalive_{name}_{node}_{k}")
-            if metric_name not in imalive_gauges:
-                imalive_gauges[metric_name] = create_gauge(metric_name, f"imalive {name} {k}", list([*labels.keys(), 'name', 'kind']))
-            set_gauge(imalive_gauges[metric_name], disk.get(k, 0), {**labels, 'name': metric_name_label, 'kind': name})
+            imalive_gauges.set(user_id, metric_name, f"imalive {name} {k}", {**labels, 'name': metric_name_label, 'kind': name}, disk.get(k, 0))
 
 def ingest_imalive_payload(payload, user_id):
     node_name = get_or_else(payload, 'name', '')
     pmonitor = get_or_else(payload, 'monitor', {})
+    imalive_gauges.expire()
 
     if is_not_empty_key(payload, 'monitor'):
         gauge_key = sanitize_metric_name(get_or_else(pmonitor, 'name', f"monitor_{node_name}"))
@@ -55,15 +50,10 @@ def ingest_imalive_payload(payload, user_id):
             'user': str(user_id)
         }
 
-        if gauge_key not in imalive_gauges:
-            imalive_gauges[gauge_key] = {
-                'result': create_gauge(sanitize_metric_name(f"imalive_{gauge_key}_result"), f"imalive {gauge_key} result", list([*base_monitor_labels.keys(), 'kind'])),
-                'duration': create_gauge(sanitize_metric_name(f"imalive_{gauge_key}_duration"), f"imalive {gauge_key} duration", list([*base_monitor_labels.keys(), 'kind']))
-            }
         value = 1 if get_or_else(payload, 'status', 'ko') == 'ok' else 0
         duration = get_or_else(payload, 'duration', 0)
-        set_gauge(imalive_gauges[gauge_key]['result'], value, {**base_monitor_labels, 'kind': 'result'})
-        set_gauge(imalive_gauges[gauge_key]['duration'], duration, {**base_monitor_labels, 'kind': 'duration'})
+        imalive_gauges.set(user_id, f"imalive_{gauge_key}_result", f"imalive {gauge_key} result", {**base_monitor_labels, 'kind': 'result'}, value)
+        imalive_gauges.set(user_id, f"imalive_{gauge_key}_duration", f"imalive {gauge_key} duration", {**base_monitor_labels, 'kind': 'duration'}, duration)
 
     base_metric_labels = {
         'env': APP_ENV,
@@ -71,18 +61,15 @@ def ingest_imalive_payload(payload, user_id):
         'version': APP_VERSION,
         'user': str(user_id)
     }
-    convert_imalive_metric_to_gauge('disk', node_name, payload, 'disk_usage', base_metric_labels)
-    convert_imalive_metric_to_gauge('ram', node_name, payload, 'virtual_memory', base_metric_labels)
-    convert_imalive_metric_to_gauge('swap', node_name, payload, 'swap_memory', base_metric_labels)
+    convert_imalive_metric_to_gauge('disk', node_name, payload, 'disk_usage', base_metric_labels, user_id)
+    convert_imalive_metric_to_gauge('ram', node_name, payload, 'virtual_memory', base_metric_labels, user_id)
+    convert_imalive_metric_to_gauge('swap', node_name, payload, 'swap_memory', base_metric_labels, user_id)
 
     if is_not_empty_key(payload, 'cpu'):
         cpu = payload['cpu']
         if is_not_empty_key(cpu, 'percent') and is_not_empty_key(cpu['percent'], 'all'):
-            metric_name = "imalive_cpu_all"
             metric_name_label = sanitize_metric_name(f"imalive_cpu_all_{node_name}")
-            if metric_name not in imalive_gauges:
-                imalive_gauges[metric_name] = create_gauge(metric_name, "imalive cpu percent all", list([*base_metric_labels.keys(), 'name', 'kind']))
-            set_gauge(imalive_gauges[metric_name], cpu['percent']['all'], {**base_metric_labels, 'name': metric_name_label, 'kind': 'cpu'})
+            imalive_gauges.set(user_id, "imalive_cpu_all", "imalive cpu percent all", {**base_metric_labels, 'name': metric_name_label, 'kind': 'cpu'}, cpu['percent']['all'])
 
 def check_status_code_pattern(actual_code, pattern):
     regexp = "^{}$".format(pattern.replace('*', '[0-9]+'))
@@ -94,9 +81,6 @@ def match_tcp_url_format(url):
 def not_match_tcp_url_format(url):
     return not match_tcp_url_format(url)
 
-async def async_send_payload_in_realtime(callback, safe_payload):
-    await send_payload_in_realtime(callback, safe_payload)
-
 def get_level_monitor(monitor):
     level = get_or_else(monitor, 'level', 'DEBUG')
     if level not in ['INFO', 'DEBUG']:
@@ -104,38 +88,25 @@ def get_level_monitor(monitor):
 
     return level
 
-def process_callbacks(monitor, payload):
+def get_callbacks_to_notify(monitor, payload):
     if is_empty_key(monitor, 'callbacks'):
-        return
+        return []
 
     if get_int_value_level(get_level_monitor(monitor)) < get_int_value_level(LOG_LEVEL) and is_true(payload['status']):
-        return
+        return []
 
-    try:
-        for callback in monitor["callbacks"]:
-            if is_empty_key(callback, "endpoint"):
-                continue
-
-            if callback["type"] == "http":
-                callback_headers = ({
-                    "Authorization": callback["token"],
-                    "Content-Type": "application/json",
-                } if is_not_empty_key(callback, "token") else {
-                    "Content-Type": "application/json"
-                })
-
-                try:
-                    requests.post(callback["endpoint"], json=payload, headers=callback_headers, timeout=HTTP_REQUEST_TIMEOUT)
-                    log_msg("DEBUG", f"[monitor][process_callbacks] monitor result sent to: {callback['endpoint']}")
-                except Exception as e:
-                    log_msg("ERROR", f"Failed to send HTTP callback: e.type = {type(e)}, e.msg = {str(e)}")
-            elif callback["type"] in ["websocket", "mqtt"]:
-                try:
-                    asyncio.run(async_send_payload_in_realtime(callback, payload))
-                except Exception as e:
-                    log_msg("ERROR", f"Failed to send {callback['type']} callback: e.type = {type(e)}, e.msg = {str(e)}")
-    except Exception as e:
-        log_msg("ERROR", f"Error processing callbacks: e.type = {type(e)}, e.msg = {str(e)}")
+    return [callback for callback in monitor['callbacks'] if is_not_empty_key(callback, 'endpoint')]
+
+def get_http_callback_headers(callback):
+    return {
+        "Authorization": callback["token"],
+        "Content-Type": "application/json",
+    } if is_not_empty_key(callback, "token") else {
+        "Content-Type": "application/json"
+    }
+
+def send_realtime_callback(callback, payload):
+    send_payload_in_realtime(callback, payload)
 
 def init_vars_monitor(monitor):
     vdate = datetime.now()
@@ -160,7 +131,7 @@ def init_vars_monitor(monitor):
 
     return vdate, labels, pmonitor, level, timeout
 
-def check_tcp_monitor(monitor, gauges):
+async def check_tcp_monitor(monitor, gauges):
     vdate, labels, pmonitor, level, timeout = init_vars_monitor(monitor)
     callback_payload = {}
     duration = 0
@@ -184,23 +155,23 @@ def check_tcp_monitor(monitor, gauges):
     start_time = time.time()
 
     try:
-        with socket.create_connection((host, port), timeout=timeout):
-            duration = time.time() - start_time
-            callback_payload = {
-                "status": "ok",
-                "type": "monitor",
-                "time": vdate.isoformat(),
-                "duration": duration,
-                "message": "Monitor is healthy",
-                "monitor": pmonitor
-            }
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout=timeout)
+        writer.close()
+        duration = time.time() - start_time
+        callback_payload = {
+            "status": "ok",
+            "type": "monitor",
+            "time": vdate.isoformat(),
+            "duration": duration,
+            "message": "Monitor is healthy",
+            "monitor": pmonitor
+        }
 
-            log_msg(level, callback_payload)
-            set_gauge(gauges['result'], 1, {**labels, 'kind': 'result', 'user': monitor['user_id']})
-            set_gauge(gauges['duration'], duration, {**labels, 'kind': 'duration', 'user': monitor['user_id']})
-            return duration, callback_payload
-            
-    except (socket.timeout, ConnectionRefusedError, socket.error) as e:
+        log_msg(level, callback_payload)
+        set_gauge(gauges['result'], 1, {**labels, 'kind': 'result', 'user': monitor['user_id']})
+        set_gauge(gauges['duration'], duration, {**labels, 'kind': 'duration', 'user': monitor['user_id']})
+        return duration, callback_payload
+    except (asyncio.TimeoutError, socket.timeout, ConnectionRefusedError, socket.error) as e:
         duration = time.time() - start_time
         callback_payload = {
             "status": "ko",
@@ -215,7 +186,23 @@ def check_tcp_monitor(monitor, gauges):
         set_gauge(gauges['duration'], duration, {**labels, 'kind': 'duration', 'user': monitor['user_id']})
         return duration, callback_payload
 
-def check_http_monitor(monitor, gauges):
+class MonitorHttpClients():
+    #? the tls verification is a client setting with httpx, hence one pool per mode
+    def __init__(self, max_connections):
+        limits = httpx.Limits(max_connections = max_connections, max_keepalive_connections = max_connections)
+        self._clients = {
+            True: httpx.AsyncClient(limits = limits, follow_redirects = True),
+            False: httpx.AsyncClient(limits = limits, follow_redirects = True, verify = False)
+        }
+
+    def get(self, check_tls):
+        return self._clients[is_true(check_tls)]
+
+    async def aclose(self):
+        for client in self._clients.values():
+            await client.aclose()
+
+async def check_http_monitor(monitor, gauges, http_clients):
     vdate, labels, pmonitor, level, timeout = init_vars_monitor(monitor)
     callback_payload = {}
     method = get_or_else(monitor, 'method', 'GET')
@@ -227,7 +214,7 @@ def check_http_monitor(monitor, gauges):
     check_tls = is_true(get_or_else(monitor, 'check_tls', True))
 
     if is_not_empty_key(monitor, 'username') and is_not_empty_key(monitor, 'password'): 
-        auth = HTTPBasicAuth(monitor['username'], monitor['password'])
+        auth = httpx.BasicAuth(monitor['username'], monitor['password'])
 
     if is_not_empty_key(monitor, 'headers'):
         for header in monitor['headers']:
@@ -235,14 +222,12 @@ def check_http_monitor(monitor, gauges):
                 headers[sanitize_header_name(header['name'])] = header['value']
 
     try:
+        client = http_clients.get(check_tls)
         if method == "GET":
-            response = requests.get(monitor['url'], auth=auth, headers=headers, timeout=timeout, verify=check_tls)
-            duration = response.elapsed.total_seconds() * 1000
-        elif method == "POST":
-            response = requests.post(monitor['url'], auth=auth, headers=headers, data=monitor.get('body'), timeout=timeout, verify=check_tls)
+            response = await client.get(monitor['url'], auth=auth, headers=headers, timeout=timeout)
             duration = response.elapsed.total_seconds() * 1000
-        elif method == "PUT":
-            response = requests.put(monitor['url'], auth=auth, headers=headers, data=monitor.get('body'), timeout=timeout, verify=check_tls)
+        elif method in ["POST", "PUT"]:
+            response = await client.request(method, monitor['url'], auth=auth, headers=headers, content=monitor.get('body'), timeout=timeout)
             duration = response.elapsed.total_seconds() * 1000
         else:
             callback_payload = {
@@ -322,7 +307,7 @@ def check_http_monitor(monitor, gauges):
         log_msg("ERROR", callback_payload)
         return 0, callback_payload
 
-def check_monitor(monitor, gauges):
+async def check_monitor(monitor, gauges, http_clients):
     callback_payload = {}
     vdate, labels, pmonitor, _, _ = init_vars_monitor(monitor)
     response_time = 0
@@ -354,91 +339,42 @@ def check_monitor(monitor, gauges):
         return response_time, callback_payload
     
     if monitor['type'] == 'http':
-        response_time, callback_payload = check_http_monitor(monitor, gauges)
+        response_time, callback_payload = await check_http_monitor(monitor, gauges, http_clients)
     elif monitor['type'] == 'tcp':
-        response_time, callback_payload = check_tcp_monitor(monitor, gauges)
+        response_time, callback_payload = await check_tcp_monitor(monitor, gauges)
 
     return response_time, callback_payload
 
 gauges = {}
 
-def check_monitors():
-    try:
-        from database.postgres_db import SessionLocal
-        from entities.Monitor import Monitor
-
-        db = SessionLocal()
-        loaded_data = Monitor.getAllMonitors(db)
+def get_monitor_gauges(name):
+    if name not in gauges:
         labels = ['name', 'family', 'kind', 'env', 'source', 'url', 'version', 'user']
-
-        for monitor in loaded_data:
-            if monitor.name not in gauges:
-                gauges[monitor.name] = {
-                    'result': create_gauge(f"monitor_{monitor.name}_result", f"monitor {monitor.name} result", labels),
-                    'duration': create_gauge(f"monitor_{monitor.name}_duration", f"monitor {monitor.name} duration", labels)
-                }
-
-            monitor_dict = {
-                "name": monitor.name,
-                "family": monitor.family,
-                "type": monitor.type,
-                "url": monitor.url,
-                "method": monitor.method,
-                "timeout": monitor.timeout,
-                "expected_http_code": monitor.expected_http_code,
-                "body": monitor.body,
-                "expected_contain": monitor.expected_contain,
-                "username": monitor.username,
-                "password": monitor.password,
-                "user_id": monitor.user_id,
-                "callbacks": monitor.callbacks if monitor.callbacks else [],
-                "check_tls": monitor.check_tls,
-                "level": monitor.level,
-                "headers": [{"name": h["name"], "value": h["value"]} for h in monitor.headers] if monitor.headers else [],
-            }
-
-            try:
-                response_time, callback_payload = check_monitor(monitor_dict, gauges[monitor.name])
-                Monitor.updateMonitorStatus(monitor.id, 'success' if is_true(callback_payload['status']) else 'failure', f"{response_time} ms", db)
-                process_callbacks(monitor_dict, callback_payload)
-            except Exception as me:
-                log_msg("ERROR", f"Error processing monitor {monitor.name}: e.type = {type(me)}, e.msg = {str(me)}")
-
-    except Exception as e:
-        details = {
-            "type": type(e).__name__,
-            "file": __file__,
-            "lno": e.__traceback__.tb_lineno,
+        gauges[name] = {
+            'result': create_gauge(f"monitor_{name}_result", f"monitor {name} result", labels),
+            'duration': create_gauge(f"monitor_{name}_duration", f"monitor {name} duration", labels)
         }
 
-        log_msg("ERROR", {
-            "status": "ko",
-            "i18n_code": "monitor_check_failed",
-            "type": "monitor",
-            "time": datetime.now().isoformat(),
-            "message": f"Error in monitor loop: e.type = {type(e)}, e.msg = {str(e)}",
-            "details": details,
-        })
-    finally:
-        if "db" in locals():
-            db.close()
-
-def monitors():
-    def loop_monitors():
-        while True:
-            try:
-                with get_otel_tracer().start_as_current_span(span_format("monitors", Method.ASYNCWORKER)):
-                    check_monitors()
-            except Exception as e:
-                log_msg("ERROR", f"Error in monitor loop: e.type = {type(e)}, e.msg = {str(e)}")
-            finally:
-                sleep(MONITOR_WAIT_TIME)
-
-    def start_monitors():
-        sleep(MONITOR_WAIT_TIME)
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        loop.run_until_complete(loop_monitors())
-
-    async_thread = threading.Thread(target=start_monitors, daemon=True)
-    async_thread.start()
+    return gauges[name]
+
+def to_monitor_dict(monitor):
+    return {
+        "id": str(monitor.id),
+        "name": monitor.name,
+        "family": monitor.family,
+        "type": monitor.type,
+        "url": monitor.url,
+        "method": monitor.method,
+        "timeout": monitor.timeout,
+        "check_interval": monitor.check_interval,
+        "expected_http_code": monitor.expected_http_code,
+        "body": monitor.body,
+        "expected_contain": monitor.expected_contain,
+        "username": monitor.username,
+        "password": monitor.password,
+        "user_id": monitor.user_id,
+        "callbacks": monitor.callbacks if monitor.callbacks else [],
+        "check_tls": monitor.check_tls,
+        "level": monitor.level,
+        "headers": [{"name": h["name"], "value": h["value"]} for h in monitor.headers] if monitor.headers else [],
+    }
@@ -0,0 +1,79 @@
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.common import get_env_int
+from utils.http import HTTP_REQUEST_TIMEOUT
+from utils.logger import log_msg
+from utils.observability.monitor import get_http_callback_headers, send_realtime_callback
+
+MONITOR_CALLBACKS_QUEUE_SIZE = max(1, get_env_int('MONITOR_CALLBACKS_QUEUE_SIZE', 1000))
+MONITOR_CALLBACKS_WORKERS = max(1, get_env_int('MONITOR_CALLBACKS_WORKERS', 10))
+MONITOR_CALLBACKS_RETRIES = max(0, get_env_int('MONITOR_CALLBACKS_RETRIES', 3))
+MONITOR_CALLBACKS_RETRY_DELAY = get_env_int('MONITOR_CALLBACKS_RETRY_DELAY', 1)
+
+class CallbackDeliveryError(Exception):
+    pass
+
+class CallbacksQueue():
+    def __init__(self, http_clients, size = MONITOR_CALLBACKS_QUEUE_SIZE, workers = MONITOR_CALLBACKS_WORKERS, retries = MONITOR_CALLBACKS_RETRIES, retry_delay = MONITOR_CALLBACKS_RETRY_DELAY):
+        self._http_clients = http_clients
+        self._size = size
+        self._workers = workers
+        self._retries = retries
+        self._retry_delay = retry_delay
+        self._queue = None
+        self._tasks = []
+        self._executor = None
+
+    def start(self):
+        self._queue = asyncio.Queue(maxsize = self._size)
+        #? the mqtt and websocket clients are blocking, they're delivered from a dedicated pool
+        self._executor = ThreadPoolExecutor(max_workers = self._workers, thread_name_prefix = "monitors-callbacks")
+        self._tasks = [asyncio.create_task(self.worker()) for _ in range(0, self._workers)]
+
+    def submit(self, callback, payload):
+        try:
+            self._queue.put_nowait((callback, payload))
+            return True
+        except asyncio.QueueFull:
+            log_msg("WARN", "[CallbacksQueue][submit] the queue is full, callback dropped: type = {}, endpoint = {}".format(callback['type'], callback['endpoint']))
+            return False
+
+    async def deliver(self, callback, payload):
+        if callback['type'] == "http":
+            response = await self._http_clients.get(True).post(callback['endpoint'], json = payload, headers = get_http_callback_headers(callback), timeout = HTTP_REQUEST_TIMEOUT)
+            if response.status_code >= 500:
+                raise CallbackDeliveryError("unexpected status code = {}".format(response.status_code))
+        elif callback['type'] in ["websocket", "mqtt"]:
+            await asyncio.get_running_loop().run_in_executor(self._executor, send_realtime_callback, callback, payload)
+        else:
+            log_msg("WARN", "[CallbacksQueue][deliver] not supported callback type = {}".format(callback['type']))
+            return
+
+        log_msg("DEBUG", f"[CallbacksQueue][deliver] monitor result sent to: {callback['endpoint']}")
+
+    async def worker(self):
+        while True:
+            callback, payload = await self._queue.get()
+            try:
+                for attempt in range(0, self._retries + 1):
+                    try:
+                        await self.deliver(callback, payload)
+                        break
+                    except Exception as e:
+                        if attempt >= self._retries:
+                            log_msg("ERROR", f"Failed to send {callback['type']} callback: e.type = {type(e)}, e.msg = {str(e)}")
+                        else:
+                            await asyncio.sleep(self._retry_delay * 2 ** attempt)
+            finally:
+                self._queue.task_done()
+
+    async def join(self):
+        await self._queue.join()
+
+    async def aclose(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions = True)
+        self._executor.shutdown(wait = False)
@@ -0,0 +1,214 @@
+import os
+import time
+import uuid
+import atexit
+import random
+import socket
+import asyncio
+import hashlib
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from database.redis_db import redis_client
+from utils.common import get_env_bool, get_env_float, get_env_int, is_false, is_not_empty, is_true
+from utils.logger import log_msg
+from utils.observability.enums import Method
+from utils.observability.monitor import MONITOR_WAIT_TIME, MonitorHttpClients, check_monitor, get_callbacks_to_notify, get_monitor_gauges, to_monitor_dict
+from utils.observability.monitor_callbacks import CallbacksQueue
+from utils.observability.otel import get_otel_tracer
+from utils.observability.traces import span_format
+
+MONITORS_ENABLED = get_env_bool('MONITORS_ENABLED', True)
+MONITOR_CONCURRENCY = max(1, get_env_int('MONITOR_CONCURRENCY', 100))
+MONITOR_IO_THREADS = max(1, get_env_int('MONITOR_IO_THREADS', 4))
+MONITOR_JITTER_RATIO = get_env_float('MONITOR_JITTER_RATIO', 0.1)
+MONITOR_REFRESH_INTERVAL = get_env_int('MONITOR_REFRESH_INTERVAL', 30)
+MONITOR_HEARTBEAT_INTERVAL = get_env_int('MONITOR_HEARTBEAT_INTERVAL', 10)
+MONITOR_STATUS_FLUSH_INTERVAL = get_env_int('MONITOR_STATUS_FLUSH_INTERVAL', 5)
+MONITOR_MEMBERS_KEY = os.getenv('MONITOR_MEMBERS_KEY', 'cwcloud:monitors:members')
+MONITOR_TICK = 1
+
+def new_member_id():
+    return "{}:{}:{}".format(socket.gethostname(), os.getpid(), uuid.uuid4().hex[:8])
+
+def rendezvous_owner(key, members):
+    #? highest random weight hashing: only the monitors of a joining or leaving member are moved
+    if not members:
+        return None
+
+    return max(members, key = lambda member: hashlib.sha1("{}:{}".format(member, key).encode('UTF-8')).digest())
+
+class MonitorsMembership():
+    def __init__(self, member_id = None, key = MONITOR_MEMBERS_KEY, ttl = 3 * MONITOR_HEARTBEAT_INTERVAL):
+        self.member_id = member_id if is_not_empty(member_id) else new_member_id()
+        self._key = key
+        self._ttl = ttl
+
+    def heartbeat(self):
+        now = time.time()
+        pipe = redis_client.pipeline()
+        pipe.zadd(self._key, {self.member_id: now})
+        pipe.zremrangebyscore(self._key, '-inf', now - self._ttl)
+        pipe.zrange(self._key, 0, -1)
+        _, _, members = pipe.execute()
+        return sorted(members)
+
+    def leave(self):
+        try:
+            redis_client.zrem(self._key, self.member_id)
+        except Exception as e:
+            log_msg("WARN", "[MonitorsMembership][leave] unable to leave: member_id = {}, e.type = {}, e.msg = {}".format(self.member_id, type(e), e))
+
+def load_monitors():
+    from database.postgres_db import SessionLocal
+    from entities.Monitor import Monitor
+
+    with SessionLocal() as db:
+        return [to_monitor_dict(monitor) for monitor in Monitor.getAllMonitors(db)]
+
+def save_monitors_status(statuses):
+    from database.postgres_db import SessionLocal
+    from entities.Monitor import Monitor
+
+    with SessionLocal() as db:
+        Monitor.updateMonitorsStatus(statuses, db)
+
+class MonitorScheduler():
+    def __init__(self, membership, concurrency = MONITOR_CONCURRENCY, wait_time = MONITOR_WAIT_TIME, jitter_ratio = MONITOR_JITTER_RATIO):
+        self._membership = membership
+        self._concurrency = concurrency
+        self._wait_time = wait_time
+        self._jitter_ratio = jitter_ratio
+        self._members = []
+        self._monitors = {}
+        self._next_runs = {}
+        self._running = set()
+        self._tasks = set()
+        self._statuses = {}
+
+    def get_interval(self, monitor):
+        check_interval = monitor.get('check_interval')
+        return check_interval if is_not_empty(check_interval) and check_interval > 0 else self._wait_time
+
+    def schedule(self, monitor_id, now, first = False):
+        interval = self.get_interval(self._monitors[monitor_id])
+        if first:
+            #? the first probes are spread over the interval instead of all firing at startup
+            self._next_runs[monitor_id] = now + random.uniform(0, interval)
+        else:
+            self._next_runs[monitor_id] = now + interval + random.uniform(-self._jitter_ratio, self._jitter_ratio) * interval
+
+    def is_owned(self, monitor_id):
+        return rendezvous_owner(monitor_id, self._members) == self._membership.member_id
+
+    def assign(self, monitors, members, now):
+        self._members = members
+        self._monitors = {monitor['id']: monitor for monitor in monitors if self.is_owned(monitor['id'])}
+
+        for monitor_id in list(self._next_runs.keys()):
+            if monitor_id not in self._monitors:
+                del self._next_runs[monitor_id]
+
+        for monitor_id in self._monitors.keys():
+            if monitor_id not in self._next_runs:
+                self.schedule(monitor_id, now, True)
+
+        log_msg("DEBUG", "[MonitorScheduler][assign] member_id = {}, members = {}, owned = {}/{}".format(self._membership.member_id, len(members), len(self._monitors), len(monitors)))
+
+    def due(self, now):
+        return [monitor_id for monitor_id, next_run in self._next_runs.items() if next_run <= now and monitor_id not in self._running]
+
+    async def probe(self, monitor):
+        try:
+            async with self._semaphore:
+                with get_otel_tracer().start_as_current_span(span_format("monitors", Method.ASYNCWORKER)):
+                    response_time, callback_payload = await check_monitor(monitor, get_monitor_gauges(monitor['name']), self._http_clients)
+
+            self.record_status(monitor, response_time, callback_payload)
+            for callback in get_callbacks_to_notify(monitor, callback_payload):
+                self._callbacks.submit(callback, callback_payload)
+        except Exception as e:
+            log_msg("ERROR", f"Error processing monitor {monitor['name']}: e.type = {type(e)}, e.msg = {str(e)}")
+        finally:
+            self._running.discard(monitor['id'])
+
+    def record_status(self, monitor, response_time, callback_payload):
+        #? only the last result of each monitor is kept until the next flush
+        self._statuses[monitor['id']] = {
+            'id': monitor['id'],
+            'status': 'success' if is_true(callback_payload['status']) else 'failure',
+            'response_time': f"{response_time} ms"
+        }
+
+    async def flush_statuses(self):
+        if not self._statuses:
+            return
+
+        statuses = list(self._statuses.values())
+        self._statuses = {}
+        try:
+            await asyncio.to_thread(save_monitors_status, statuses)
+        except Exception as e:
+            log_msg("ERROR", f"Error saving the monitors status: count = {len(statuses)}, e.type = {type(e)}, e.msg = {str(e)}")
+
+    async def refresh(self, now, reload_monitors):
+        members = await asyncio.to_thread(self._membership.heartbeat)
+        if reload_monitors or members != self._members:
+            self.assign(await asyncio.to_thread(load_monitors), members, now)
+
+    async def run(self):
+        self._semaphore = asyncio.Semaphore(self._concurrency)
+        self._http_clients = MonitorHttpClients(self._concurrency)
+        self._callbacks = CallbacksQueue(self._http_clients)
+        self._callbacks.start()
+        heartbeat_at = 0
+        refreshed_at = 0
+        flushed_at = time.monotonic()
+
+        try:
+            while True:
+                now = time.monotonic()
+                if now - heartbeat_at >= MONITOR_HEARTBEAT_INTERVAL:
+                    try:
+                        reload_monitors = now - refreshed_at >= MONITOR_REFRESH_INTERVAL
+                        await self.refresh(now, reload_monitors)
+                        heartbeat_at = now
+                        if reload_monitors:
+                            refreshed_at = now
+                    except Exception as e:
+                        log_msg("ERROR", f"Error in monitor loop: e.type = {type(e)}, e.msg = {str(e)}")
+
+                for monitor_id in self.due(now):
+                    self._running.add(monitor_id)
+                    self.schedule(monitor_id, now)
+                    task = asyncio.create_task(self.probe(self._monitors[monitor_id]))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+
+                if now - flushed_at >= MONITOR_STATUS_FLUSH_INTERVAL:
+                    await self.flush_statuses()
+                    flushed_at = now
+
+                await asyncio.sleep(MONITOR_TICK)
+        finally:
+            await self.flush_statuses()
+            await self._callbacks.aclose()
+            await self._http_clients.aclose()
+
+def monitors():
+    if is_false(MONITORS_ENABLED):
+        log_msg("INFO", "[monitors] the monitors are disabled on this instance")
+        return
+
+    membership = MonitorsMembership()
+    atexit.register(membership.leave)
+
+    def start_monitors():
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        loop.set_default_executor(ThreadPoolExecutor(max_workers = MONITOR_IO_THREADS, thread_name_prefix = "monitors"))
+        loop.run_until_complete(MonitorScheduler(membership).run())
+
+    async_thread = threading.Thread(target=start_monitors, daemon=True)
+    async_thread.start()
@@ -1,21 +1,38 @@
+import io
 import os
 import re
 import requests
 
 from user_agents import parse
 from PIL import Image
+from prometheus_client import Counter
 
+from utils.cache import LruCache
 from utils.common import get_env_int, is_empty, is_empty_key, is_not_empty, is_response_ok
+from utils.http import get_async_http_client
 from utils.logger import log_msg
+from utils.observability.geoip import acache_infos, aget_cached_infos, cache_infos, get_cached_infos, lookup_geoip_database
 
 TRACKER_IMAGE_PATH = os.getenv('TRACKER_IMAGE_PATH', "tracker_image.png")
 TRACKER_LOCATION_TIMEOUT = get_env_int('TRACKER_LOCATION_TIMEOUT', 60)
+TRACKER_UA_CACHE_SIZE = get_env_int('TRACKER_UA_CACHE_SIZE', 10000)
 DEFAULT_VALUE = "unknown"
 
-def init_tracker_img():
-    if not os.path.exists(TRACKER_IMAGE_PATH):
-        img = Image.new('RGBA', (1, 1), (255, 255, 255, 0))
-        img.save(TRACKER_IMAGE_PATH)
+_tracker_img = None
+
+def get_tracker_img():
+    #? the pixel is loaded once and served from memory
+    global _tracker_img
+    if _tracker_img is None:
+        if os.path.exists(TRACKER_IMAGE_PATH):
+            with open(TRACKER_IMAGE_PATH, "rb") as file:
+                _tracker_img = file.read()
+        else:
+            buffer = io.BytesIO()
+            Image.new('RGBA', (1, 1), (255, 255, 255, 0)).save(buffer, format = "PNG")
+            _tracker_img = buffer.getvalue()
+
+    return _tracker_img
 
 def override_if_is_empty(payload, pkey, data, dkey = None):
     if is_empty(dkey):
@@ -33,53 +50,58 @@ def get_client_host_from_request(request):
 
     return host
 
-def get_infos_from_ip(ip: str):
-    try:
-        response = requests.get(f"https://ipapi.co/{ip}/json", timeout=TRACKER_LOCATION_TIMEOUT)
-        status_code = response.status_code
-        if is_response_ok(status_code):
-            data = response.json()
-            payload = {
-                "status": "ok",
-                "status_code": status_code,
-                "city": data.get("city", DEFAULT_VALUE),
-                "region": data.get("region", DEFAULT_VALUE),
-                "country": data.get("country_name", DEFAULT_VALUE),
-                "region_code": data.get("region_code", DEFAULT_VALUE),
-                "country_iso": data.get("country_code", DEFAULT_VALUE),
-                "lookup": data.get("country_code_iso3", DEFAULT_VALUE),
-                "timezone": data.get("timezone", DEFAULT_VALUE),
-                "utc_offset": data.get("country_code", DEFAULT_VALUE),
-                "currency": data.get("currency", DEFAULT_VALUE),
-                "asn": data.get("asn", DEFAULT_VALUE),
-                "org": data.get("org", DEFAULT_VALUE),
-                "ip": data.get("ip", ip),
-                "network": data.get("network", DEFAULT_VALUE),
-                "version": data.get("version", DEFAULT_VALUE)
-            }
-        else:
-            try:
-                data = response.json()
-                reason = data.get("reason", DEFAULT_VALUE)
-            except Exception as pe:
-                log_msg("WARN", "[get_infos_from_ip] unexpected error with ipapi.co: ip = {}, pe.type = {}, pe.msg = {}".format(ip, type(pe), pe))
-                reason = str(pe)
-
-            payload = {
-                "status": "ko",
-                "status_code": status_code,
-                "ip": ip,
-                "reason": reason
-            }
-    except Exception as e:
-        log_msg("WARN", "[get_infos_from_ip] unexpected error with ipapi.co: ip = {}, e.type = {}, e.msg = {}".format(ip, type(e), e))
-        payload = {
-            "status": "ko",
-            "ip": ip,
-            "reason": str(e)
+def _ipapi_url(ip):
+    return f"https://ipapi.co/{ip}/json"
+
+def _ipinfo_url(ip):
+    return f"https://ipinfo.io/{ip}/json"
+
+def parse_ipapi_response(ip, response):
+    status_code = response.status_code
+    if is_response_ok(status_code):
+        data = response.json()
+        return {
+            "status": "ok",
+            "status_code": status_code,
+            "city": data.get("city", DEFAULT_VALUE),
+            "region": data.get("region", DEFAULT_VALUE),
+            "country": data.get("country_name", DEFAULT_VALUE),
+            "region_code": data.get("region_code", DEFAULT_VALUE),
+            "country_iso": data.get("country_code", DEFAULT_VALUE),
+            "lookup": data.get("country_code_iso3", DEFAULT_VALUE),
+            "timezone": data.get("timezone", DEFAULT_VALUE),
+            "utc_offset": data.get("country_code", DEFAULT_VALUE),
+            "currency": data.get("currency", DEFAULT_VALUE),
+            "asn": data.get("asn", DEFAULT_VALUE),
+            "org": data.get("org", DEFAULT_VALUE),
+            "ip": data.get("ip", ip),
+            "network": data.get("network", DEFAULT_VALUE),
+            "version": data.get("version", DEFAULT_VALUE)
         }
 
-    response = requests.get(f"https://ipinfo.io/{ip}/json", timeout=TRACKER_LOCATION_TIMEOUT)
+    try:
+        data = response.json()
+        reason = data.get("reason", DEFAULT_VALUE)
+    except Exception as pe:
+        log_msg("WARN", "[get_infos_from_ip] unexpected error with ipapi.co: ip = {}, pe.type = {}, pe.msg = {}".format(ip, type(pe), pe))
+        reason = str(pe)
+
+    return {
+        "status": "ko",
+        "status_code": status_code,
+        "ip": ip,
+        "reason": reason
+    }
+
+def ipapi_error_payload(ip, e):
+    log_msg("WARN", "[get_infos_from_ip] unexpected error with ipapi.co: ip = {}, e.type = {}, e.msg = {}".format(ip, type(e), e))
+    return {
+        "status": "ko",
+        "ip": ip,
+        "reason": str(e)
+    }
+
+def merge_ipinfo_response(ip, payload, response):
     status_code = response.status_code
     try:
         if is_response_ok(status_code):
@@ -101,6 +123,39 @@ def get_infos_from_ip(ip: str):
 
     return payload
 
+def fetch_infos_from_ip(ip: str):
+    try:
+        payload = parse_ipapi_response(ip, requests.get(_ipapi_url(ip), timeout=TRACKER_LOCATION_TIMEOUT))
+    except Exception as e:
+        payload = ipapi_error_payload(ip, e)
+
+    return merge_ipinfo_response(ip, payload, requests.get(_ipinfo_url(ip), timeout=TRACKER_LOCATION_TIMEOUT))
+
+async def afetch_infos_from_ip(ip: str):
+    client = get_async_http_client()
+    try:
+        payload = parse_ipapi_response(ip, await client.get(_ipapi_url(ip), timeout=TRACKER_LOCATION_TIMEOUT))
+    except Exception as e:
+        payload = ipapi_error_payload(ip, e)
+
+    return merge_ipinfo_response(ip, payload, await client.get(_ipinfo_url(ip), timeout=TRACKER_LOCATION_TIMEOUT))
+
+def get_infos_from_ip(ip: str):
+    infos = get_cached_infos(ip)
+    if infos is None:
+        infos = lookup_geoip_database(ip) or fetch_infos_from_ip(ip)
+        cache_infos(ip, infos)
+
+    return dict(infos)
+
+async def aget_infos_from_ip(ip: str):
+    infos = await aget_cached_infos(ip)
+    if infos is None:
+        infos = lookup_geoip_database(ip) or await afetch_infos_from_ip(ip)
+        await acache_infos(ip, infos)
+
+    return dict(infos)
+
 def track_log(request, function_name, email = "unknown"):
     client_host = get_client_host_from_request(request)
     client_infos = {}
@@ -108,7 +163,30 @@ def track_log(request, function_name, email = "unknown"):
         client_infos = get_infos_from_ip(client_host)
     log_msg("INFO", f"[track][{function_name}] email = {email}, host = {client_host}, infos = {client_infos}")
 
+user_agents_cache_requests = Counter('tracker_user_agents_cache', "Tracker user agents parsing cache lookups", ['result'])
+_user_agents_cache_hits = user_agents_cache_requests.labels('hit')
+_user_agents_cache_misses = user_agents_cache_requests.labels('miss')
+
+class UserAgentsCache(LruCache):
+    def __init__(self, size = TRACKER_UA_CACHE_SIZE):
+        super().__init__(size)
+
+user_agents_cache = UserAgentsCache()
+
 def parse_user_agent(user_agent):
+    #? real traffic only has a few distinct user agents, the parsing result is reused for all of them
+    parsed_ua = user_agents_cache.get(user_agent) if is_not_empty(user_agent) else None
+    if parsed_ua is None:
+        _user_agents_cache_misses.inc()
+        parsed_ua = parse_user_agent_uncached(user_agent)
+        if is_not_empty(user_agent):
+            user_agents_cache.put(user_agent, parsed_ua)
+    else:
+        _user_agents_cache_hits.inc()
+
+    return {**parsed_ua, 'details': dict(parsed_ua['details'])}
+
+def parse_user_agent_uncached(user_agent):
     if is_empty(user_agent):
         return {
             "device": DEFAULT_VALUE,
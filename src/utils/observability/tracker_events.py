@@ -0,0 +1,114 @@
+import os
+import time
+import threading
+
+from collections import Counter
+from datetime import datetime
+
+from adapters.AdapterConfig import get_adapter
+from utils.common import get_env_bool, get_env_float, get_env_int, is_false, is_not_empty
+from utils.consumer import MessagesBatcher
+from utils.date import get_month_range
+from utils.logger import log_msg
+
+TRACKER_EVENTS_ENABLED = get_env_bool('TRACKER_EVENTS_ENABLED', False)
+TRACKER_EVENTS_CONSUMER_ENABLED = get_env_bool('TRACKER_EVENTS_CONSUMER_ENABLED', True)
+TRACKER_EVENTS_GROUP = os.getenv('TRACKER_EVENTS_GROUP', 'tracker')
+TRACKER_EVENTS_CHANNEL = os.getenv('TRACKER_EVENTS_CHANNEL', 'trackerevents')
+TRACKER_EVENTS_BATCH_SIZE = max(1, get_env_int('TRACKER_EVENTS_BATCH_SIZE', 500))
+TRACKER_EVENTS_FLUSH_INTERVAL = get_env_float('TRACKER_EVENTS_FLUSH_INTERVAL', 5)
+
+TRACKER_ROLLUP_DIMENSIONS = ['all', 'device', 'browser', 'country']
+DEFAULT_VALUE = "unknown"
+
+pubsub_adapter = get_adapter("pubsub")
+
+def truncate(value, length):
+    return value[:length] if isinstance(value, str) else value
+
+def to_tracker_event(payload):
+    infos = payload.get('infos') or {}
+    return {
+        'website': payload['website'],
+        'time': payload['time'],
+        'host': payload.get('host'),
+        'referrer': payload.get('referrer'),
+        'user_agent': payload.get('user_agent'),
+        'device': payload.get('device', DEFAULT_VALUE),
+        'browser': payload.get('browser', DEFAULT_VALUE),
+        'os': payload.get('os', DEFAULT_VALUE),
+        'country': infos.get('country_iso', DEFAULT_VALUE),
+        'city': infos.get('city', DEFAULT_VALUE)
+    }
+
+def publish_tracker_event(payload):
+    pubsub_adapter().publish(TRACKER_EVENTS_GROUP, TRACKER_EVENTS_CHANNEL, to_tracker_event(payload))
+
+def to_tracker_event_row(event):
+    return {
+        'website': truncate(event['website'], 255),
+        'time': datetime.fromisoformat(event['time']),
+        'host': truncate(event.get('host'), 255),
+        'referrer': event.get('referrer'),
+        'user_agent': event.get('user_agent'),
+        'device': truncate(event.get('device') or DEFAULT_VALUE, 50),
+        'browser': truncate(event.get('browser') or DEFAULT_VALUE, 100),
+        'os': truncate(event.get('os') or DEFAULT_VALUE, 50),
+        'country': truncate(event.get('country') or DEFAULT_VALUE, 10),
+        'city': truncate(event.get('city') or DEFAULT_VALUE, 255)
+    }
+
+def rollup_tracker_events(rows):
+    hits = Counter()
+    for row in rows:
+        bucket = row['time'].replace(second = 0, microsecond = 0)
+        for dimension in TRACKER_ROLLUP_DIMENSIONS:
+            value = "all" if dimension == "all" else row[dimension]
+            hits[(row['website'], bucket, dimension, value)] += 1
+
+    return [{'website': website, 'bucket': bucket, 'dimension': dimension, 'value': value, 'hits': count} for (website, bucket, dimension, value), count in hits.items()]
+
+_partitions = set()
+
+def save_tracker_events(events):
+    from database.postgres_db import SessionLocal
+    from entities.TrackerEvent import TrackerEvent, TrackerRollup
+
+    rows = [to_tracker_event_row(event) for event in events]
+    with SessionLocal() as db:
+        for month, next_month in {get_month_range(row['time']) for row in rows}:
+            if month not in _partitions:
+                TrackerEvent.createMonthlyPartition(month, next_month, db)
+                _partitions.add(month)
+
+        TrackerEvent.insertTrackerEvents(rows, db)
+        TrackerRollup.upsertTrackerRollups(rollup_tracker_events(rows), db)
+        db.commit()
+
+class TrackerEventsBatcher(MessagesBatcher):
+    def __init__(self, save = save_tracker_events, batch_size = TRACKER_EVENTS_BATCH_SIZE, interval = TRACKER_EVENTS_FLUSH_INTERVAL):
+        super().__init__(save, batch_size, interval)
+
+def tracker_events():
+    if is_false(TRACKER_EVENTS_ENABLED) or is_false(TRACKER_EVENTS_CONSUMER_ENABLED):
+        return
+
+    def consume():
+        while True:
+            batcher = TrackerEventsBatcher()
+
+            async def handle(msg):
+                event = pubsub_adapter().decode(msg)
+                if event is None or not is_not_empty(event.get('website')):
+                    return True
+
+                return await batcher.add(event)
+
+            try:
+                pubsub_adapter().consume(TRACKER_EVENTS_GROUP, TRACKER_EVENTS_CHANNEL, handle, TRACKER_EVENTS_BATCH_SIZE, TRACKER_EVENTS_BATCH_SIZE)
+            except Exception as e:
+                log_msg("ERROR", "[tracker_events] unexpected error in the consumer: e.type = {}, e.msg = {}".format(type(e), e))
+                time.sleep(1)
+
+    consumer_thread = threading.Thread(target=consume, name="tracker-events", daemon=True)
+    consumer_thread.start()
@@ -1,38 +1,39 @@
 import os
-import yaml
+import json
+import hashlib
 
 from urllib.error import HTTPError
 
+from utils.cloud_environments import get_cloud_environments
 from utils.common import is_empty
 from utils.logger import log_msg
 
 def exist_provider(providerName):
-    config_path = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', 'cloud_environments.yml'))
-    result = []
-    with open(config_path, "r") as stream:
-        loaded_data = yaml.safe_load(stream)
-        result = loaded_data['providers']
-        providers = [p for p in result if p['name'] == providerName]
-    return len(providers)>0
+    return providerName in get_cloud_environments().providers_by_name
 
 def get_providers():
-    config_path = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', 'cloud_environments.yml'))
-    result = []
-    with open(config_path, "r") as stream:
-        loaded_data = yaml.safe_load(stream)
-        result = loaded_data['providers']
-    return result
+    return get_cloud_environments().providers
 
 def get_provider_infos(provider, key):
-    config_path = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', 'cloud_environments.yml'))
-    result = []
-    with open(config_path, "r") as stream:
-        loaded_data = yaml.safe_load(stream)
-        result = loaded_data['providers']
-        provider = [p for p in result if p['name'] == provider]
-        if not len(provider)>0:
-            raise HTTPError("provider_not_exist", 404, 'provider not found', hdrs = {"i18n_code": "provider_not_exist"}, fp = None)
-    return provider[0][key]
+    providers = get_cloud_environments().providers_by_name
+    if provider not in providers:
+        raise HTTPError("provider_not_exist", 404, 'provider not found', hdrs = {"i18n_code": "provider_not_exist"}, fp = None)
+    return providers[provider][key]
+
+def get_provider_zone_config(provider, region, zone):
+    if provider not in get_cloud_environments().providers_by_name:
+        raise HTTPError("provider_not_exist", 404, 'provider not found', hdrs = {"i18n_code": "provider_not_exist"}, fp = None)
+
+    regions = get_cloud_environments().instance_configs[provider]
+    if region not in regions:
+        raise HTTPError("instance_in_region_not_found", 404, 'instance in this region not found', hdrs = {"i18n_code": "instance_in_region_not_found"}, fp = None)
+    zones = regions[region]
+    if str(zone) not in zones:
+        raise HTTPError("instance_type_in_zone_not_found", 404, 'instance type in this zone not found', hdrs = {"i18n_code": "instance_type_in_zone_not_found"}, fp = None)
+    return zones[str(zone)]
+
+def is_available_instance(instance):
+    return 'disabled' not in instance.keys() or not instance['disabled'] and os.getenv(instance['price_variable'])
 
 def get_driver(provider):
     driver = get_provider_infos(provider, 'driver')
@@ -67,38 +68,17 @@ def get_provider_available_instances(provider):
     return region_instances
 
 def get_provider_available_instances_config_by_region_zone(provider, region, zone):
-    instances_configs = get_provider_infos(provider, 'instance_configs')
-    region_instances_configs = [config for config in instances_configs if config['region'] == region]
-    if not len(region_instances_configs)>0:
-        raise HTTPError("instance_in_region_not_found", 404, 'instance in this region not found', hdrs = {"i18n_code": "instance_in_region_not_found"}, fp = None)
-    zone_instances_configs = [config for config in region_instances_configs[0]['zones'] if str(config['name']) == str(zone)]
-    if not len(zone_instances_configs)>0:
-        raise HTTPError("instance_type_in_zone_not_found", 404, 'instance type in this zone not found', hdrs = {"i18n_code": "instance_type_in_zone_not_found"}, fp = None)
-
-    filtered_instances = [instance for instance in zone_instances_configs[0]['instance_types'] if'disabled' not in instance.keys() or not instance['disabled'] and os.getenv(instance['price_variable'])]
-    return list(map(lambda instance: instance, filtered_instances))
+    zone_config = get_provider_zone_config(provider, region, zone)
+    return [instance for instance in zone_config['instance_types'] if is_available_instance(instance)]
 
 def get_provider_available_instances_by_region_zone(provider, region, zone):
-    instances_configs = get_provider_infos(provider, 'instance_configs')
-    region_instances_configs = [config for config in instances_configs if config['region'] == region]
-    if not len(region_instances_configs)>0:
-        raise HTTPError("instance_in_region_not_found", 404, 'instance in this region not found', hdrs = {"i18n_code": "instance_in_region_not_found"}, fp = None)
-    zone_instances_configs = [config for config in region_instances_configs[0]['zones'] if str(config['name']) == str(zone)]
-    if not len(zone_instances_configs)>0:
-        raise HTTPError("instance_type_in_zone_not_found", 404, 'instance type in this zone not found', hdrs = {"i18n_code": "instance_type_in_zone_not_found"}, fp = None)
-
-    filtered_instances = [instance for instance in zone_instances_configs[0]['instance_types'] if 'disabled' not in instance.keys() or not instance['disabled'] and os.getenv(instance['price_variable'])]
-    return list(map(lambda instance: instance['type'], filtered_instances))
+    zone_config = get_provider_zone_config(provider, region, zone)
+    return [instance['type'] for instance in zone_config['instance_types'] if is_available_instance(instance)]
 
 def get_specific_config(provider, key, region, zone):
-    config = None
-    provider_instances_config = get_provider_infos(provider, 'instance_configs')
-    for instance_config in provider_instances_config:
-        if instance_config['region'] == region:
-            for z in instance_config['zones']:
-                if z['name'] == zone:
-                    config = z[key] if key in z else None
-                    break
+    get_provider_infos(provider, 'instance_configs')
+    zone_config = get_cloud_environments().instance_configs[provider].get(region, {}).get(str(zone))
+    config = zone_config[key] if zone_config is not None and key in zone_config else None
 
     log_msg("INFO", "[provider][get_specific_config] provider = {}, key = {}, region = {}, zone = {} = > config = {}".format(provider, key, region, zone, config))
     return config
@@ -120,36 +100,48 @@ def get_provider_instances_pricing(provider):
     return region_instances
 
 def get_provider_instances_pricing_by_region_zone(provider, region, zone):
-    instances_configs = get_provider_infos(provider, 'instance_configs')
-    region_instances_configs = [config for config in instances_configs if config['region'] == region]
-    if not len(region_instances_configs)>0:
-        raise HTTPError("instance_in_region_not_found", 404, 'instance in this region not found', hdrs = {"i18n_code": "instance_in_region_not_found"}, fp = None)
-    zone_instances_configs = [config for config in region_instances_configs[0]['zones'] if str(config['name']) == str(zone)]
-    if not len(zone_instances_configs)>0:
-        raise HTTPError("instance_type_in_zone_not_found", 404, 'instance type in this zone not found', hdrs = {"i18n_code": "instance_type_in_zone_not_found"}, fp = None)
-    filtered_instances = [instance for instance in zone_instances_configs[0]['instance_types'] if 'disabled' not in instance.keys() or not instance['disabled'] and os.getenv(instance['price_variable'])]
-    return list(map(lambda instance: {
+    zone_config = get_provider_zone_config(provider, region, zone)
+    return [{
         "name": instance['type'],
         "price": os.getenv(instance['price_variable'])
-    }, filtered_instances))
-
-def extract_provider_name(driver):
-    return driver.replace("Driver", "").lower()
+    } for instance in zone_config['instance_types'] if is_available_instance(instance)]
+
+def get_catalog_entry(content):
+    return {
+        'content': content,
+        'etag': '"{}"'.format(hashlib.sha256(json.dumps(content, sort_keys = True, default = str).encode('UTF-8')).hexdigest())
+    }
+
+def build_provider_catalog(provider):
+    return {
+        'pricing': get_catalog_entry({
+            'status': 'ok',
+            'prices': get_provider_instances_pricing(provider)
+        }),
+        'availability': get_catalog_entry({
+            'status': 'ok',
+            'availability': get_provider_available_instances(provider)
+        }),
+        'instance_types': get_catalog_entry({
+            'status': 'ok',
+            'types': get_provider_infos(provider, 'instance_types') if 'instance_types' in get_cloud_environments().providers_by_name[provider] else None
+        })
+    }
+
+def get_provider_catalog(provider, key):
+    if not exist_provider(provider):
+        raise HTTPError("provider_not_exist", 404, 'provider not found', hdrs = {"i18n_code": "provider_not_exist"}, fp = None)
+    return get_cloud_environments().memoize(('catalog', provider), lambda: build_provider_catalog(provider))[key]
+
+def load_providers_catalogs():
+    for provider in get_cloud_environments().providers_by_name.keys():
+        try:
+            get_provider_catalog(provider, 'pricing')
+        except Exception as e:
+            log_msg("WARN", "[provider][load_providers_catalogs] unable to build the catalog of provider = {}: e.type = {}, e.msg = {}".format(provider, type(e), e))
 
 def get_provider_dns_zones(provider):
-    config_path = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', 'cloud_environments.yml'))
-    result = []
-    with open(config_path, "r") as stream:
-        loaded_data = yaml.safe_load(stream)
-        dns_zones = loaded_data['dns_zones']
-        result = [dns_zone['name'] for dns_zone in dns_zones if extract_provider_name(dns_zone['driver']) == provider]
-    return result
+    return list(get_cloud_environments().dns_zones_by_provider.get(provider, []))
 
 def get_dns_providers():
-    config_path = os.path.realpath(os.path.join(os.path.dirname(__file__), '..', '..', 'cloud_environments.yml'))
-    result = []
-    with open(config_path, "r") as stream:
-        loaded_data = yaml.safe_load(stream)
-        dns_zones = loaded_data['dns_zones']
-        result = list(set([extract_provider_name(dns_zone['driver']) for dns_zone in dns_zones]))
-    return result
+    return list(get_cloud_environments().dns_zones_by_provider.keys())
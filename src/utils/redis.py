@@ -1,9 +1,26 @@
 import base64
 import json
 from datetime import datetime
-from database.redis_db import redis_client
+from database.redis_db import async_redis_client, redis_client
 from utils.logger import log_msg
 
+def redis_broadcast(channel, payload):
+    redis_client.publish(channel, json.dumps(payload))
+
+def redis_subscribe(channel, handler):
+    def on_message(msg):
+        try:
+            handler(json.loads(msg['data']))
+        except Exception as e:
+            log_msg("ERROR", f"[redis_subscribe] unexpected error handling message on channel = {channel}: e.type = {type(e)}, e.msg = {e}")
+
+    def on_error(e, pubsub, thread):
+        log_msg("WARN", f"[redis_subscribe] subscription error on channel = {channel}: e.type = {type(e)}, e.msg = {e}")
+
+    sub = redis_client.pubsub(ignore_subscribe_messages=True)
+    sub.subscribe(**{ channel: on_message })
+    return sub.run_in_thread(sleep_time=1.0, daemon=True, exception_handler=on_error)
+
 def create_redis_key(user_id: int, key: str) -> str:
     combined_key = f"{user_id}_{key}"
     return base64.b64encode(combined_key.encode('utf-8')).decode('utf-8')
@@ -13,6 +30,28 @@ def create_user_redis_pattern(user_id: int) -> str:
     encoded_prefix = base64.b64encode(prefix.encode('utf-8')).decode('utf-8')
     return f"{encoded_prefix}*"
 
+def decode_user_redis_key(user_id: int, redis_key: str, search: str = None):
+    decoded_key = base64.b64decode(redis_key).decode('utf-8')
+    if not decoded_key.startswith(f"{user_id}_"):
+        return None
+
+    key = decoded_key.split('_', 1)[1]
+    if search and search.strip() and search.lower() not in key.lower():
+        return None
+
+    return key
+
+def to_redis_result(key, value, ttl_seconds):
+    current_time = datetime.now().isoformat()
+    return {
+        'key': key,
+        'payload': json.loads(value),
+        'created_at': current_time,
+        'updated_at': current_time,
+        'source': 'redis',
+        'ttl': round(ttl_seconds / 3600, 2) if ttl_seconds > 0 else None
+    }
+
 def get_redis_keys_for_user(user_id: int, search: str = None):
     pattern = create_user_redis_pattern(user_id)
     redis_results = []
@@ -23,30 +62,17 @@ def get_redis_keys_for_user(user_id: int, search: str = None):
         
         for redis_key in keys:
             try:
-                decoded_key = base64.b64decode(redis_key).decode('utf-8')
-                if decoded_key.startswith(f"{user_id}_"):
-                    key = decoded_key.split('_', 1)[1]
-
-                    if search and search.strip() and search.lower() not in key.lower():
-                        continue
-
-                    pipe = redis_client.pipeline()
-                    pipe.get(redis_key)
-                    pipe.ttl(redis_key)
-                    value, ttl_seconds = pipe.execute()
-                    
-                    if value:
-                        current_time = datetime.now().isoformat()
-                        ttl_hours = round(ttl_seconds / 3600, 2) if ttl_seconds > 0 else None
-                        
-                        redis_results.append({
-                            'key': key,
-                            'payload': json.loads(value),
-                            'created_at': current_time,
-                            'updated_at': current_time,
-                            'source': 'redis',
-                            'ttl': ttl_hours
-                        })
+                key = decode_user_redis_key(user_id, redis_key, search)
+                if key is None:
+                    continue
+
+                pipe = redis_client.pipeline()
+                pipe.get(redis_key)
+                pipe.ttl(redis_key)
+                value, ttl_seconds = pipe.execute()
+
+                if value:
+                    redis_results.append(to_redis_result(key, value, ttl_seconds))
             except Exception as e:
                 log_msg("ERROR", f"Error processing Redis key {redis_key}: {str(e)}")
                 continue
@@ -55,3 +81,34 @@ def get_redis_keys_for_user(user_id: int, search: str = None):
             break
     
     return redis_results
+
+async def aget_redis_keys_for_user(user_id: int, search: str = None):
+    redis_results = []
+    keys = []
+    async for redis_key in async_redis_client.scan_iter(match=create_user_redis_pattern(user_id), count=100):
+        try:
+            key = decode_user_redis_key(user_id, redis_key, search)
+            if key is not None:
+                keys.append((key, redis_key))
+        except Exception as e:
+            log_msg("ERROR", f"Error processing Redis key {redis_key}: {str(e)}")
+
+    if not keys:
+        return redis_results
+
+    #? one round trip for all the values instead of one per key
+    async with async_redis_client.pipeline(transaction=False) as pipe:
+        for _, redis_key in keys:
+            pipe.get(redis_key)
+            pipe.ttl(redis_key)
+        values = await pipe.execute()
+
+    for i, (key, redis_key) in enumerate(keys):
+        value, ttl_seconds = values[2 * i], values[2 * i + 1]
+        try:
+            if value:
+                redis_results.append(to_redis_result(key, value, ttl_seconds))
+        except Exception as e:
+            log_msg("ERROR", f"Error processing Redis key {redis_key}: {str(e)}")
+
+    return redis_results